@@ -0,0 +1,322 @@
+import os
+import gzip
+import json
+import shutil
+import zipfile
+import tempfile
+import time
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+# LAYOUT
+BATCH_DIR_NAME = "generated_batch"      # Pre-versioning layout, still read when no CURRENT pointer exists
+CONTAINER_NAME = "generated_batch.lcb"   # Zip of SVGZ cards + manifest
+MANIFEST_NAME = "batch_stats.json"
+CARDS_MANIFEST_NAME = "card_manifest.json"   # Per-card pen / ink / estimated time for the scheduler
+RASTER_LAYER_NAME = "raster_layer.xml"   # Template images kept out of the cards (preview only; not .svg, so never a card)
+GZIP_LEVEL = 6
+
+# VERSIONS: every generation writes batches/vNNNN (folder or vNNNN.lcb); CURRENT names the live one
+VERSIONS_DIR_NAME = "batches"
+POINTER_NAME = "CURRENT"
+BUILD_MARKER = ".building.json"         # Present while a version is being generated (expected card list)
+BUILD_STALE_S = 6 * 3600                # Unreferenced builds older than this are treated as crashed
+
+def versions_dir(project_path):
+    return os.path.join(project_path, VERSIONS_DIR_NAME)
+
+def current_source(project_path):
+    """Path of the live version (folder or .lcb), or None before the first versioned generation."""
+    try:
+        with open(os.path.join(versions_dir(project_path), POINTER_NAME), "r") as f: name = f.read().strip()
+    except OSError: return None
+    path = os.path.join(versions_dir(project_path), name)
+    return path if name and os.path.exists(path) else None
+
+def batch_dir(project_path):
+    current = current_source(project_path)
+    if current: return current[:-len(".lcb")] if current.endswith(".lcb") else current
+    return os.path.join(project_path, BATCH_DIR_NAME)
+
+def container_path(project_path):
+    current = current_source(project_path)
+    if current: return current if current.endswith(".lcb") else current + ".lcb"
+    return os.path.join(project_path, CONTAINER_NAME)
+
+# --- VERSION LIFECYCLE ---
+_retained = Counter()       # Versions in use by this process (loaded queue, running builds)
+_retained_lock = threading.Lock()
+
+def retain(path):
+    with _retained_lock: _retained[os.path.abspath(path)] += 1
+
+def release(path):
+    with _retained_lock:
+        key = os.path.abspath(path)
+        _retained[key] -= 1
+        if _retained[key] <= 0: del _retained[key]
+
+def project_of(source):
+    """Project folder of a batch source (version folder/.lcb or the pre-versioning batch)."""
+    parent = os.path.dirname(os.path.abspath(source))
+    return os.path.dirname(parent) if os.path.basename(parent) == VERSIONS_DIR_NAME else parent
+
+def _is_retained(path):
+    path = os.path.abspath(path)
+    with _retained_lock:
+        return any(path == p or os.path.splitext(path)[0] == p or path == os.path.splitext(p)[0] for p in _retained)
+
+def new_version(project_path, cards, packed=False):
+    """
+    Creates the next empty version folder for a generation, marked as building
+    with the card names it will contain. The live version is not touched.
+    """
+    root = versions_dir(project_path)
+    os.makedirs(root, exist_ok=True)
+    numbers = [int(f[1:5]) for f in os.listdir(root) if f[:1] == "v" and f[1:5].isdigit()]
+    n = max(numbers, default=0) + 1
+    while True:
+        path = os.path.join(root, f"v{n:04d}")
+        try:
+            os.mkdir(path)
+            break
+        except FileExistsError: n += 1
+    retain(path)
+    with open(os.path.join(path, BUILD_MARKER), "w") as f:
+        json.dump({"cards": list(cards), "packed": bool(packed), "pid": os.getpid(), "started": time.time()}, f)
+    return path
+
+def build_info(version_path):
+    """Build marker of a version being generated, or None once it is finished."""
+    try:
+        with open(os.path.join(version_path, BUILD_MARKER), "r") as f: return json.load(f)
+    except (OSError, ValueError): return None
+
+def building_version(project_path):
+    """Newest version still being generated by a live build, or None."""
+    root = versions_dir(project_path)
+    if not os.path.isdir(root): return None
+    for name in sorted(os.listdir(root), reverse=True):
+        path = os.path.join(root, name)
+        if os.path.isdir(path) and build_info(path) is not None and not _is_stale(path): return path
+    return None
+
+def _is_stale(path):
+    return time.time() - os.path.getmtime(os.path.join(path, BUILD_MARKER)) > BUILD_STALE_S
+
+def finish_version(version_path):
+    try: os.remove(os.path.join(version_path, BUILD_MARKER))
+    except OSError: pass
+
+def publish_version(project_path, version_path, built_path=None):
+    """
+    Atomically makes a finished version the live one (CURRENT pointer swap),
+    then removes versions nothing refers to any more.
+    built_path: the .lcb when the version was packed, else the folder itself.
+    """
+    root = versions_dir(project_path)
+    pointer = os.path.join(root, POINTER_NAME)
+    tmp_pointer = f"{pointer}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_pointer, "w") as f: f.write(os.path.basename(built_path or version_path))
+    os.replace(tmp_pointer, pointer)
+    release(version_path)
+    collect_garbage(project_path)
+
+def abandon_version(version_path):
+    release(version_path)
+    shutil.rmtree(version_path, ignore_errors=True)
+
+def collect_garbage(project_path):
+    """
+    Deletes batch versions (and the pre-versioning batch) that are neither live,
+    retained by this process, nor a build in progress.
+    """
+    root = versions_dir(project_path)
+    if not os.path.isdir(root): return []
+    current = current_source(project_path) or ""
+    candidates = [os.path.join(root, f) for f in os.listdir(root) if f[:1] == "v" and not f.endswith(".tmp")]
+    # The pre-versioning batch goes once a versioned one is live
+    if current: candidates += [os.path.join(project_path, BATCH_DIR_NAME), os.path.join(project_path, CONTAINER_NAME)]
+    removed = []
+    for path in candidates:
+        if not os.path.exists(path) or os.path.abspath(path) == os.path.abspath(current) or _is_retained(path): continue
+        if os.path.isdir(path) and build_info(path) is not None and not _is_stale(path): continue
+        try:
+            if os.path.isdir(path): shutil.rmtree(path)
+            else: os.remove(path)
+            removed.append(path)
+        except OSError: pass
+    return removed
+
+def has_batch(project_path):
+    """
+    True if the project has a plain batch folder or a packed container.
+    """
+    return os.path.isdir(batch_dir(project_path)) or os.path.isfile(container_path(project_path))
+
+def pack_batch(source_dir, target_file, remove_source=False):
+    """
+    Packs a generated batch folder into a single container.
+    Cards are stored as pre-gzipped SVGZ entries (ZIP_STORED) so any card can be
+    read or streamed without touching the others. Other files (manifest) are deflated.
+    """
+    tmp_file = target_file + ".tmp"
+    count = 0
+    with zipfile.ZipFile(tmp_file, "w") as zf:
+        for name in sorted(os.listdir(source_dir)):
+            full_path = os.path.join(source_dir, name)
+            if not os.path.isfile(full_path): continue
+            if name.endswith(".svg"):
+                with open(full_path, "rb") as f: data = f.read()
+                # mtime=0 keeps the container byte-stable for identical batches
+                zf.writestr(name + "z", gzip.compress(data, GZIP_LEVEL, mtime=0), compress_type=zipfile.ZIP_STORED)
+                count += 1
+            else:
+                zf.write(full_path, name, compress_type=zipfile.ZIP_DEFLATED)
+
+    os.replace(tmp_file, target_file)
+    if remove_source: shutil.rmtree(source_dir)
+    return count
+
+def unpack_batch(source_file, target_dir):
+    """
+    Restores a container to a plain batch folder (plain .svg files).
+    """
+    os.makedirs(target_dir, exist_ok=True)
+    container = BatchContainer(source_file)
+    try:
+        for card in container.list_cards():
+            with open(os.path.join(target_dir, card), "wb") as f: f.write(container.read_svg(card))
+        for name in container.list_files():
+            with open(os.path.join(target_dir, name), "wb") as f: f.write(container.read_file(name))
+    finally:
+        container.close()
+
+class BatchContainer:
+    """
+    Random-access reader for a packed batch (.lcb).
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._zip = zipfile.ZipFile(path, "r")
+        self._entries = set(self._zip.namelist())
+
+    def close(self):
+        with self._lock: self._zip.close()
+
+    def list_cards(self):
+        return sorted((n[:-1] for n in self._entries if n.endswith(".svgz")), key=card_order)
+
+    def list_files(self):
+        return sorted(n for n in self._entries if not n.endswith(".svgz"))
+
+    def has_card(self, card):
+        return (card + "z") in self._entries
+
+    def has_file(self, name):
+        return name in self._entries
+
+    def read_file(self, name):
+        with self._lock: return self._zip.read(name)
+
+    def read_manifest(self, name=MANIFEST_NAME):
+        if name not in self._entries: return {}
+        try: return json.loads(self.read_file(name))
+        except ValueError: return {}
+
+    def read_svgz(self, card):
+        """Raw gzip bytes, ready to send with Content-Encoding: gzip."""
+        with self._lock: return self._zip.read(card + "z")
+
+    def read_svg(self, card):
+        return gzip.decompress(self.read_svgz(card))
+
+    def extracted(self, card):
+        """
+        Decompresses one card to a temp file for tools that need a real path (axicli).
+        The file is removed when the block exits.
+        """
+        return _temp_copy(self.read_svg(card), ".svg")
+
+    def extracted_file(self, name):
+        """Same as extracted() for a side file (e.g. a precompiled .gcode program)."""
+        return _temp_copy(self.read_file(name), os.path.splitext(name)[1])
+
+@contextmanager
+def _temp_copy(data, suffix):
+    fd, tmp_path = tempfile.mkstemp(suffix=suffix, prefix="linecraft_")
+    try:
+        with os.fdopen(fd, "wb") as f: f.write(data)
+        yield tmp_path
+    finally:
+        try: os.remove(tmp_path)
+        except OSError: pass
+
+def card_order(name):
+    # Row number first: cards appended past the batch's padding width (1000_ after 999_) stay in order
+    number = name.split("_", 1)[0]
+    return (int(number) if number.isdigit() else float("inf"), name)
+
+def open_batch(project_path, source=None):
+    """
+    Returns (source_path, container_or_None, card_names) for a project's batch.
+    Prefers the plain folder when it holds cards, then the packed container.
+    source: open that specific version (folder or .lcb) instead of the live one.
+    """
+    if source and source.endswith(".lcb") and os.path.isfile(source):
+        container = BatchContainer(source)
+        return source, container, container.list_cards()
+    folder = source if source and os.path.isdir(source) else batch_dir(project_path)
+    if os.path.isdir(folder):
+        cards = sorted((f for f in os.listdir(folder) if f.endswith(".svg")), key=card_order)
+        if cards: return folder, None, cards
+
+    packed = container_path(project_path)
+    if os.path.isfile(packed):
+        container = BatchContainer(packed)
+        return packed, container, container.list_cards()
+
+    return folder, None, []
+
+def read_manifest(source, container, name=MANIFEST_NAME):
+    """
+    Reads a JSON side file of an opened batch (see open_batch). {} if absent or broken.
+    """
+    if container: return container.read_manifest(name)
+    try:
+        with open(os.path.join(source, name), "r") as f: return json.load(f)
+    except (OSError, ValueError): return {}
+
+def read_side_file(project_path, name):
+    """Raw bytes of a non-card file of the live batch (folder or container), or None."""
+    source, container, _ = open_batch(project_path)
+    try:
+        if container: return container.read_file(name) if container.has_file(name) else None
+        path = os.path.join(source, name)
+        if not os.path.isfile(path): return None
+        with open(path, "rb") as f: return f.read()
+    finally:
+        if container: container.close()
+
+def read_card(project_path, card):
+    """
+    Returns (svg_bytes, signature) for one card from either layout, or (None, None).
+    The signature changes whenever the stored card may have changed.
+    """
+    path = os.path.join(batch_dir(project_path), card)
+    if os.path.isfile(path):
+        st = os.stat(path)
+        with open(path, "rb") as f: return f.read(), (path, st.st_mtime_ns, st.st_size)
+
+    packed = container_path(project_path)
+    if os.path.isfile(packed):
+        container = BatchContainer(packed)
+        try:
+            if container.has_card(card):
+                st = os.stat(packed)
+                return container.read_svg(card), (packed, st.st_mtime_ns, card)
+        finally:
+            container.close()
+    return None, None
@@ -0,0 +1,121 @@
+import os
+import numpy as np
+
+# Machine travel (mm) from the pen's home at the page origin: AxiDraw V3 / SE-A4 by default, "WxH" to override
+MACHINE_TRAVEL_MM = tuple(float(v) for v in os.environ.get("LINECRAFT_TRAVEL_MM", "300x218").lower().split("x"))
+MIN_SHRINK = 0.5     # Auto-shrink never goes below half size; rows that need more are flagged instead
+MODES = ("off", "flag", "shrink")
+
+def _issue(level, code, message, field):
+    return {"level": level, "code": code, "message": message, "field": field}
+
+def frame(page, mm_per_unit, safe_margin=0.0, travel_mm=MACHINE_TRAVEL_MM):
+    """
+    Limits of one template in root user units: {"page", "travel", "safe"} boxes
+    (x0, y0, x1, y1). safe is the page inset by safe_margin, cut to the travel.
+    """
+    x, y, w, h = page
+    page_box = np.array([x, y, x + w, y + h], dtype=float)
+    travel = np.array([x, y, x + travel_mm[0] / mm_per_unit, y + travel_mm[1] / mm_per_unit]) if mm_per_unit else page_box
+    safe = page_box + (safe_margin, safe_margin, -safe_margin, -safe_margin)
+    return {"page": page_box, "travel": travel,
+            "safe": np.concatenate([np.maximum(safe[:2], travel[:2]), np.minimum(safe[2:], travel[2:])])}
+
+def to_root(boxes, matrices):
+    """Axis-aligned root boxes (n, 4) of local boxes (n, 4), each under its own affine (a, b, c, d, e, f)."""
+    b, m = np.asarray(boxes, dtype=float), np.asarray(matrices, dtype=float)
+    # Centre maps through the affine, half-extents through its absolute linear part
+    c, h = (b[:, :2] + b[:, 2:]) * 0.5, (b[:, 2:] - b[:, :2]) * 0.5
+    centre = c[:, :1] * m[:, 0:2] + c[:, 1:] * m[:, 2:4] + m[:, 4:6]
+    half = h[:, :1] * np.abs(m[:, 0:2]) + h[:, 1:] * np.abs(m[:, 2:4])
+    return np.hstack([centre - half, centre + half])
+
+def overlaps(boxes):
+    """(n, n) bool: pairs of boxes that intersect (a box never overlaps itself)."""
+    b = np.asarray(boxes, dtype=float)
+    hit = ((b[:, None, 0] < b[None, :, 2]) & (b[None, :, 0] < b[:, None, 2]) &
+           (b[:, None, 1] < b[None, :, 3]) & (b[None, :, 1] < b[:, None, 3]))
+    np.fill_diagonal(hit, False)
+    return hit
+
+def outside(boxes, limit):
+    """(n,) bool: boxes that stick out of the limit box."""
+    b = np.asarray(boxes, dtype=float)
+    return (b[:, 0] < limit[0]) | (b[:, 1] < limit[1]) | (b[:, 2] > limit[2]) | (b[:, 3] > limit[3])
+
+def fit_scale(box, origin, limit):
+    """
+    Largest k <= 1 so the box, scaled by k about origin, lies inside limit
+    (0 when the origin itself is outside).
+    """
+    k = 1.0
+    for lo, hi, o, lim_lo, lim_hi in ((box[0], box[2], origin[0], limit[0], limit[2]), (box[1], box[3], origin[1], limit[1], limit[3])):
+        if not lim_lo <= o <= lim_hi: return 0.0
+        if hi > lim_hi: k = min(k, (lim_hi - o) / (hi - o))
+        if lo < lim_lo: k = min(k, (o - lim_lo) / (o - lo))
+    return k
+
+def separating_scale(box, origin, other):
+    """
+    Largest k <= 1 so the box, scaled by k about origin, no longer meets other
+    (separated along whichever side needs the least shrinking; 0 if none can).
+    """
+    best = 0.0
+    if origin[0] <= other[0] and box[2] > origin[0]: best = max(best, (other[0] - origin[0]) / (box[2] - origin[0]))
+    if origin[0] >= other[2] and box[0] < origin[0]: best = max(best, (origin[0] - other[2]) / (origin[0] - box[0]))
+    if origin[1] <= other[1] and box[3] > origin[1]: best = max(best, (other[1] - origin[1]) / (box[3] - origin[1]))
+    if origin[1] >= other[3] and box[1] < origin[1]: best = max(best, (origin[1] - other[3]) / (origin[1] - box[1]))
+    return min(best, 1.0)
+
+def check(keys, boxes, limits):
+    """
+    Flags placeholder boxes (root units; rows of NaN for empty values) against
+    the page, the machine travel, the safe area and each other. Returns issues.
+    """
+    b = np.asarray(boxes, dtype=float)
+    drawn = ~np.isnan(b).any(axis=1)
+    b = np.where(drawn[:, None], b, 0.0)
+    safe = limits["safe"]
+    # Fast path (nearly every card): all inside the safe area and no two boxes meet
+    if not ((b[:, :2] < safe[:2]) | (b[:, 2:] > safe[2:])).any() and (len(b) < 2 or not overlaps(b)[drawn][:, drawn].any()): return []
+    off_page = outside(b, limits["page"]) & drawn
+    off_travel = outside(b, limits["travel"]) & drawn & ~off_page
+    unsafe = outside(b, limits["safe"]) & drawn & ~off_page & ~off_travel
+    hit = overlaps(b) & drawn[:, None] & drawn[None, :]
+
+    issues = []
+    for i in np.flatnonzero(off_page):
+        issues.append(_issue("error", "off_page", f"{keys[i]} runs off the page.", keys[i]))
+    for i in np.flatnonzero(off_travel):
+        issues.append(_issue("error", "outside_travel", f"{keys[i]} is beyond the machine's travel.", keys[i]))
+    for i in np.flatnonzero(unsafe):
+        issues.append(_issue("warning", "outside_safe_area", f"{keys[i]} reaches into the safe margin.", keys[i]))
+    for i, j in zip(*np.nonzero(np.triu(hit))):
+        issues.append(_issue("error", "overlap", f"{keys[i]} overlaps {keys[j]}.", keys[i]))
+    return issues
+
+def shrink_factors(boxes, origins, limits):
+    """
+    Per-slot scale factors (1 = unchanged) that pull boxes back into the safe area
+    and apart from each other; in an overlap the larger box gives way. Factors
+    below MIN_SHRINK are left at 1 (the row is flagged instead).
+    """
+    b = np.asarray(boxes, dtype=float).copy()
+    o = np.asarray(origins, dtype=float)
+    drawn = ~np.isnan(b).any(axis=1)
+    factors = np.ones(len(b))
+
+    def shrink(i, k):
+        if k < MIN_SHRINK or k >= 1.0: return
+        factors[i] *= k
+        b[i] = np.concatenate([o[i] + (b[i, :2] - o[i]) * k, o[i] + (b[i, 2:] - o[i]) * k])
+
+    for i in np.flatnonzero(drawn & outside(np.nan_to_num(b), limits["safe"])):
+        shrink(i, fit_scale(b[i], o[i], limits["safe"]))
+    hit = overlaps(np.nan_to_num(b)) & drawn[:, None] & drawn[None, :]
+    for i, j in zip(*np.nonzero(np.triu(hit))):
+        if not overlaps(b[[i, j]])[0, 1]: continue   # An earlier shrink already separated them
+        area = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+        big, small = (i, j) if area[i] >= area[j] else (j, i)
+        shrink(big, separating_scale(b[big], o[big], b[small]))
+    return factors
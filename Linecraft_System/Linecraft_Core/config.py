@@ -1,5 +1,7 @@
 # MANUAL SPEED CONFIGURATION
-# Edit this file and restart the server to apply changes.
+# Re-read for every card, so edits apply from the next card on.
+# speed_pendown is the baseline: each card scales it by its own speed profile
+# (speed_profile.py); a project's speed_overrides.json can pin or limit it.
 
 speed_pendown = 25    # Writing speed (1-100)
 speed_penup = 75      # Travel speed (1-100)
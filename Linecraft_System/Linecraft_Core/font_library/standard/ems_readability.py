@@ -226,6 +226,224 @@ CHAR_WIDTHS = {
     'ı': 5.04,
 }
 
+# INK BOUNDING BOXES (x0, y0, x1, y1)
+CHAR_BBOXES = {
+    '!': (3.46, -13.48, 4.40, -0.38),
+    '"': (2.34, -13.86, 5.22, -9.82),
+    '#': (1.07, -12.98, 9.00, -0.32),
+    '$': (1.89, -14.94, 8.12, 1.70),
+    '%': (1.51, -13.42, 15.12, -0.19),
+    '&': (1.39, -13.24, 11.16, -0.32),
+    "'": (2.34, -13.86, 2.46, -9.82),
+    '(': (2.40, -14.36, 4.86, 2.96),
+    ')': (1.26, -14.42, 3.78, 3.02),
+    '*': (1.89, -14.18, 6.42, -9.70),
+    '+': (1.13, -11.08, 9.00, -2.46),
+    ',': (1.64, -1.51, 3.16, 2.40),
+    '-': (1.13, -5.22, 5.22, -5.22),
+    '.': (1.95, -1.45, 2.96, -0.44),
+    '/': (0.88, -14.18, 6.86, 2.84),
+    '0': (1.64, -12.92, 8.32, -0.38),
+    '1': (2.20, -12.72, 8.44, -0.63),
+    '2': (1.51, -12.92, 8.76, -0.63),
+    '3': (1.20, -12.86, 8.26, -0.44),
+    '4': (0.94, -12.60, 8.88, -0.32),
+    '5': (1.20, -12.60, 8.44, -0.32),
+    '6': (1.70, -12.86, 8.50, -0.32),
+    '7': (1.45, -12.66, 8.70, -0.38),
+    '8': (1.58, -12.86, 8.50, -0.32),
+    '9': (1.51, -12.86, 8.32, -0.32),
+    ':': (1.95, -9.08, 2.90, -0.50),
+    ';': (1.64, -9.08, 3.16, 2.40),
+    '<': (1.07, -10.08, 9.00, -3.66),
+    '=': (1.01, -8.82, 9.00, -4.78),
+    '>': (1.13, -10.08, 9.00, -3.66),
+    '?': (1.39, -13.48, 6.80, -0.44),
+    '@': (1.64, -12.48, 15.00, 2.34),
+    'A': (0.82, -13.24, 10.02, -0.32),
+    'B': (2.58, -12.92, 10.34, -0.57),
+    'C': (1.83, -13.16, 10.40, -0.32),
+    'D': (2.64, -12.92, 10.64, -0.63),
+    'E': (2.64, -12.86, 9.32, -0.63),
+    'F': (2.64, -12.86, 9.08, -0.38),
+    'G': (1.76, -13.24, 10.40, -0.38),
+    'H': (2.64, -13.04, 10.64, -0.44),
+    'I': (2.64, -13.04, 2.64, -0.38),
+    'J': (1.58, -13.10, 7.12, -0.32),
+    'K': (2.64, -13.10, 10.58, -0.38),
+    'L': (2.64, -13.10, 8.94, -0.63),
+    'M': (2.58, -13.10, 11.84, -0.32),
+    'N': (2.52, -13.04, 10.46, -0.44),
+    'O': (1.83, -13.24, 11.66, -0.44),
+    'P': (2.64, -12.98, 10.02, -0.32),
+    'Q': (1.76, -13.30, 11.96, 2.46),
+    'R': (2.58, -12.98, 9.90, -0.38),
+    'S': (1.58, -13.24, 9.38, -0.44),
+    'T': (1.13, -12.98, 9.90, -0.44),
+    'U': (2.70, -13.10, 10.58, -0.32),
+    'V': (0.88, -13.10, 9.32, -0.38),
+    'W': (1.32, -13.10, 14.48, -0.38),
+    'X': (1.13, -13.16, 8.94, -0.38),
+    'Y': (0.88, -13.10, 8.50, -0.44),
+    'Z': (1.58, -12.98, 9.82, -0.57),
+    '[': (2.58, -13.98, 5.22, 2.46),
+    '\\': (0.82, -14.12, 6.80, 2.84),
+    ']': (0.88, -14.04, 3.52, 2.40),
+    '^': (2.02, -13.48, 8.00, -6.04),
+    '_': (0.57, 1.64, 10.02, 1.64),
+    '`': (4.40, -14.18, 6.24, -11.72),
+    'a': (1.95, -9.76, 8.12, -0.32),
+    'b': (2.46, -14.36, 9.52, -0.32),
+    'c': (1.76, -9.64, 8.26, -0.38),
+    'd': (1.70, -14.30, 8.82, -0.32),
+    'e': (1.64, -9.70, 8.70, -0.32),
+    'f': (1.20, -14.48, 5.80, -0.38),
+    'g': (1.70, -9.64, 9.32, 4.04),
+    'h': (2.52, -14.30, 8.82, -0.38),
+    'i': (1.95, -13.42, 2.96, -0.32),
+    'j': (-0.19, -13.36, 3.08, 3.90),
+    'k': (2.46, -14.36, 8.70, -0.32),
+    'l': (2.58, -14.30, 3.66, -0.38),
+    'm': (2.46, -9.76, 14.30, -0.32),
+    'n': (2.52, -9.70, 8.76, -0.32),
+    'o': (1.83, -9.70, 9.38, -0.38),
+    'p': (2.46, -9.64, 9.52, 3.90),
+    'q': (1.70, -9.64, 8.76, 3.84),
+    'r': (2.58, -9.64, 6.42, -0.38),
+    's': (1.32, -9.70, 7.24, -0.32),
+    't': (0.94, -12.22, 5.98, -0.44),
+    'u': (2.40, -9.52, 8.50, -0.32),
+    'v': (1.07, -9.70, 8.26, -0.32),
+    'w': (1.20, -9.64, 12.86, -0.19),
+    'x': (1.01, -9.70, 7.74, -0.19),
+    'y': (1.07, -9.58, 8.12, 3.66),
+    'z': (1.26, -9.32, 7.62, -0.63),
+    '{': (1.13, -13.98, 5.30, 2.52),
+    '|': (2.40, -14.80, 2.40, 4.40),
+    '}': (0.88, -14.04, 4.92, 2.46),
+    '~': (1.51, -7.68, 8.56, -5.80),
+    '¡': (2.34, -13.48, 3.28, -0.38),
+    '¢': (1.76, -14.80, 8.26, 4.40),
+    '¥': (0.88, -13.10, 8.50, -0.44),
+    '¦': (4.12, -13.90, 4.12, 1.32),
+    '¨': (3.72, -14.04, 10.00, -13.04),
+    '©': (1.83, -13.24, 11.66, -0.44),
+    'ª': (4.12, -16.86, 7.22, -12.12),
+    '«': (0.68, -8.46, 5.42, 0.15),
+    '®': (1.83, -13.24, 11.66, -0.44),
+    '°': (3.38, -15.30, 6.34, -11.48),
+    '±': (9.98, -12.66, 16.28, -0.40),
+    '²': (3.90, -18.42, 7.52, -12.28),
+    '³': (3.74, -18.40, 7.28, -12.20),
+    '´': (4.20, -15.44, 6.72, -12.04),
+    '·': (3.86, -7.78, 5.06, -6.58),
+    '¹': (4.26, -18.34, 7.38, -12.28),
+    'º': (3.38, -15.30, 6.34, -11.48),
+    '»': (0.76, -8.52, 5.98, 0.20),
+    '¼': (1.32, -15.44, 14.78, 1.58),
+    '½': (1.32, -15.44, 14.70, 1.58),
+    '¾': (0.72, -15.44, 14.78, 1.58),
+    '¿': (1.39, -13.48, 6.80, -0.44),
+    'À': (0.82, -19.84, 10.02, -0.32),
+    'Á': (0.82, -20.01, 10.02, -0.32),
+    'Â': (0.82, -19.98, 10.02, -0.32),
+    'Ã': (0.82, -17.28, 10.02, -0.32),
+    'Ä': (0.82, -18.46, 10.02, -0.32),
+    'Å': (0.82, -20.98, 10.02, -0.32),
+    'È': (2.64, -19.84, 9.32, -0.63),
+    'É': (2.64, -19.48, 9.32, -0.63),
+    'Ê': (2.64, -19.98, 9.32, -0.63),
+    'Ë': (2.64, -18.46, 9.32, -0.63),
+    'Ì': (0.16, -19.84, 2.64, -0.38),
+    'Í': (2.64, -19.96, 5.78, -0.38),
+    'Î': (2.04, -19.98, 5.02, -0.38),
+    'Ï': (0.37, -18.46, 6.12, -0.38),
+    'Ð': (1.13, -12.92, 10.64, -0.63),
+    'Ñ': (2.52, -17.28, 10.46, -0.44),
+    'Ò': (1.83, -19.84, 11.66, -0.44),
+    'Ó': (1.83, -19.24, 11.66, -0.44),
+    'Ô': (1.83, -19.98, 11.66, -0.44),
+    'Õ': (1.83, -17.28, 11.66, -0.44),
+    'Ö': (1.83, -18.46, 11.66, -0.44),
+    '×': (1.01, -9.70, 7.74, -0.19),
+    'Ø': (1.83, -15.98, 11.66, 2.38),
+    'Ù': (2.70, -19.84, 10.58, -0.32),
+    'Ú': (2.70, -19.48, 10.58, -0.32),
+    'Û': (2.70, -19.98, 10.58, -0.32),
+    'Ü': (2.70, -18.46, 10.58, -0.32),
+    'Ý': (0.88, -18.92, 8.50, -0.44),
+    'à': (1.95, -15.44, 8.12, -0.32),
+    'á': (1.95, -16.12, 8.12, -0.32),
+    'â': (1.95, -16.50, 8.12, -0.32),
+    'ã': (1.95, -13.76, 8.12, -0.32),
+    'ä': (1.95, -14.04, 9.54, -0.32),
+    'å': (1.95, -17.20, 8.12, -0.32),
+    'è': (1.64, -15.44, 8.70, -0.32),
+    'é': (1.64, -15.42, 8.70, -0.32),
+    'ê': (1.64, -16.50, 8.70, -0.32),
+    'ë': (1.64, -14.04, 9.24, -0.32),
+    'ì': (0.63, -15.44, 2.52, -0.32),
+    'í': (2.52, -16.10, 5.50, -0.32),
+    'î': (1.32, -16.50, 4.32, -0.32),
+    'ï': (0.63, -14.04, 6.80, -0.32),
+    'ñ': (2.52, -13.76, 8.76, -0.32),
+    'ò': (1.83, -15.44, 9.38, -0.38),
+    'ó': (1.83, -15.30, 9.38, -0.38),
+    'ô': (1.83, -16.50, 9.38, -0.38),
+    'õ': (1.83, -13.76, 9.38, -0.38),
+    'ö': (1.83, -14.04, 9.76, -0.38),
+    '÷': (2.56, -10.90, 11.76, -3.60),
+    'ø': (1.83, -10.80, 9.38, 1.10),
+    'ù': (2.40, -15.44, 8.50, -0.32),
+    'ú': (2.40, -15.22, 8.50, -0.32),
+    'û': (2.40, -16.50, 8.50, -0.32),
+    'ü': (2.40, -14.04, 9.64, -0.32),
+    'ý': (1.07, -15.90, 8.12, 3.66),
+    'ÿ': (1.07, -14.04, 8.90, 3.66),
+    '–': (1.70, -5.22, 7.84, -5.22),
+    '—': (2.26, -5.22, 10.46, -5.22),
+    '“': (2.56, -13.90, 6.20, -11.68),
+    '”': (1.70, -13.90, 5.36, -11.68),
+    '‹': (0.68, -8.46, 2.90, 0.15),
+    '›': (0.76, -8.52, 3.46, 0.20),
+    '€': (1.13, -13.16, 10.40, -0.32),
+    'Ÿ': (0.88, -18.46, 8.50, -0.44),
+    'Ă': (0.82, -21.32, 10.02, -0.32),
+    'Ĕ': (2.64, -21.32, 9.32, -0.63),
+    'Ğ': (1.76, -21.32, 10.40, -0.38),
+    'Ĭ': (0.51, -21.32, 6.52, -0.38),
+    'Ŏ': (1.83, -21.32, 11.66, -0.44),
+    'Ŭ': (2.70, -21.32, 10.58, -0.32),
+    'ă': (1.95, -17.32, 8.92, -0.32),
+    'ĕ': (1.64, -17.32, 8.82, -0.32),
+    'ğ': (1.70, -17.32, 9.32, 4.04),
+    'ĭ': (1.21, -17.32, 7.22, -0.32),
+    'ŏ': (1.83, -17.32, 9.38, -0.38),
+    'ŭ': (2.40, -17.32, 9.14, -0.32),
+    'Ć': (1.83, -19.14, 10.40, -0.32),
+    'ć': (1.76, -15.64, 8.26, -0.38),
+    'Đ': (1.13, -12.92, 10.64, -0.63),
+    'đ': (1.70, -14.30, 10.90, -0.32),
+    'Č': (1.83, -19.10, 10.40, -0.32),
+    'č': (1.76, -15.58, 8.26, -0.38),
+    'Š': (1.58, -19.10, 9.38, -0.44),
+    'š': (1.32, -15.58, 7.24, -0.32),
+    'Ž': (1.58, -19.10, 9.82, -0.57),
+    'ž': (1.26, -15.58, 7.62, -0.63),
+    '¸': (6.78, -0.32, 8.08, 2.15),
+    'Æ': (1.02, -13.24, 15.00, -0.32),
+    'ç': (1.76, -9.64, 8.26, 1.39),
+    '£': (1.13, -13.10, 8.94, -0.63),
+    'ş': (1.32, -9.70, 7.24, 2.12),
+    'Ş': (1.58, -13.24, 9.41, 2.02),
+    'İ': (2.09, -15.62, 3.10, -0.38),
+    'ß': (2.58, -13.75, 10.16, -0.56),
+    'æ': (1.92, -9.73, 15.13, -0.37),
+    '˘': (2.01, -9.32, 8.02, -5.88),
+    'Ç': (1.83, -13.16, 10.40, 2.15),
+    'ı': (2.52, -9.58, 2.52, -0.32),
+}
+
 # GLYPH PATHS
 STATIC_FONT = {
     '!': 'M 3.90 -13.48 L 3.90 -3.84 M 3.46 -1.39 L 3.46 -0.38 L 4.40 -0.38 L 4.40 -1.39 L 3.46 -1.39',
@@ -408,18 +626,18 @@ STATIC_FONT = {
     '›': 'M 1.23 0.20 L 3.46 -4.78 L 0.76 -8.52',
     '€': 'M 10.40 -1.95 L 9.08 -0.94 L 7.30 -0.32 L 5.54 -0.57 L 3.90 -1.45 L 2.64 -2.96 L 2.02 -4.54 L 1.83 -6.92 L 2.02 -9.14 L 2.84 -10.96 L 4.10 -12.34 L 5.54 -13.04 L 7.18 -13.16 L 8.64 -12.86 L 9.64 -12.22 L 9.96 -11.84 M 1.13 -3.96 L 5.22 -3.96 M 1.13 -6.48 L 5.22 -6.48',
     'Ÿ': 'M 0.88 -13.10 L 4.72 -5.48 L 4.72 -0.44 L 4.72 -5.54 L 8.50 -13.04 M 2.26 -18.46 L 2.26 -17.46 L 3.26 -17.46 L 3.26 -18.46 L 2.26 -18.46 M 7.32 -18.46 L 7.32 -17.46 L 8.34 -17.46 L 8.34 -18.46 L 7.32 -18.46',
-    'Ă': 'M 0.82 -0.32 L 5.54 -13.24 L 8.32 -5.10 L 2.64 -5.10 L 8.32 -5.10 L 10.02 -0.32 M454 1064C454 21.28 -9.53 17.89 -6.12 894C135.645 17.87 -3.10 21.32 -3.10 21.32',
-    'Ĕ': 'M 9.32 -0.63 L 2.64 -0.63 L 2.64 -7.12 L 8.20 -7.12 L 2.64 -7.12 L 2.64 -12.86 L 9.08 -12.86 M451 1064C451 21.28 -9.47 17.89 -6.06 894C132.645 17.87 -3.04 21.32 -3.04 21.32',
-    'Ğ': 'M 6.92 -6.30 L 10.40 -6.30 L 10.40 -1.64 L 9.58 -1.07 L 7.82 -0.44 L 6.56 -0.38 L 5.30 -0.63 L 4.16 -1.26 L 2.84 -2.78 L 1.95 -4.66 L 1.76 -6.86 L 2.02 -9.00 L 2.84 -10.90 L 4.16 -12.34 L 5.48 -12.98 L 7.00 -13.24 L 8.64 -12.98 L 9.64 -12.42 L 10.34 -11.84 M478 1064C478 21.28 -10.01 17.89 -6.60 894C159.645 17.87 -3.58 21.32 -3.58 21.32',
-    'Ĭ': 'M 2.64 -0.38 L 2.64 -13.04 M325 1064C325 21.28 -6.95 17.89 -3.54 894C6.64453 17.87 -0.52 21.32 -0.52 21.32',
-    'Ŏ': 'M 6.68 -0.44 L 8.32 -0.69 L 9.96 -1.76 L 11.08 -3.46 L 11.66 -5.68 L 11.66 -7.74 L 11.34 -9.44 L 10.72 -10.84 L 9.70 -12.16 L 8.32 -12.98 L 6.92 -13.24 L 5.74 -13.04 L 4.40 -12.54 L 3.16 -11.46 L 2.20 -9.64 L 1.89 -8.20 L 1.83 -6.04 L 2.08 -4.40 L 2.70 -2.90 L 3.60 -1.70 L 4.60 -0.88 L 5.68 -0.50 L 6.68 -0.44 M495 1064C495 21.28 -10.35 17.89 -6.94 894C176.645 17.87 -3.92 21.32 -3.92 21.32',
-    'Ŭ': 'M 2.70 -13.10 L 2.70 -4.34 L 2.90 -3.22 L 3.46 -2.02 L 4.22 -1.20 L 5.36 -0.57 L 6.42 -0.32 L 7.74 -0.50 L 9.08 -1.20 L 10.02 -2.34 L 10.46 -3.34 L 10.58 -4.72 L 10.58 -13.04 M490 1064C490 21.28 -10.25 17.89 -6.84 894C171.645 17.87 -3.82 21.32 -3.82 21.32',
-    'ă': 'M 2.34 -8.56 L 3.66 -9.32 L 4.78 -9.64 L 5.92 -9.76 L 6.80 -9.44 L 7.56 -8.76 L 8.06 -7.74 L 8.12 -6.36 L 8.12 -2.14 L 8.12 -0.44 L 8.06 -2.14 L 7.24 -1.58 L 6.36 -0.94 L 5.36 -0.50 L 4.22 -0.32 L 3.28 -0.63 L 2.52 -1.13 L 1.95 -1.95 L 1.95 -3.16 L 2.40 -4.10 L 3.40 -4.92 L 4.40 -5.30 L 5.60 -5.68 L 6.74 -5.86 L 7.44 -5.92 L 8.00 -5.92 M445 864C445 17.28 -9.35 13.89 -5.94 694C126.645 13.87 -2.92 17.32 -2.92 17.32',
-    'ĕ': 'M 1.76 -5.30 L 8.70 -5.30 L 8.70 -6.42 L 8.38 -7.88 L 7.44 -9.00 L 6.48 -9.64 L 5.16 -9.70 L 3.84 -9.32 L 2.70 -8.38 L 2.26 -7.44 L 1.76 -6.24 L 1.64 -4.98 L 1.95 -3.46 L 2.52 -2.08 L 3.66 -0.94 L 4.72 -0.44 L 6.04 -0.32 L 7.18 -0.63 L 8.26 -1.20 M440 864C440 17.28 -9.25 13.89 -5.84 694C121.645 13.87 -2.82 17.32 -2.82 17.32',
-    'ğ': 'M 3.40 -0.82 L 2.46 0.06 L 1.83 1.13 L 1.70 2.26 L 2.58 3.22 L 4.04 3.84 L 5.74 4.04 L 7.24 3.66 L 8.76 2.64 L 9.32 1.70 L 9.26 0.63 L 8.70 -0.38 L 7.30 -0.76 L 3.46 -0.76 L 2.64 -1.32 L 2.26 -2.20 L 2.46 -3.02 L 3.52 -4.22 L 4.22 -3.78 L 5.30 -3.60 L 6.62 -4.04 L 7.56 -4.92 L 8.00 -5.98 L 8.00 -7.24 L 7.50 -8.38 L 7.12 -8.88 L 6.24 -9.44 L 9.26 -9.44 L 6.24 -9.44 L 5.30 -9.64 L 3.84 -9.52 L 2.84 -8.70 L 2.26 -7.56 L 2.20 -6.30 L 2.46 -5.30 L 2.96 -4.66 L 3.52 -4.16 M442 864C442 17.28 -9.29 13.89 -5.88 694C123.645 13.87 -2.86 17.32 -2.86 17.32',
-    'ĭ': 'M 2.52 -0.32 L 2.52 -9.58 M360 864C360 17.28 -7.65 13.89 -4.24 694C41.6445 13.87 -1.22 17.32 -1.22 17.32',
-    'ŏ': 'M 5.74 -0.38 L 5.80 -0.38 L 7.06 -0.69 L 8.26 -1.51 L 9.00 -2.78 L 9.32 -4.16 L 9.38 -5.48 L 9.20 -6.68 L 8.76 -7.74 L 8.12 -8.56 L 7.24 -9.32 L 6.30 -9.64 L 5.42 -9.70 L 4.40 -9.52 L 3.46 -8.94 L 2.64 -8.00 L 2.20 -7.12 L 1.83 -5.80 L 1.83 -4.78 L 1.95 -3.60 L 2.26 -2.52 L 3.02 -1.51 L 3.90 -0.82 L 4.86 -0.44 L 5.74 -0.38 M458 864C458 17.28 -9.61 13.89 -6.20 694C139.645 13.87 -3.18 17.32 -3.18 17.32',
-    'ŭ': 'M 8.50 -9.52 L 8.50 -0.38 L 8.50 -2.78 L 7.82 -1.95 L 7.00 -1.13 L 5.86 -0.50 L 4.78 -0.32 L 3.66 -0.63 L 2.90 -1.26 L 2.46 -2.08 L 2.40 -3.66 L 2.40 -9.52 M456 864C456 17.28 -9.57 13.89 -6.16 694C137.645 13.87 -3.14 17.32 -3.14 17.32',
+    'Ă': 'M 0.82 -0.32 L 5.54 -13.24 L 8.32 -5.10 L 2.64 -5.10 L 8.32 -5.10 L 10.02 -0.32 M 9.08 -21.28 C 9.08 -21.28 9.53 -17.89 6.12 -17.88 C 2.71 -17.87 3.10 -21.32 3.10 -21.32',
+    'Ĕ': 'M 9.32 -0.63 L 2.64 -0.63 L 2.64 -7.12 L 8.20 -7.12 L 2.64 -7.12 L 2.64 -12.86 L 9.08 -12.86 M 9.02 -21.28 C 9.02 -21.28 9.47 -17.89 6.06 -17.88 C 2.65 -17.87 3.04 -21.32 3.04 -21.32',
+    'Ğ': 'M 6.92 -6.30 L 10.40 -6.30 L 10.40 -1.64 L 9.58 -1.07 L 7.82 -0.44 L 6.56 -0.38 L 5.30 -0.63 L 4.16 -1.26 L 2.84 -2.78 L 1.95 -4.66 L 1.76 -6.86 L 2.02 -9.00 L 2.84 -10.90 L 4.16 -12.34 L 5.48 -12.98 L 7.00 -13.24 L 8.64 -12.98 L 9.64 -12.42 L 10.34 -11.84 M 9.56 -21.28 C 9.56 -21.28 10.01 -17.89 6.60 -17.88 C 3.19 -17.87 3.58 -21.32 3.58 -21.32',
+    'Ĭ': 'M 2.64 -0.38 L 2.64 -13.04 M 6.50 -21.28 C 6.50 -21.28 6.95 -17.89 3.54 -17.88 C 0.13 -17.87 0.52 -21.32 0.52 -21.32',
+    'Ŏ': 'M 6.68 -0.44 L 8.32 -0.69 L 9.96 -1.76 L 11.08 -3.46 L 11.66 -5.68 L 11.66 -7.74 L 11.34 -9.44 L 10.72 -10.84 L 9.70 -12.16 L 8.32 -12.98 L 6.92 -13.24 L 5.74 -13.04 L 4.40 -12.54 L 3.16 -11.46 L 2.20 -9.64 L 1.89 -8.20 L 1.83 -6.04 L 2.08 -4.40 L 2.70 -2.90 L 3.60 -1.70 L 4.60 -0.88 L 5.68 -0.50 L 6.68 -0.44 M 9.90 -21.28 C 9.90 -21.28 10.35 -17.89 6.94 -17.88 C 3.53 -17.87 3.92 -21.32 3.92 -21.32',
+    'Ŭ': 'M 2.70 -13.10 L 2.70 -4.34 L 2.90 -3.22 L 3.46 -2.02 L 4.22 -1.20 L 5.36 -0.57 L 6.42 -0.32 L 7.74 -0.50 L 9.08 -1.20 L 10.02 -2.34 L 10.46 -3.34 L 10.58 -4.72 L 10.58 -13.04 M 9.80 -21.28 C 9.80 -21.28 10.25 -17.89 6.84 -17.88 C 3.43 -17.87 3.82 -21.32 3.82 -21.32',
+    'ă': 'M 2.34 -8.56 L 3.66 -9.32 L 4.78 -9.64 L 5.92 -9.76 L 6.80 -9.44 L 7.56 -8.76 L 8.06 -7.74 L 8.12 -6.36 L 8.12 -2.14 L 8.12 -0.44 L 8.06 -2.14 L 7.24 -1.58 L 6.36 -0.94 L 5.36 -0.50 L 4.22 -0.32 L 3.28 -0.63 L 2.52 -1.13 L 1.95 -1.95 L 1.95 -3.16 L 2.40 -4.10 L 3.40 -4.92 L 4.40 -5.30 L 5.60 -5.68 L 6.74 -5.86 L 7.44 -5.92 L 8.00 -5.92 M 8.90 -17.28 C 8.90 -17.28 9.35 -13.89 5.94 -13.88 C 2.53 -13.87 2.92 -17.32 2.92 -17.32',
+    'ĕ': 'M 1.76 -5.30 L 8.70 -5.30 L 8.70 -6.42 L 8.38 -7.88 L 7.44 -9.00 L 6.48 -9.64 L 5.16 -9.70 L 3.84 -9.32 L 2.70 -8.38 L 2.26 -7.44 L 1.76 -6.24 L 1.64 -4.98 L 1.95 -3.46 L 2.52 -2.08 L 3.66 -0.94 L 4.72 -0.44 L 6.04 -0.32 L 7.18 -0.63 L 8.26 -1.20 M 8.80 -17.28 C 8.80 -17.28 9.25 -13.89 5.84 -13.88 C 2.43 -13.87 2.82 -17.32 2.82 -17.32',
+    'ğ': 'M 3.40 -0.82 L 2.46 0.06 L 1.83 1.13 L 1.70 2.26 L 2.58 3.22 L 4.04 3.84 L 5.74 4.04 L 7.24 3.66 L 8.76 2.64 L 9.32 1.70 L 9.26 0.63 L 8.70 -0.38 L 7.30 -0.76 L 3.46 -0.76 L 2.64 -1.32 L 2.26 -2.20 L 2.46 -3.02 L 3.52 -4.22 L 4.22 -3.78 L 5.30 -3.60 L 6.62 -4.04 L 7.56 -4.92 L 8.00 -5.98 L 8.00 -7.24 L 7.50 -8.38 L 7.12 -8.88 L 6.24 -9.44 L 9.26 -9.44 L 6.24 -9.44 L 5.30 -9.64 L 3.84 -9.52 L 2.84 -8.70 L 2.26 -7.56 L 2.20 -6.30 L 2.46 -5.30 L 2.96 -4.66 L 3.52 -4.16 M 8.84 -17.28 C 8.84 -17.28 9.29 -13.89 5.88 -13.88 C 2.47 -13.87 2.86 -17.32 2.86 -17.32',
+    'ĭ': 'M 2.52 -0.32 L 2.52 -9.58 M 7.20 -17.28 C 7.20 -17.28 7.65 -13.89 4.24 -13.88 C 0.83 -13.87 1.22 -17.32 1.22 -17.32',
+    'ŏ': 'M 5.74 -0.38 L 5.80 -0.38 L 7.06 -0.69 L 8.26 -1.51 L 9.00 -2.78 L 9.32 -4.16 L 9.38 -5.48 L 9.20 -6.68 L 8.76 -7.74 L 8.12 -8.56 L 7.24 -9.32 L 6.30 -9.64 L 5.42 -9.70 L 4.40 -9.52 L 3.46 -8.94 L 2.64 -8.00 L 2.20 -7.12 L 1.83 -5.80 L 1.83 -4.78 L 1.95 -3.60 L 2.26 -2.52 L 3.02 -1.51 L 3.90 -0.82 L 4.86 -0.44 L 5.74 -0.38 M 9.16 -17.28 C 9.16 -17.28 9.61 -13.89 6.20 -13.88 C 2.79 -13.87 3.18 -17.32 3.18 -17.32',
+    'ŭ': 'M 8.50 -9.52 L 8.50 -0.38 L 8.50 -2.78 L 7.82 -1.95 L 7.00 -1.13 L 5.86 -0.50 L 4.78 -0.32 L 3.66 -0.63 L 2.90 -1.26 L 2.46 -2.08 L 2.40 -3.66 L 2.40 -9.52 M 9.12 -17.28 C 9.12 -17.28 9.57 -13.89 6.16 -13.88 C 2.75 -13.87 3.14 -17.32 3.14 -17.32',
     'Ć': 'M 10.40 -1.95 L 9.08 -0.94 L 7.30 -0.32 L 5.54 -0.57 L 3.90 -1.45 L 2.64 -2.96 L 2.02 -4.54 L 1.83 -6.92 L 2.02 -9.14 L 2.84 -10.96 L 4.10 -12.34 L 5.54 -13.04 L 7.18 -13.16 L 8.64 -12.86 L 9.64 -12.22 L 9.96 -11.84 M 9.28 -19.14 L 6.76 -15.74',
     'ć': 'M 8.26 -1.45 L 7.24 -0.69 L 5.74 -0.38 L 4.34 -0.57 L 2.90 -1.51 L 2.08 -2.84 L 1.76 -4.40 L 1.76 -6.04 L 2.26 -7.56 L 3.28 -8.76 L 4.48 -9.44 L 5.80 -9.64 L 6.92 -9.44 L 7.68 -9.08 L 8.00 -8.70 M 7.36 -15.64 L 4.84 -12.24',
     'Đ': 'M 1.13 -5.22 L 5.22 -5.22 M 2.64 -0.63 L 2.64 -12.92 L 6.18 -12.92 L 7.62 -12.54 L 8.70 -11.96 L 9.44 -11.22 L 10.34 -9.76 L 10.64 -8.12 L 10.64 -7.12 L 10.58 -5.80 L 10.40 -4.28 L 9.90 -3.22 L 9.00 -1.89 L 7.62 -1.07 L 6.30 -0.69 L 5.30 -0.63 L 2.70 -0.63',
@@ -430,16 +648,16 @@ STATIC_FONT = {
     'š': 'M 1.32 -1.58 L 2.46 -0.82 L 3.72 -0.44 L 4.72 -0.32 L 5.98 -0.76 L 6.92 -1.51 L 7.24 -2.64 L 7.00 -3.78 L 5.86 -4.72 L 4.28 -5.36 L 2.84 -5.98 L 2.02 -6.80 L 1.83 -7.74 L 2.14 -8.64 L 3.16 -9.52 L 4.40 -9.70 L 5.68 -9.44 L 6.74 -8.82 M 5.68 -15.50 L 4.48 -12.60 L 3.28 -15.58',
     'Ž': 'M 2.02 -12.98 L 9.58 -12.98 L 1.58 -0.57 L 9.82 -0.57 M 7.20 -19.02 L 6.02 -16.12 L 4.82 -19.10',
     'ž': 'M 1.58 -9.32 L 7.18 -9.32 L 1.26 -0.63 L 7.62 -0.63 M 5.66 -15.50 L 4.48 -12.60 L 3.26 -15.58',
-    '¸': 'M365 15.8L352.244 -43.9029C438.734 -0.95 -8.10 -2.15 -6.78 -2.15',
-    'Æ': 'M750 16.0697L416 16.0697L416 356.946L694 356.946L416 356.946L416 658.43L738 658.43M51 15.8L407 662M412 255L188 5.10',
-    'ç': 'M277.713 19.6017L268.483 -23.6662C331.07 -0.53 -6.14 -1.39 -5.18 -69.6599M413 72.4L362 34.6L287 18.9L217 28.4L145 75.6L104 142L88.2 220L88.2 302L113 378L164 438L224 472L290 482L346 472L384 454L400 8.70',
-    '£': 'M56.7 261L261 261M447 31.5L132 31.5L132 390.08C132 11.19 -3.08 13.04 -5.32 655C377.686 13.16 -7.60 9.32 -7.60 9.32',
-    'ş': 'M210.917 17.3677L198.161 -42.3352C284.65 -0.92 -5.02 -2.12 -3.70 -105.799M66.1 78.8C66.1 1.58 -2.06 1.01 -2.46 40.9C184.246 0.29 -4.84 0.13 -5.98 37.8C317.514 0.96 -6.70 1.18 -6.92 75.6C356.946 1.84 -7.23 2.25 -7.24 132C362.671 3.03 -7.23 3.40 -7.00 189C338.596 4.16 -6.32 4.45 -5.86 236C270.216 4.99 -4.78 5.15 -4.28 268C188.837 5.57 -3.22 5.72 -2.84 299C123.19 6.24 -2.19 6.49 -2.02 340C92.6357 7.11 -1.81 7.42 -1.83 387C92.4525 8.06 -1.92 8.32 -2.14 432C117.763 8.96 -2.77 9.34 -3.16 476C177.713 9.70 -3.97 9.71 -4.40 485C241.318 9.69 -5.29 9.59 -5.68 472C303.728 9.29 -6.74 8.82 -6.74 8.82',
-    'Ş': 'M265.211 21.9982L252.455 -37.7048C338.945 -0.83 -6.11 -2.02 -4.79 -101.169M78.8 107C78.8 2.14 -2.29 1.49 -2.64 63C149.613 1.03 -3.28 0.89 -3.66 37.8C202.112 0.63 -4.47 0.56 -4.92 25.2C268.555 0.45 -5.84 0.35 -6.36 22.1C343.816 0.53 -7.50 0.80 -7.94 53.6C419.125 1.35 -8.75 1.64 -9.00 101C462.256 2.40 -9.33 2.88 -9.38 164C471.426 3.68 -9.44 4.01 -9.32 220C460.053 4.79 -8.99 5.17 -8.64 277C414.257 5.91 -7.85 6.12 -7.18 324C325.565 6.84 -5.27 7.26 -4.60 381C196.745 7.98 -3.52 8.22 -3.16 428C139.833 8.90 -2.54 9.18 -2.40 479C112.88 9.98 -2.27 10.40 -2.34 542C120.488 11.28 -2.51 11.76 -2.84 608C158.482 12.56 -3.79 12.87 -4.28 652C238.323 13.21 -5.22 13.23 -5.68 662C306.843 13.25 -6.61 13.21 -7.00 655C369.559 12.99 -7.67 12.80 -8.00 630C416.251 12.40 -8.94 11.90 -8.94 11.90',
-    'İ': 'M104.392 781.214L104.392 731.214L154.792 731.214L154.792 781.214L104.392 781.214M132 18.9L132 13.04',
-    'ß': 'M128.918 28.2089L128.918 500.195C133.235 12.27 -3.85 13.75 -5.67 687.629C375.077 13.75 -8.10 12.76 -8.10 574.009C405.098 9.92 -5.96 8.77 -5.96 367.029C297.916 5.38 -10.16 6.23 -10.16 168.838C507.844 0.53 -5.74 -0.06 -4.47 1.32',
-    'æ': 'M408.2 265L755 265C765.272 7.47 -14.22 9.68 -12.01 483.943C489.421 9.68 -8.26 7.99 -8.14 287.65C401.45 3.52 -8.63 2.19 -9.98 55.9455C566.888 0.05 -13.24 0.30 -14.66 59.9M117 428C171.592 9.37 -4.20 9.75 -5.73 486.382C362.717 9.71 -8.13 8.29 -8.11 364.352L403 297C317.682 5.81 -5.50 5.86 -3.63 250.044C87.7849 4.15 -1.17 1.58 -3.15 33.9266C256.479 -0.22 -6.58 1.02 -8.06 107L431.24 2.61',
-    '˘': 'M400 464C400 9.28 -8.45 5.89 -5.04 294C81.6445 5.87 -2.02 9.32 -2.02 9.32',
-    'Ç': 'M365 15.8L352.244 -43.9029C438.734 -0.95 -8.10 -2.15 -6.78 -107.367M520 97.6L454 47.2L365 15.8L277 28.4L195 72.4L132 148L101 227L91.4 346L101 457L142 548L205 617L277 652L359 658L432 643L482 611L498 11.84',
-    'ı': 'M126 15.8L126 9.58',
+    '¸': 'M 7.30 -0.32 L 7.04 0.88 C 8.77 0.95 8.10 2.15 6.78 2.15',
+    'Æ': 'M 15.00 -0.32 L 8.32 -0.32 L 8.32 -7.14 L 13.88 -7.14 L 8.32 -7.14 L 8.32 -13.17 L 14.76 -13.17 M 1.02 -0.32 L 8.14 -13.24 M 8.24 -5.10 L 3.76 -5.10',
+    'ç': 'M 5.55 -0.39 L 5.37 0.47 C 6.62 0.53 6.14 1.39 5.18 1.39 M 8.26 -1.45 L 7.24 -0.69 L 5.74 -0.38 L 4.34 -0.57 L 2.90 -1.51 L 2.08 -2.84 L 1.76 -4.40 L 1.76 -6.04 L 2.26 -7.56 L 3.28 -8.76 L 4.48 -9.44 L 5.80 -9.64 L 6.92 -9.44 L 7.68 -9.08 L 8.00 -8.70',
+    '£': 'M 1.13 -5.22 L 5.22 -5.22 M 8.94 -0.63 L 2.64 -0.63 L 2.64 -7.80 C 2.64 -11.19 3.08 -13.04 5.32 -13.10 C 7.55 -13.16 7.60 -9.32 7.60 -9.32',
+    'ş': 'M 4.22 -0.35 L 3.96 0.85 C 5.69 0.92 5.02 2.12 3.70 2.12 M 1.32 -1.58 C 1.32 -1.58 2.06 -1.01 2.46 -0.82 C 3.68 -0.29 4.84 -0.13 5.98 -0.76 C 6.35 -0.96 6.70 -1.18 6.92 -1.51 C 7.14 -1.84 7.23 -2.25 7.24 -2.64 C 7.25 -3.03 7.23 -3.40 7.00 -3.78 C 6.77 -4.16 6.32 -4.45 5.86 -4.72 C 5.40 -4.99 4.78 -5.15 4.28 -5.36 C 3.78 -5.57 3.22 -5.72 2.84 -5.98 C 2.46 -6.24 2.19 -6.49 2.02 -6.80 C 1.85 -7.11 1.81 -7.42 1.83 -7.74 C 1.85 -8.06 1.92 -8.32 2.14 -8.64 C 2.36 -8.96 2.77 -9.34 3.16 -9.52 C 3.55 -9.70 3.97 -9.71 4.40 -9.70 C 4.83 -9.69 5.29 -9.59 5.68 -9.44 C 6.07 -9.29 6.74 -8.82 6.74 -8.82',
+    'Ş': 'M 5.30 -0.44 L 5.05 0.75 C 6.78 0.83 6.11 2.02 4.79 2.02 M 1.58 -2.14 C 1.58 -2.14 2.29 -1.49 2.64 -1.26 C 2.99 -1.03 3.28 -0.89 3.66 -0.76 C 4.04 -0.63 4.47 -0.56 4.92 -0.50 C 5.37 -0.45 5.84 -0.35 6.36 -0.44 C 6.88 -0.53 7.50 -0.80 7.94 -1.07 C 8.38 -1.35 8.75 -1.64 9.00 -2.02 C 9.25 -2.40 9.33 -2.88 9.38 -3.28 C 9.43 -3.68 9.44 -4.01 9.32 -4.40 C 9.20 -4.79 8.99 -5.17 8.64 -5.54 C 8.29 -5.91 7.85 -6.12 7.18 -6.48 C 6.51 -6.84 5.27 -7.26 4.60 -7.62 C 3.93 -7.98 3.52 -8.22 3.16 -8.56 C 2.80 -8.90 2.54 -9.18 2.40 -9.58 C 2.26 -9.98 2.27 -10.40 2.34 -10.84 C 2.41 -11.28 2.51 -11.76 2.84 -12.16 C 3.17 -12.56 3.79 -12.87 4.28 -13.04 C 4.77 -13.21 5.22 -13.23 5.68 -13.24 C 6.14 -13.25 6.61 -13.21 7.00 -13.10 C 7.39 -12.99 7.67 -12.80 8.00 -12.60 C 8.33 -12.40 8.94 -11.90 8.94 -11.90',
+    'İ': 'M 2.09 -15.62 L 2.09 -14.62 L 3.10 -14.62 L 3.10 -15.62 L 2.09 -15.62 M 2.64 -0.38 L 2.64 -13.04',
+    'ß': 'M 2.58 -0.56 L 2.58 -10.00 C 2.66 -12.27 3.85 -13.75 5.67 -13.75 C 7.50 -13.75 8.10 -12.76 8.10 -11.48 C 8.10 -9.92 5.96 -8.77 5.96 -7.34 C 5.96 -5.38 10.16 -6.23 10.16 -3.38 C 10.16 -0.53 5.74 0.06 4.47 -1.32',
+    'æ': 'M 8.16 -5.30 L 15.10 -5.30 C 15.31 -7.47 14.22 -9.68 12.01 -9.68 C 9.79 -9.68 8.26 -7.99 8.14 -5.75 C 8.03 -3.52 8.63 -2.19 9.98 -1.12 C 11.34 -0.05 13.24 -0.30 14.66 -1.20 M 2.34 -8.56 C 3.43 -9.37 4.20 -9.75 5.73 -9.73 C 7.25 -9.71 8.13 -8.29 8.11 -7.29 L 8.06 -5.94 C 6.35 -5.81 5.50 -5.86 3.63 -5.00 C 1.76 -4.15 1.17 -1.58 3.15 -0.68 C 5.13 0.22 6.58 -1.02 8.06 -2.14 L 8.62 -2.61',
+    '˘': 'M 8.00 -9.28 C 8.00 -9.28 8.45 -5.89 5.04 -5.88 C 1.63 -5.87 2.02 -9.32 2.02 -9.32',
+    'Ç': 'M 7.30 -0.32 L 7.04 0.88 C 8.77 0.95 8.10 2.15 6.78 2.15 M 10.40 -1.95 L 9.08 -0.94 L 7.30 -0.32 L 5.54 -0.57 L 3.90 -1.45 L 2.64 -2.96 L 2.02 -4.54 L 1.83 -6.92 L 2.02 -9.14 L 2.84 -10.96 L 4.10 -12.34 L 5.54 -13.04 L 7.18 -13.16 L 8.64 -12.86 L 9.64 -12.22 L 9.96 -11.84',
+    'ı': 'M 2.52 -0.32 L 2.52 -9.58',
 }
@@ -0,0 +1,160 @@
+import os
+import threading
+import importlib.util
+from collections import Counter
+
+import svg_geometry
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FONT_LIB_PATH = os.path.join(BASE_DIR, "font_library")
+# Search order matters: Variable fonts shadow Standard fonts of the same name
+FONT_FOLDERS = [("variable", "Variable"), ("standard", "Standard")]
+FALLBACK_CHAR = '?'
+
+class LoadedFont:
+    """
+    A font module flattened into ready-to-use glyph variants:
+    glyphs[char] = [(path_d, advance_width, ink_length), ...]
+    """
+    def __init__(self, name, kind, module, mtime):
+        self.name = name
+        self.kind = kind
+        self.mtime = mtime
+        self.line_height = float(getattr(module, 'LINE_HEIGHT_MM', 30.0))
+        self.space_width = float(getattr(module, 'SPACE_WIDTH_MM', 10.0))
+        self.default_width = float(getattr(module, 'CHAR_WIDTH_MM', 18.0))
+        self.bboxes = dict(getattr(module, 'CHAR_BBOXES', {}))
+
+        widths = getattr(module, 'CHAR_WIDTHS', {})
+        self.glyphs = {}
+        lengths = {}
+        for char, raw_data in getattr(module, 'STATIC_FONT', {}).items():
+            options = raw_data if isinstance(raw_data, list) else [raw_data]
+            variants = []
+            for choice in options:
+                if isinstance(choice, (tuple, list)): path_d, width = choice[0], float(choice[1])
+                else: path_d, width = choice, float(widths.get(char, self.default_width))
+                if not path_d: continue
+                if path_d not in lengths: lengths[path_d] = path_length(path_d)
+                variants.append((path_d, width, lengths[path_d]))
+            if variants: self.glyphs[char] = variants
+
+        self.has_variation = any(len(v) > 1 for v in self.glyphs.values())
+        all_widths = [w for v in self.glyphs.values() for _, w, _ in v]
+        self.avg_width = (sum(all_widths) / len(all_widths)) if all_widths else self.default_width
+
+    def variants(self, char):
+        """Glyph variants for a char, falling back to '?' (None if neither exists)."""
+        return self.glyphs.get(char) or self.glyphs.get(FALLBACK_CHAR)
+
+    def supports(self, char):
+        return char in self.glyphs or char.isspace()
+
+    def missing_chars(self, text):
+        return {c for c in text if not self.supports(c)}
+
+    def metadata(self):
+        return {
+            "name": self.name,
+            "type": self.kind,
+            "glyph_count": len(self.glyphs),
+            "coverage": "".join(sorted(self.glyphs)),
+            "line_height": self.line_height,
+            "space_width": self.space_width,
+            "avg_width": round(self.avg_width, 3),
+            "variable": self.has_variation,
+        }
+
+def path_length(d_string):
+    """Exact pen-down length of a glyph path (curves flattened finely)."""
+    return sum(svg_geometry.polyline_length(s) for s in svg_geometry.path_to_polylines(d_string, tolerance=0.01))
+
+class FontRegistry:
+    """
+    Indexes the font library once and keeps loaded fonts in memory.
+    Folder and file mtimes are re-checked on access, so newly imported or
+    re-converted fonts are picked up without a server restart.
+    """
+    def __init__(self, root=FONT_LIB_PATH):
+        self.root = root
+        self._lock = threading.RLock()
+        self._index = {}        # name -> (kind, path)
+        self._folder_mtimes = {}
+        self._fonts = {}        # name -> LoadedFont
+
+    def refresh(self, force=False):
+        with self._lock:
+            mtimes = {}
+            for folder, _ in FONT_FOLDERS:
+                path = os.path.join(self.root, folder)
+                try: mtimes[folder] = os.stat(path).st_mtime_ns
+                except OSError: mtimes[folder] = None
+            if not force and mtimes == self._folder_mtimes: return
+
+            index = {}
+            for folder, kind in reversed(FONT_FOLDERS):
+                path = os.path.join(self.root, folder)
+                if mtimes[folder] is None: continue
+                for f in sorted(os.listdir(path)):
+                    if f.endswith(".py") and f != "__init__.py":
+                        index[f[:-3]] = (kind, os.path.join(path, f))
+            self._index = index
+            self._folder_mtimes = mtimes
+            for name in list(self._fonts):
+                if name not in index: del self._fonts[name]
+
+    def names(self):
+        self.refresh()
+        order = {kind: i for i, (_, kind) in enumerate(FONT_FOLDERS)}
+        return sorted(self._index, key=lambda n: (order[self._index[n][0]], n))
+
+    def get(self, name):
+        """
+        Returns the cached LoadedFont, (re)loading it if the module changed. None if unknown.
+        """
+        if not name: return None
+        self.refresh()
+        with self._lock:
+            entry = self._index.get(name)
+            if not entry: return None
+            kind, path = entry
+            try: mtime = os.stat(path).st_mtime_ns
+            except OSError: return None
+
+            font = self._fonts.get(name)
+            if font is None or font.mtime != mtime or font.kind != kind:
+                font = LoadedFont(name, kind, self._load_module(name, path), mtime)
+                self._fonts[name] = font
+            return font
+
+    def _load_module(self, name, path):
+        # Load by path (not importlib.import_module) so edits are not masked by sys.modules
+        spec = importlib.util.spec_from_file_location(f"font_library._registry.{name}", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    def list_fonts(self):
+        fonts = []
+        for name in self.names():
+            font = self.get(name)
+            if font: fonts.append(font.metadata())
+        return fonts
+
+    def coverage(self, name, texts):
+        """
+        Missing-glyph report for a set of texts: which characters would fall back
+        to '?' and in which texts (by position in the list).
+        """
+        font = self.get(name)
+        if font is None: return {"font_found": False, "missing": {}, "rows": []}
+        missing = Counter()
+        rows = []
+        for i, text in enumerate(texts):
+            chars = font.missing_chars(text or "")
+            if chars:
+                rows.append({"row": i + 1, "missing": "".join(sorted(chars))})
+                missing.update(c for c in text if c in chars)
+        return {"font_found": True, "missing": dict(missing), "rows": rows}
+
+registry = FontRegistry()
@@ -0,0 +1,128 @@
+import os
+import mmap
+import json
+import struct
+import tempfile
+import threading
+
+ATLAS_DIR = os.path.join(tempfile.gettempdir(), "linecraft_atlas")
+MAGIC = b"LCAT1\0"
+HEADER = struct.Struct("<6sII")          # magic, metadata length, variant count
+RECORD = struct.Struct("<IIddI")         # path offset, path length, advance, ink length, strokes
+FALLBACK_CHAR = '?'
+
+def _prefix(font):
+    safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in font.name)
+    return f"{safe}_{font.kind}_"
+
+def atlas_path(font):
+    return os.path.join(ATLAS_DIR, f"{_prefix(font)}{font.mtime}.lcat")
+
+def build_atlas(font):
+    """
+    Writes a LoadedFont into one flat, read-only file: JSON metrics + char index,
+    a fixed-size record per glyph variant, then all path data. Built once per font
+    version; later calls return the existing file.
+    """
+    path = atlas_path(font)
+    if os.path.exists(path): return path
+    os.makedirs(ATLAS_DIR, exist_ok=True)
+
+    chars = []
+    records = []
+    blob = bytearray()
+    for char in sorted(font.glyphs):
+        chars.append([char, len(records), len(font.glyphs[char])])
+        for path_d, width, length in font.glyphs[char]:
+            data = path_d.encode("utf-8")
+            strokes = max(1, path_d.count('M') + path_d.count('m'))
+            records.append(RECORD.pack(len(blob), len(data), width, length, strokes))
+            blob += data
+
+    meta = json.dumps({
+        "name": font.name, "kind": font.kind, "mtime": font.mtime,
+        "line_height": font.line_height, "space_width": font.space_width,
+        "default_width": font.default_width, "has_variation": font.has_variation,
+        "chars": chars,
+    }).encode("utf-8")
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(meta), len(records)))
+        f.write(meta)
+        f.write(b"".join(records))
+        f.write(blob)
+    os.replace(tmp_path, path)
+
+    # Drop atlases of older versions of this font
+    for f in os.listdir(ATLAS_DIR):
+        if f.startswith(_prefix(font)) and f.endswith(".lcat") and os.path.join(ATLAS_DIR, f) != path:
+            try: os.remove(os.path.join(ATLAS_DIR, f))
+            except OSError: pass
+    return path
+
+class AtlasFont:
+    """
+    Read-only font backed by a memory-mapped atlas. Every process mapping the same
+    file shares one copy of the glyph data in the page cache; variants are decoded
+    on first use of a char. Offers the parts of LoadedFont the template engine uses.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, meta_len, count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC: raise ValueError(f"Not a glyph atlas: {path}")
+        meta = json.loads(self._map[HEADER.size:HEADER.size + meta_len])
+        self._records_at = HEADER.size + meta_len
+        self._blob_at = self._records_at + count * RECORD.size
+
+        self.name = meta["name"]
+        self.kind = meta["kind"]
+        self.mtime = meta["mtime"]
+        self.line_height = meta["line_height"]
+        self.space_width = meta["space_width"]
+        self.default_width = meta["default_width"]
+        self.has_variation = meta["has_variation"]
+        self._index = {char: (first, n) for char, first, n in meta["chars"]}
+        self._decoded = {}
+        self._lock = threading.Lock()
+
+    def _decode(self, char):
+        first, n = self._index[char]
+        variants = []
+        for k in range(first, first + n):
+            offset, size, width, length, _ = RECORD.unpack_from(self._map, self._records_at + k * RECORD.size)
+            start = self._blob_at + offset
+            variants.append((self._map[start:start + size].decode("utf-8"), width, length))
+        return variants
+
+    def variants(self, char):
+        if char not in self._index: char = FALLBACK_CHAR
+        if char not in self._index: return None
+        found = self._decoded.get(char)
+        if found is None:
+            with self._lock:
+                found = self._decoded.setdefault(char, self._decode(char))
+        return found
+
+    def supports(self, char):
+        return char in self._index or char.isspace()
+
+    def missing_chars(self, text):
+        return {c for c in text if not self.supports(c)}
+
+    def close(self):
+        self._map.close()
+
+_open = {}
+_open_lock = threading.Lock()
+
+def open_atlas(path):
+    """One mapping per atlas file per process."""
+    with _open_lock:
+        font = _open.get(path)
+        if font is None:
+            font = AtlasFont(path)
+            _open[path] = font
+        return font
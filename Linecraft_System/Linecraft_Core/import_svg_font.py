@@ -1,8 +1,17 @@
 import xml.etree.ElementTree as ET
-import re
+import argparse
 import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import svg_geometry
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUTPUT_DIR = os.path.join(BASE_DIR, "font_library", "standard")
+HERSHEY_SCALE = 0.64    # Hershey cap height (21 units) -> roughly the EMS cap height
+HERSHEY_BASELINE = 9    # Hershey y of the baseline (y grows downwards)
 
-def convert_font(svg_filename, output_name, scale_factor=0.02, flip_y=True):
+def convert_font(svg_filename, output_name, scale_factor=0.02, flip_y=True, output_dir=DEFAULT_OUTPUT_DIR, font_space=False):
     """
     Reads an SVG Font file (Hershey/EMS) and creates a python font file.
     Uses repr() for bulletproof character escaping.
@@ -11,117 +20,299 @@ def convert_font(svg_filename, output_name, scale_factor=0.02, flip_y=True):
 
     if not os.path.exists(svg_filename):
         print(f"❌ Error: File '{svg_filename}' not found.")
-        return
+        return None
 
     try:
-        tree = ET.parse(svg_filename)
-        root = tree.getroot()
+        font = read_svg_font(svg_filename, scale_factor, flip_y)
     except ET.ParseError:
         print("❌ Error: Could not parse SVG XML.")
-        return
+        return None
+
+    print(f"   Found {len(font['glyphs'])} glyphs.")
+    output_path = os.path.join(output_dir, f"{output_name}.py")
+    write_font_module(output_path, os.path.basename(svg_filename), scale_factor, font, font_space=font_space)
+    print(f"✅ Success! Saved to '{output_path}'")
+    return output_path
+
+def convert_hershey(jhf_filename, output_name, scale_factor=HERSHEY_SCALE, output_dir=DEFAULT_OUTPUT_DIR, font_space=True):
+    """
+    Converts a Hershey .jhf file (glyphs in ASCII order from space) into a python font file.
+    """
+    print(f"🔨 Converting '{jhf_filename}'...")
+    font = read_hershey_font(jhf_filename, scale_factor)
+    print(f"   Found {len(font['glyphs'])} glyphs.")
+    output_path = os.path.join(output_dir, f"{output_name}.py")
+    write_font_module(output_path, os.path.basename(jhf_filename), scale_factor, font, font_space=font_space)
+    print(f"✅ Success! Saved to '{output_path}'")
+    return output_path
+
+def convert_directory(input_dir, output_dir=DEFAULT_OUTPUT_DIR, scale_factor=None, workers=None, font_space=None):
+    """
+    Converts every .svg / .jhf font in a folder in one run (in parallel), writing
+    the modules straight into the font library the engine loads from.
+    scale_factor / font_space: None keeps each format's own default.
+    """
+    jobs = []
+    for name in sorted(os.listdir(input_dir)):
+        path = os.path.join(input_dir, name)
+        stem, ext = os.path.splitext(name)
+        if ext.lower() in (".svg", ".jhf"):
+            jobs.append((path, module_name_for(stem), ext.lower(), scale_factor, output_dir, font_space))
+
+    if not jobs:
+        print(f"❌ No .svg or .jhf fonts found in '{input_dir}'.")
+        return []
+
+    os.makedirs(output_dir, exist_ok=True)
+    if len(jobs) == 1 or workers == 1:
+        return [p for p in map(_convert_job, jobs) if p]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [p for p in pool.map(_convert_job, jobs) if p]
+
+def _convert_job(job):
+    path, output_name, ext, scale_factor, output_dir, font_space = job
+    return convert_file(path, output_name, ext, scale_factor, output_dir, font_space)
+
+def convert_file(path, output_name, ext, scale_factor=None, output_dir=DEFAULT_OUTPUT_DIR, font_space=None):
+    """One .svg or .jhf font; None options fall back to that format's defaults."""
+    if ext == ".jhf":
+        return convert_hershey(path, output_name, HERSHEY_SCALE if scale_factor is None else scale_factor, output_dir=output_dir,
+                               font_space=True if font_space is None else font_space)
+    return convert_font(path, output_name, 0.02 if scale_factor is None else scale_factor, flip_y=True, output_dir=output_dir,
+                        font_space=bool(font_space))
+
+def module_name_for(stem):
+    """
+    'EMSReadability' -> 'ems_readability', 'Hershey Sans 1' -> 'hershey_sans_1'
+    """
+    name = re.sub(r'([A-Z]+)([A-Z][a-z])', r'\1_\2', stem)
+    name = re.sub(r'([a-z0-9])([A-Z])', r'\1_\2', name)
+    name = re.sub(r'[^0-9a-zA-Z]+', '_', name).strip('_').lower()
+    return name if name and not name[0].isdigit() else f"font_{name}"
+
+# --- READERS ---
+def read_svg_font(svg_filename, scale_factor=0.02, flip_y=True):
+    """
+    Returns {"glyphs": {char: path}, "widths": {...}, "bboxes": {...}, "space_width": w}.
+    """
+    root = ET.parse(svg_filename).getroot()
 
     # Namespaces often used in SVG fonts
     ns = {'svg': 'http://www.w3.org/2000/svg'}
 
     # FIND GLYPHS
-    glyphs = root.findall(".//svg:glyph", ns)
-    if not glyphs:
-        glyphs = root.findall(".//glyph")
+    glyphs = root.findall(".//svg:glyph", ns) or root.findall(".//glyph")
+    font_elem = root.find(".//svg:font", ns)
+    if font_elem is None: font_elem = root.find(".//font")
+    default_adv = font_elem.get('horiz-adv-x') if font_elem is not None else None
 
-    print(f"   Found {len(glyphs)} glyphs.")
-
-    extracted_font = {}
-    extracted_widths = {}
-
-    total_width = 0
-    count_width = 0
+    font = {"glyphs": {}, "widths": {}, "bboxes": {}, "space_width": None}
 
     for glyph in glyphs:
+        # ElementTree already decodes entities (&quot; &#xC6; ...)
         char = glyph.get('unicode')
         path_d = glyph.get('d')
-        raw_width = glyph.get('horiz-adv-x')
+        raw_width = glyph.get('horiz-adv-x', default_adv)
+        if not char or len(char) != 1: continue
 
-        if not char or not path_d:
+        width = float(raw_width) * scale_factor if raw_width else None
+        if char == ' ':
+            font["space_width"] = width
             continue
-
-        # Fix XML entity characters
-        if char == "&quot;": char = '"'
-        if char == "&amp;": char = '&'
-        if char == "&lt;": char = '<'
-        if char == "&gt;": char = '>'
+        if not path_d: continue
 
         # TRANSFORM
-        cleaned_path = transform_path(path_d, scale_factor, flip_y)
-        extracted_font[char] = cleaned_path
+        cleaned_path, bbox = normalize_path(path_d, scale_factor, -scale_factor if flip_y else scale_factor)
+        if not cleaned_path: continue
+        font["glyphs"][char] = cleaned_path
+        font["bboxes"][char] = bbox
+        if width is not None: font["widths"][char] = width
 
-        if raw_width:
-            w = float(raw_width) * scale_factor
-            extracted_widths[char] = w
-            total_width += w
-            count_width += 1
+    return font
 
-    avg_width = (total_width / count_width) if count_width > 0 else 10.0
+def read_hershey_font(jhf_filename, scale_factor=HERSHEY_SCALE):
+    """
+    Parses the classic Hershey .jhf format: 5-char id, 3-char vertex count, then
+    coordinate pairs encoded as chr(ord('R') + v). " R" lifts the pen. The first
+    pair holds the left/right bearings. Records may wrap over several lines.
+    """
+    with open(jhf_filename, "r", encoding="latin-1") as f:
+        raw_lines = [l.rstrip("\r\n") for l in f]
+
+    records = []
+    buffer = ""
+    for line in raw_lines:
+        buffer += line
+        try: count = int(buffer[5:8])
+        except ValueError:
+            buffer = ""
+            continue
+        if len(buffer) - 8 >= count * 2:
+            records.append((count, buffer[8:8 + count * 2]))
+            buffer = ""
 
-    # WRITE FILE
-    output_path = f"font_library/{output_name}.py"
+    font = {"glyphs": {}, "widths": {}, "bboxes": {}, "space_width": None}
+    for index, (count, data) in enumerate(records):
+        char = chr(32 + index)
+        left = ord(data[0]) - ord('R')
+        right = ord(data[1]) - ord('R')
+        width = (right - left) * scale_factor
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(f'"""\nConverted from {svg_filename}\nScale: {scale_factor}\n"""\n\n')
+        parts = []
+        pen_up = True
+        for i in range(2, len(data) - 1, 2):
+            if data[i:i + 2] == " R":
+                pen_up = True
+                continue
+            x = (ord(data[i]) - ord('R') - left) * scale_factor
+            y = (ord(data[i + 1]) - ord('R') - HERSHEY_BASELINE) * scale_factor
+            parts.append(f"{'M' if pen_up else 'L'} {x:.2f} {y:.2f}")
+            pen_up = False
+
+        if char == ' ':
+            font["space_width"] = width
+            continue
+        if not parts: continue
+        d = " ".join(parts)
+        font["glyphs"][char] = d
+        font["widths"][char] = width
+        font["bboxes"][char] = path_bbox(d)
+    return font
+
+# --- PATH NORMALIZATION ---
+def normalize_path(d_string, sx, sy):
+    """
+    Rewrites any path (absolute/relative, H/V, smooth curves, arcs) as absolute
+    M/L/C/Q/Z commands, scaled by (sx, sy). Arcs are flattened to line segments.
+    Returns (path_string, bbox).
+    """
+    out = []
+    cx, cy = 0.0, 0.0
+    start_x, start_y = 0.0, 0.0
+    last_ctrl = None
+    last_cmd = ''
+
+    def pt(x, y): return f"{x * sx:.2f} {y * sy:.2f}"
+
+    for cmd, a in svg_geometry.tokenize_path(d_string):
+        upper = cmd.upper()
+        ox, oy = (cx, cy) if cmd.islower() else (0.0, 0.0)
+
+        if upper == 'M':
+            cx, cy = a[0] + ox, a[1] + oy
+            start_x, start_y = cx, cy
+            out.append(f"M {pt(cx, cy)}")
+            last_ctrl = None
+        elif upper in ('L', 'H', 'V'):
+            if upper == 'L': cx, cy = a[0] + ox, a[1] + oy
+            elif upper == 'H': cx = a[0] + ox
+            else: cy = a[0] + oy
+            out.append(f"L {pt(cx, cy)}")
+            last_ctrl = None
+        elif upper in ('C', 'S'):
+            if upper == 'C':
+                c1 = (a[0] + ox, a[1] + oy)
+                rest = a[2:]
+            else:
+                c1 = (2 * cx - last_ctrl[0], 2 * cy - last_ctrl[1]) if last_ctrl and last_cmd in 'CcSs' else (cx, cy)
+                rest = a
+            c2 = (rest[0] + ox, rest[1] + oy)
+            end = (rest[2] + ox, rest[3] + oy)
+            out.append(f"C {pt(*c1)} {pt(*c2)} {pt(*end)}")
+            last_ctrl = c2
+            cx, cy = end
+        elif upper in ('Q', 'T'):
+            if upper == 'Q':
+                c1 = (a[0] + ox, a[1] + oy)
+                end = (a[2] + ox, a[3] + oy)
+            else:
+                c1 = (2 * cx - last_ctrl[0], 2 * cy - last_ctrl[1]) if last_ctrl and last_cmd in 'QqTt' else (cx, cy)
+                end = (a[0] + ox, a[1] + oy)
+            out.append(f"Q {pt(*c1)} {pt(*end)}")
+            last_ctrl = c1
+            cx, cy = end
+        elif upper == 'A':
+            end = (a[5] + ox, a[6] + oy)
+            for x, y in svg_geometry.arc_to_points((cx, cy), a[0], a[1], a[2], a[3], a[4], end, 2.0):
+                out.append(f"L {pt(x, y)}")
+            last_ctrl = None
+            cx, cy = end
+        elif upper == 'Z':
+            out.append("Z")
+            cx, cy = start_x, start_y
+            last_ctrl = None
+        last_cmd = cmd
+
+    d = " ".join(out)
+    return d, path_bbox(d)
+
+def path_bbox(d_string):
+    """
+    Exact ink bounding box (x0, y0, x1, y1) of a glyph path, curves included.
+    """
+    xs, ys = [], []
+    for stroke in svg_geometry.path_to_polylines(d_string, tolerance=0.01):
+        for x, y in stroke:
+            xs.append(x)
+            ys.append(y)
+    if not xs: return (0.0, 0.0, 0.0, 0.0)
+    return (round(min(xs), 2), round(min(ys), 2), round(max(xs), 2), round(max(ys), 2))
+
+# --- WRITER ---
+def write_font_module(output_path, source_name, scale_factor, font, line_height=30.0, font_space=False):
+    """
+    font_space=True uses the font's own space advance; the default keeps the
+    tighter 0.4 x average width the existing layouts were designed around.
+    """
+    widths = font["widths"]
+    avg_width = (sum(widths.values()) / len(widths)) if widths else 10.0
+    space_width = font["space_width"] if (font_space and font["space_width"]) else avg_width * 0.4
+
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(f'"""\nConverted from {source_name}\nScale: {scale_factor}\n"""\n\n')
 
         f.write(f"# GLOBAL SETTINGS\n")
-        f.write(f"LINE_HEIGHT_MM = 30.0\n")
-        f.write(f"SPACE_WIDTH_MM = {avg_width * 0.4:.2f}\n")
+        f.write(f"LINE_HEIGHT_MM = {line_height}\n")
+        f.write(f"SPACE_WIDTH_MM = {space_width:.2f}\n")
         f.write(f"CHAR_WIDTH_MM = {avg_width:.2f}\n\n")
 
         f.write(f"# VARIABLE WIDTHS\n")
         f.write(f"CHAR_WIDTHS = {{\n")
-        for char, w in extracted_widths.items():
+        for char, w in widths.items():
             # repr(char) automatically wraps ' in "..." and " in '...'
             f.write(f"    {repr(char)}: {w:.2f},\n")
         f.write(f"}}\n\n")
 
+        f.write(f"# INK BOUNDING BOXES (x0, y0, x1, y1)\n")
+        f.write(f"CHAR_BBOXES = {{\n")
+        for char, box in font["bboxes"].items():
+            f.write(f"    {repr(char)}: ({box[0]:.2f}, {box[1]:.2f}, {box[2]:.2f}, {box[3]:.2f}),\n")
+        f.write(f"}}\n\n")
+
         f.write(f"# GLYPH PATHS\n")
         f.write(f"STATIC_FONT = {{\n")
-        for char, path in extracted_font.items():
+        for char, path in font["glyphs"].items():
             f.write(f"    {repr(char)}: {repr(path)},\n")
         f.write(f"}}\n")
-
-    print(f"✅ Success! Saved to '{output_path}'")
-
-def transform_path(d_string, scale, flip_y):
-    """
-    Parses SVG path data, scales numbers, and flips Y axis.
-    """
-    tokens = re.split(r'[, \t]+', d_string)
-    new_tokens = []
-
-    axis_counter = 0 # 0=X, 1=Y
-
-    for token in tokens:
-        if not token: continue
-
-        if token[0].isalpha():
-            new_tokens.append(token)
-            axis_counter = 0
-        else:
-            try:
-                val = float(token)
-                val = val * scale
-
-                if axis_counter % 2 == 1 and flip_y:
-                    val = -val
-
-                new_tokens.append(f"{val:.2f}")
-                axis_counter += 1
-            except ValueError:
-                new_tokens.append(token)
-
-    return " ".join(new_tokens)
+    os.replace(tmp_path, output_path)
 
 if __name__ == "__main__":
-    # CONFIGURATION
-    INPUT_FILE = "EMSReadability.svg"
-    OUTPUT_NAME = "EMSReadability"
-    SCALE = 0.02
+    parser = argparse.ArgumentParser(description="Convert SVG / Hershey fonts into Linecraft font modules.")
+    parser.add_argument("source", nargs="?", default=os.path.join(BASE_DIR, "EMSReadability.svg"),
+                        help="An .svg/.jhf font file, or a folder of them")
+    parser.add_argument("--name", help="Module name (single file only)")
+    parser.add_argument("--out", default=DEFAULT_OUTPUT_DIR, help="Target font folder")
+    parser.add_argument("--scale", type=float, default=None, help=f"Glyph scale (default 0.02 for SVG, {HERSHEY_SCALE} for Hershey)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--font-space", action=argparse.BooleanOptionalAction, default=None,
+                        help="Use the font's own space advance (default: on for Hershey, off for SVG)")
+    args = parser.parse_args()
 
-    convert_font(INPUT_FILE, OUTPUT_NAME, scale_factor=SCALE, flip_y=True)
+    if os.path.isdir(args.source):
+        done = convert_directory(args.source, args.out, args.scale, args.workers, args.font_space)
+        print(f"📦 Converted {len(done)} fonts into '{args.out}'")
+    else:
+        stem, ext = os.path.splitext(os.path.basename(args.source))
+        name = args.name or module_name_for(stem)
+        convert_file(args.source, name, ext.lower(), args.scale, args.out, args.font_space)
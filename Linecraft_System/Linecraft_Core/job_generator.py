@@ -1,59 +1,411 @@
 import csv
 import os
-import shutil
 import json # <--- Added json
+import threading
+import functools
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from template_engine import VisualTemplateEngine
+import batch_store
+from font_registry import registry as font_registry
+import metrics
+import scheduler
+from layout_cache import cache as layout_cache
+import glyph_atlas
+import profiling
+import motion_export
+import motion_model
+import speed_profile
+from state_store import store
 
-def generate_batch_api(project_path, font_name="primary_variation", body_template="", offset_x=0.0, offset_y=0.0):
+DEFAULT_BODY = "Hi {NAME},\nYour order is ready."
+GEN_WORKERS = int(os.environ.get("LINECRAFT_GEN_WORKERS", "1"))
+MIN_ROWS_PER_WORKER = 25    # Below this a pool costs more than it saves
+CARD_NUMBER_DIGITS = 3      # Minimum row-number width in card file names
+
+def read_rows(csv_file, body_template=""):
+    """
+    Reads input.csv into cleaned row dicts with the BODY field filled in.
+    """
+    with open(csv_file, "r", encoding="utf-8") as f:
+        return [fill_row(row, body_template) for row in csv.DictReader(f)]
+
+def fill_row(row, body_template=""):
+    """One cleaned row dict with the BODY field filled in."""
+    if not body_template: body_template = DEFAULT_BODY
+    clean_row = {k.strip(): v for k, v in row.items()}
+
+    filled_text = body_template
+    for key, val in clean_row.items():
+        filled_text = filled_text.replace(f"{{{key}}}", val)
+    clean_row['BODY'] = filled_text
+    return clean_row
+
+def generation_options(settings):
+    """
+    Keyword arguments for generate_batch_api / append_rows_api from saved project
+    settings (project_settings.json); compress and workers are only for full runs.
+    """
+    settings = settings or {}
+    return {
+        "font_name": settings.get('font'),
+        "body_template": settings.get('template') or "",
+        "offset_x": float(settings.get('offset_x', 0) or 0),
+        "offset_y": float(settings.get('offset_y', 0) or 0),
+        "strict_glyphs": bool(settings.get('strict_glyphs', False)),
+        "default_pen": settings.get('pen') or None,
+        "variation": settings.get('variation') or "per_row",
+        "motion_exports": settings.get('motion_exports') or (),
+        "optimize_strokes": bool(settings.get('optimize_strokes', False)),
+        "layer_pens": settings.get('layer_pens') or None,
+        "placeholder_layers": settings.get('placeholder_layers') or None,
+        "bounds_check": settings.get('bounds_check') or "flag",
+        "safe_margin": float(settings.get('safe_margin', 0) or 0),
+    }
+
+# --- ONE WRITER PER PROJECT: appends go to the live version, so they wait for a running generation ---
+_project_locks = {}
+_project_locks_guard = threading.Lock()
+
+def _project_lock(project_path):
+    with _project_locks_guard:
+        return _project_locks.setdefault(os.path.abspath(project_path), threading.Lock())
+
+def _one_writer(fn):
+    @functools.wraps(fn)
+    def wrapper(project_path, *args, **kwargs):
+        with _project_lock(project_path): return fn(project_path, *args, **kwargs)
+    return wrapper
+
+def glyph_coverage(engine, font_name, rows):
+    """
+    Missing-glyph report for the fields the template actually renders.
+    """
+    if not rows: return {"font_found": font_registry.get(font_name) is not None, "missing": {}, "rows": []}
+    keys = engine.placeholder_keys(list(rows[0].keys()))
+    texts = ["".join(row.get(k) or "" for k in keys) for row in rows]
+    return font_registry.coverage(font_name, texts)
+
+# --- WORKER POOL ---
+_worker_engine = None
+
+_worker_exports = ()
+_worker_motion = None
+
+def _engine_options(offset_x=0.0, offset_y=0.0, variation="per_row", optimize_strokes=False, placeholder_layers=None, bounds_check="flag", safe_margin=0.0):
+    # VisualTemplateEngine keyword arguments shared by every run (and the pool workers)
+    return {"offset_x": offset_x, "offset_y": offset_y, "variation": variation, "optimize_strokes": optimize_strokes,
+            "placeholder_layers": placeholder_layers, "bounds_check": bounds_check, "safe_margin": safe_margin}
+
+def _layer_pens(layer_pens):
+    # Pen layer -> pen (id or name), keys as strings
+    return {str(k).strip(): v for k, v in (layer_pens or {}).items() if v}
+
+def _load_engine(template_file, font_name, engine_options, load_rows, strict_glyphs=False):
+    """
+    Engine and rows for a run, with the rows' glyph coverage. load_rows is called
+    inside the same error handling as the engine setup.
+    Returns (engine, rows, coverage, error); error is a failed result to return as-is.
+    """
+    try:
+        engine = VisualTemplateEngine(template_file, font_name=font_name, **engine_options)
+        rows = load_rows()
+    except Exception as e: return None, None, None, {"success": False, "error": f"Engine Error: {str(e)}"}
+    coverage = glyph_coverage(engine, font_name, rows)
+    if strict_glyphs and coverage["missing"]:
+        return engine, rows, coverage, {"success": False, "error": "Missing glyphs: " + "".join(sorted(coverage["missing"])), "coverage": coverage}
+    return engine, rows, coverage, None
+
+def _init_worker(atlas_file, template_file, engine_options, exports, motion):
+    # Workers map the parent's glyph atlas instead of loading the font module
+    global _worker_engine, _worker_exports, _worker_motion
+    font = glyph_atlas.open_atlas(atlas_file)
+    _worker_engine = VisualTemplateEngine(template_file, font=font, **engine_options)
+    _worker_exports = exports
+    _worker_motion = motion
+
+def _render_card(engine, row, output_path, exports, motion):
+    """
+    Renders one card; returns (ink_m, pen_lifts, speed profile, motion settings, stroke stats, pen layers, bounds issues).
+    motion: (config.py settings, project speed overrides).
+    """
+    # Written under a temp name and renamed, so a streaming queue never sees half a card
+    ink_meters = engine.process_template(row, output_path + ".part")
+    os.replace(output_path + ".part", output_path)
+    profile = speed_profile.card_profile(engine.last_geometry)
+    settings = speed_profile.effective_settings(motion[0], profile, motion[1], os.path.basename(output_path))
+    # Motion programs are compiled here (at the card's own speed) so plotting never re-plans the card
+    if exports: motion_export.export_card(output_path, exports, motion_model.MotionLimits(settings))
+    return ink_meters, engine.last_pen_lifts, profile, settings, engine.last_stroke_stats, engine.last_layers, engine.last_bounds
+
+def _render_rows(tasks):
+    return [_render_card(_worker_engine, row, output_path, _worker_exports, _worker_motion) for row, output_path in tasks]
+
+def _render_parallel(font, template_file, engine_options, exports, motion, tasks, workers):
+    """
+    Renders tasks over a process pool in contiguous slices; results come back in task order.
+    """
+    atlas_file = glyph_atlas.build_atlas(font)
+    size = max(1, -(-len(tasks) // (workers * 4)))
+    slices = [tasks[i:i + size] for i in range(0, len(tasks), size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(atlas_file, template_file, engine_options, exports, motion)) as pool:
+        return [r for part in pool.map(_render_rows, slices) for r in part]
+
+def card_digits(count):
+    # Row numbers are padded to the batch size so file names always sort in row order
+    return max(CARD_NUMBER_DIGITS, len(str(count)))
+
+def card_filename(row_number, row, digits=CARD_NUMBER_DIGITS):
+    return f"{row_number:0{digits}d}_{row.get('NAME', 'card').replace(' ', '_')}.svg"
+
+def _manifest_entry(row_number, clean_row, result, default_pen, layer_pens):
+    """Card manifest entry (pen, ink, estimate, speed profile, layers) from a _render_card result."""
+    ink_meters, pen_lifts, profile, settings, strokes, layers, bounds = result
+    card_pen = (clean_row.get('PEN') or "").strip() or default_pen or None
+    entry = {
+        "row": row_number,
+        "pen": card_pen,
+        "ink_m": round(ink_meters, 4),
+        "pen_lifts": pen_lifts,
+        "est_seconds": round(scheduler.estimate_card_seconds(ink_meters, pen_lifts, settings), 1),
+        "speed": profile,                              # Geometry + speed factor vs config.py
+        "speed_pendown": settings["speed_pendown"],    # Speed the card was estimated / compiled at
+    }
+    if layers:
+        # Multi-pen card: one plot pass per pen layer; unmapped layers use the card's pen
+        entry["layers"] = [
+            {"layer": n, "pen": layer_pens.get(str(n)) or card_pen, "ink_m": round(l["ink"] / 1000.0, 4), "pen_lifts": l["lifts"],
+             "est_seconds": round(scheduler.estimate_card_seconds(l["ink"] / 1000.0, l["lifts"], settings), 1)}
+            for n, l in sorted(layers.items())]
+    if strokes: entry["strokes"] = strokes   # Text pen lifts / points before and after optimization
+    if bounds: entry["bounds"] = bounds      # Placeholders off the page / travel / safe area, overlapping, or shrunk
+    return entry
+
+@_one_writer
+def generate_batch_api(project_path, font_name="primary_variation", body_template="", offset_x=0.0, offset_y=0.0, compress=False, strict_glyphs=False, default_pen=None, variation="per_row", workers=None, motion_exports=(), optimize_strokes=False, layer_pens=None, placeholder_layers=None, bounds_check="flag", safe_margin=0.0, profile=False, profile_top=profiling.TOP):
     print(f"🚀 Generator: Working in {project_path}")
 
     csv_file = os.path.join(project_path, "input.csv")
     template_file = os.path.join(project_path, "template.svg")
-    output_dir = os.path.join(project_path, "generated_batch")
 
     if not os.path.exists(csv_file): return {"success": False, "error": "input.csv missing."}
     if not os.path.exists(template_file): return {"success": False, "error": "template.svg missing."}
 
-    if os.path.exists(output_dir): shutil.rmtree(output_dir)
-    os.makedirs(output_dir)
-
-    try:
-        engine = VisualTemplateEngine(template_file, font_name=font_name, offset_x=offset_x, offset_y=offset_y)
-    except Exception as e: return {"success": False, "error": f"Engine Error: {str(e)}"}
+    engine_options = _engine_options(offset_x, offset_y, variation, optimize_strokes, placeholder_layers, bounds_check, safe_margin)
+    layer_pens = _layer_pens(layer_pens)
+    # GLYPH COVERAGE (before anything is written)
+    engine, rows, coverage, error = _load_engine(template_file, font_name, engine_options, lambda: read_rows(csv_file, body_template), strict_glyphs)
+    if error: return error
 
     generated_count = 0
     batch_stats = {} # <--- Store ink data here
+    card_manifest = {}   # Pen, ink and estimated plot time per card (for the queue scheduler)
+    motion = (scheduler.read_motion_config(), speed_profile.read_overrides(project_path))
+    cache_before = layout_cache.stats()
 
-    try:
-        with open(csv_file, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            if not body_template: body_template = "Hi {NAME},\nYour order is ready."
+    filenames = [card_filename(i + 1, row, card_digits(len(rows))) for i, row in enumerate(rows)]
+
+    # NEW VERSION: the live batch stays untouched (and plottable) until the pointer swap at the end
+    output_dir = batch_store.new_version(project_path, filenames, packed=compress)
+    tasks = [(clean_row, os.path.join(output_dir, filename)) for clean_row, filename in zip(rows, filenames)]
 
-            for i, row in enumerate(reader):
-                clean_row = {k.strip(): v for k, v in row.items()}
+    # PROFILED RUN: cProfile only sees this process, so the cards are rendered here
+    workers = 1 if profile else workers or GEN_WORKERS
+    exports = tuple(f for f in (motion_exports or ()) if f in motion_export.FORMATS)
+    parallel = workers > 1 and engine.font is not None and len(tasks) >= workers * MIN_ROWS_PER_WORKER
 
-                filled_text = body_template
-                for key, val in clean_row.items():
-                    filled_text = filled_text.replace(f"{{{key}}}", val)
-                clean_row['BODY'] = filled_text
+    profiler = None
+    try:
+        if profile: profiler = profiling.start()
+        # GET INK USAGE (Meters) + PEN LIFTS PER CARD
+        if parallel:
+            print(f"⚙️ Rendering {len(tasks)} cards on {workers} workers")
+            results = _render_parallel(engine.font, template_file, engine_options, exports, motion, tasks, workers)
+        else:
+            results = []
+            for clean_row, output_path in tasks:
+                with metrics.timed("linecraft_card_generation_seconds"):
+                    results.append(_render_card(engine, clean_row, output_path, exports, motion))
 
-                safe_name = clean_row.get('NAME', 'card').replace(" ", "_")
-                filename = f"{i+1:03d}_{safe_name}.svg"
-                output_path = os.path.join(output_dir, filename)
+        stroke_totals = {}
+        bounds_totals = {"cards_flagged": 0, "cards_shrunk": 0}
+        for i, ((clean_row, output_path), result) in enumerate(zip(tasks, results)):
+            filename = os.path.basename(output_path)
+            metrics.inc("linecraft_cards_generated_total")
 
-                # GET INK USAGE (Meters)
-                ink_meters = engine.process_template(clean_row, output_path)
+            # Save to stats dict
+            batch_stats[filename] = round(result[0], 4)
+            card_manifest[filename] = _manifest_entry(i + 1, clean_row, result, default_pen, layer_pens)
+            for k, v in (result[4] or {}).items(): stroke_totals[k] = stroke_totals.get(k, 0) + v
+            if any(x["level"] == "error" for x in result[6]): bounds_totals["cards_flagged"] += 1
+            if any(x["code"] == "shrunk" for x in result[6]): bounds_totals["cards_shrunk"] += 1
 
-                # Save to stats dict
-                batch_stats[filename] = round(ink_meters, 4)
+            generated_count += 1
 
-                generated_count += 1
+        # PREVIEW-ONLY RASTER LAYER (template images are not written into the cards)
+        compiled = engine.compile_template(rows[0].keys()) if rows else None
+        if compiled and compiled["raster"]:
+            with open(os.path.join(output_dir, batch_store.RASTER_LAYER_NAME), "wb") as f: f.write(compiled["raster"])
 
         # WRITE STATS FILE
         with open(os.path.join(output_dir, "batch_stats.json"), "w") as f:
             json.dump(batch_stats, f, indent=4)
+        with open(os.path.join(output_dir, batch_store.CARDS_MANIFEST_NAME), "w") as f:
+            json.dump(card_manifest, f, indent=4)
+        store.record_cards(os.path.basename(os.path.normpath(project_path)), project_path, card_manifest)
+        profile_report = profiling.finish(profiler, os.path.join(output_dir, profiling.PROFILE_NAME), profile_top) if profiler else None
 
-        return {"success": True, "count": generated_count}
+        # OPTIONAL: PACK INTO A SINGLE COMPRESSED CONTAINER, THEN GO LIVE
+        batch_store.finish_version(output_dir)
+        packed_file = None
+        if compress:
+            packed_file = output_dir + ".lcb"
+            batch_store.pack_batch(output_dir, packed_file, remove_source=True)
+        batch_store.publish_version(project_path, output_dir, packed_file)
+
+        cache_after = layout_cache.stats()
+        reused = {"hits": cache_after["hits"] - cache_before["hits"], "misses": cache_after["misses"] - cache_before["misses"]}
+        print(f"♻️ Layout cache: {reused['hits']} reused / {reused['misses']} laid out ({cache_after['bytes'] // 1024} KB held)")
+        if bounds_totals["cards_flagged"] or bounds_totals["cards_shrunk"]:
+            print(f"📐 Bounds: {bounds_totals['cards_flagged']} card(s) flagged, {bounds_totals['cards_shrunk']} shrunk to fit "
+                  f"(see \"bounds\" in {batch_store.CARDS_MANIFEST_NAME})")
+        if stroke_totals:
+            print(f"✂️ Strokes: {stroke_totals['lifts_before']} -> {stroke_totals['lifts_after']} pen lifts, "
+                  f"{stroke_totals['points_before']} -> {stroke_totals['points_after']} points")
+        if profile_report:
+            profile_report["file"] = os.path.join(batch_store.VERSIONS_DIR_NAME, os.path.basename(packed_file or output_dir), profiling.PROFILE_NAME)
+            print(f"⏱️ Profile: {profile_report['total_s']}s profiled, saved to {profile_report['file']}")
+
+        return {"success": True, "count": generated_count, "compressed": bool(compress), "version": os.path.basename(packed_file or output_dir), "missing_glyphs": coverage["missing"], "layout_cache": reused, "workers": workers if parallel else 1, "motion_exports": list(exports), "strokes": stroke_totals, "bounds": bounds_totals, "profile": profile_report}
 
     except Exception as e:
+        if profiler: profiler.disable()
+        batch_store.abandon_version(output_dir)
         return {"success": False, "error": f"Processing Error: {str(e)}"}
+
+# --- CONTINUOUS INTAKE ---
+@_one_writer
+def append_rows_api(project_path, rows, font_name="primary_variation", body_template="", offset_x=0.0, offset_y=0.0, strict_glyphs=False, default_pen=None, variation="per_row", motion_exports=(), optimize_strokes=False, layer_pens=None, placeholder_layers=None, bounds_check="flag", safe_margin=0.0):
+    """
+    Renders new order rows straight into the project's live batch version (numbered
+    after its last card), updates the manifests and appends the rows to input.csv
+    so a later regeneration reproduces the same cards. Cards already in the batch
+    are not touched. All-or-nothing: if any row fails, no card is added.
+    rows: raw dicts (BODY is filled in here).
+    Returns the new cards' manifest entries for the plot queue.
+    """
+    template_file = os.path.join(project_path, "template.svg")
+    source = batch_store.current_source(project_path)
+    if not os.path.exists(template_file): return {"success": False, "error": "template.svg missing."}
+    if not source: return {"success": False, "error": "No batch yet; generate the project once before adding orders."}
+    if source.endswith(".lcb"): return {"success": False, "error": "The live batch is packed (.lcb); regenerate it uncompressed to add orders."}
+    if not rows: return {"success": True, "count": 0, "cards": {}, "source": source, "version": os.path.basename(source)}
+
+    engine_options = _engine_options(offset_x, offset_y, variation, optimize_strokes, placeholder_layers, bounds_check, safe_margin)
+    layer_pens = _layer_pens(layer_pens)
+    engine, filled, coverage, error = _load_engine(template_file, font_name, engine_options, lambda: [
+        fill_row({str(k): "" if v is None else str(v) for k, v in row.items()}, body_template) for row in rows], strict_glyphs)
+    if error: return error
+    rows = filled
+
+    # 1. NUMBER AFTER THE LAST CARD
+    batch_stats = batch_store.read_manifest(source, None)
+    card_manifest = batch_store.read_manifest(source, None, batch_store.CARDS_MANIFEST_NAME)
+    existing = [f for f in os.listdir(source) if f.endswith(".svg")]
+    first = max([len(existing)] + [m.get("row") or 0 for m in card_manifest.values()]) + 1
+    digits = max([CARD_NUMBER_DIGITS] + [len(f.split("_", 1)[0]) for f in existing if f.split("_", 1)[0].isdigit()])
+    motion = (scheduler.read_motion_config(), speed_profile.read_overrides(project_path))
+    exports = tuple(f for f in (motion_exports or ()) if f in motion_export.FORMATS)
+
+    # 2. RENDER INTO A STAGING FOLDER (nothing reaches the batch until every row has rendered)
+    new_cards = {}
+    with tempfile.TemporaryDirectory(prefix=".append_", dir=source) as staging:
+        try:
+            for i, clean_row in enumerate(rows):
+                filename = card_filename(first + i, clean_row, digits)
+                with metrics.timed("linecraft_card_generation_seconds"):
+                    result = _render_card(engine, clean_row, os.path.join(staging, filename), exports, motion)
+                metrics.inc("linecraft_cards_generated_total")
+                batch_stats[filename] = round(result[0], 4)
+                new_cards[filename] = _manifest_entry(first + i, clean_row, result, default_pen, layer_pens)
+        except Exception as e:
+            return {"success": False, "error": f"Processing Error at row {len(new_cards) + 1} of {len(rows)} (no cards added): {str(e)}",
+                    "count": 0, "cards": {}, "source": source, "version": os.path.basename(source)}
+
+        # 3. PUBLISH: motion programs first, then each SVG renamed in (a running queue never sees half a card)
+        staged = sorted(os.listdir(staging), key=lambda f: f.endswith(".svg"))
+        for f in staged: os.replace(os.path.join(staging, f), os.path.join(source, f))
+    card_manifest.update(new_cards)
+    _write_json(os.path.join(source, "batch_stats.json"), batch_stats)
+    _write_json(os.path.join(source, batch_store.CARDS_MANIFEST_NAME), card_manifest)
+    store.record_cards(os.path.basename(os.path.normpath(project_path)), project_path, card_manifest)
+    _append_input_rows(os.path.join(project_path, "input.csv"), rows)
+
+    metrics.inc("linecraft_cards_appended_total", len(new_cards))
+    print(f"📥 Appended {len(new_cards)} card(s) to {os.path.basename(source)}")
+    return {"success": True, "count": len(new_cards), "cards": new_cards, "source": source, "version": os.path.basename(source),
+            "missing_glyphs": coverage["missing"]}
+
+# --- PROFILING ---
+def profile_cards_api(project_path, cards=profiling.SAMPLE_CARDS, top=profiling.TOP, font_name="primary_variation", body_template="", offset_x=0.0, offset_y=0.0, strict_glyphs=False, default_pen=None, variation="per_row", motion_exports=(), optimize_strokes=False, layer_pens=None, placeholder_layers=None, bounds_check="flag", safe_margin=0.0):
+    """
+    Renders the first N cards of the project under the profiler into a scratch
+    folder, with their manifest entries as a real run builds them (the live batch
+    is not touched), and saves the stats as batches/sample.prof. Takes the same
+    options as generate_batch_api. Returns the hot-spot summary.
+    """
+    csv_file = os.path.join(project_path, "input.csv")
+    template_file = os.path.join(project_path, "template.svg")
+    if not os.path.exists(csv_file): return {"success": False, "error": "input.csv missing."}
+    if not os.path.exists(template_file): return {"success": False, "error": "template.svg missing."}
+
+    engine_options = _engine_options(offset_x, offset_y, variation, optimize_strokes, placeholder_layers, bounds_check, safe_margin)
+    layer_pens = _layer_pens(layer_pens)
+    motion = (scheduler.read_motion_config(), speed_profile.read_overrides(project_path))
+    exports = tuple(f for f in (motion_exports or ()) if f in motion_export.FORMATS)
+    profile_file = os.path.join(batch_store.versions_dir(project_path), profiling.SAMPLE_NAME)
+
+    with tempfile.TemporaryDirectory(prefix="linecraft_profile_") as scratch:
+        # Engine setup and template compile are part of what a real run pays for, so they are profiled too
+        profiler = profiling.start()
+        try:
+            engine, rows, coverage, error = _load_engine(template_file, font_name, engine_options,
+                                                         lambda: read_rows(csv_file, body_template)[:max(1, int(cards))], strict_glyphs)
+            if error:
+                profiler.disable()
+                return error
+            for i, clean_row in enumerate(rows):
+                result = _render_card(engine, clean_row, os.path.join(scratch, card_filename(i + 1, clean_row)), exports, motion)
+                _manifest_entry(i + 1, clean_row, result, default_pen, layer_pens)
+        except Exception as e:
+            profiler.disable()
+            return {"success": False, "error": f"Processing Error: {str(e)}"}
+        report = profiling.finish(profiler, profile_file, top)
+
+    report["file"] = os.path.join(batch_store.VERSIONS_DIR_NAME, profiling.SAMPLE_NAME)
+    print(f"⏱️ Profile: {len(rows)} card(s), {report['total_s']}s profiled, saved to {report['file']}")
+    return {"success": True, "count": len(rows), "profile": report}
+
+def _write_json(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f: json.dump(data, f, indent=4)
+    os.replace(tmp_path, path)
+
+def _append_input_rows(csv_file, rows):
+    """Adds rows to input.csv under its existing header (columns it lacks are dropped; BODY is derived)."""
+    header, needs_newline = None, False
+    if os.path.exists(csv_file):
+        with open(csv_file, "r", encoding="utf-8") as f: header = next(csv.reader(f), None)
+        with open(csv_file, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell():
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) not in (b"\n", b"\r")   # Never glue a row onto an unterminated last line
+    new_file = not header
+    if new_file: header = [k for k in rows[0] if k != 'BODY']
+    with open(csv_file, "w" if new_file else "a", encoding="utf-8", newline="") as f:
+        if needs_newline and not new_file: f.write("\n")
+        writer = csv.writer(f, lineterminator="\n")
+        if new_file: writer.writerow(header)
+        writer.writerows([[row.get(h.strip(), "") for h in header] for row in rows])
@@ -0,0 +1,60 @@
+import threading
+from collections import OrderedDict
+
+# Rough per-glyph cost of a cached <path> element (object + attrib dict);
+# path data itself is shared with the loaded font and not counted
+ELEMENT_OVERHEAD = 400
+
+class LayoutCache:
+    """
+    LRU cache of laid-out text keyed by (text, scale, font, font version, variant key, optimized);
+    the variant key is None for plain fonts, "per_value", or the per-row field seed.
+    An entry is the list of positioned glyph elements relative to the slot origin,
+    plus ink length, pen lifts and info ({"bounds"}, plus geometry / stroke stats when
+    optimized; or None). Elements are shared
+    between cards, so they must be treated as read-only once cached.
+    """
+    def __init__(self, max_entries=4096, max_bytes=32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Returns (elements, ink_mm, pen_lifts, info) or None."""
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, elements, ink_mm, pen_lifts, info=None):
+        # Glyph path data is shared with the font; optimized paths (no transform) own theirs
+        size = sum(len(e.get('transform', '')) + ELEMENT_OVERHEAD + (0 if 'transform' in e.attrib else len(e.get('d', '')))
+                   for e in elements) + len(key[0])
+        with self._lock:
+            if key in self._items: return
+            self._items[key] = ((elements, ink_mm, pen_lifts, info), size)
+            self._bytes += size
+            while self._items and (len(self._items) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, old_size) = self._items.popitem(last=False)
+                self._bytes -= old_size
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"entries": len(self._items), "bytes": self._bytes, "hits": self.hits, "misses": self.misses,
+                    "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0}
+
+cache = LayoutCache()
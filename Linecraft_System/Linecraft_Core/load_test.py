@@ -0,0 +1,218 @@
+import os
+import json
+import time
+import heapq
+import random
+import argparse
+import tempfile
+import xml.etree.ElementTree as ET
+
+import batch_store
+import motion_model
+import scheduler
+import profiling
+import metrics
+import plotter_backend
+
+PROFILE_NAME = "load_test.prof"
+
+def card_timings(project_path, limits=None):
+    """
+    Motion-model timing of every card in a project's generated batch (folder or .lcb).
+    """
+    limits = limits or motion_model.MotionLimits()
+    source, container, cards = batch_store.open_batch(project_path)
+    timings = {}
+    try:
+        for card in cards:
+            if container: root = ET.fromstring(container.read_svg(card))
+            else: root = ET.parse(os.path.join(source, card)).getroot()
+            timings[card] = motion_model.svg_plot_time(root, limits)
+    finally:
+        if container: container.close()
+    return timings
+
+def run_queue(project_path, time_scale=0.001, paper_change_s=10.0, fault_rate=0.0, policy="file", seed=0, timeout_s=600.0):
+    """
+    Plots the project's batch through the real PlotManager (queue, locking,
+    pre-staging, auto-continue, chunk resume) on a SimulatedBackend that sleeps
+    time_scale of each card's motion time. Paper changes are made by the
+    auto-continue timer after paper_change_s; pen prompts are answered after the
+    same time and faults resumed with Start. Times are reported in simulated
+    seconds (real seconds / time_scale). Writes pens and the recovery session to
+    the state store in use, so run it against a scratch one (the CLI does).
+    """
+    import plot_manager   # Here, not at the top: the CLI points the state store at a scratch file first
+
+    pm = plot_manager.PlotManager()
+    pm.backend = plotter_backend.SimulatedBackend(time_scale=time_scale, fault_rate=fault_rate, seed=seed)
+    ok, message = pm.load_batch(project_path)
+    if not ok: return {"success": False, "error": message}
+    pm.set_queue_policy(policy)
+    pm.set_auto_continue(paper_change_s * time_scale)
+    waits_before = metrics.snapshot("linecraft_operator_wait_seconds")
+
+    # 1. RUN (this thread is the operator: pen prompts and error recovery; the timer changes paper)
+    started = time.perf_counter()
+    pm.start_queue()
+    pen_changes = recoveries = 0
+    deadline = started + timeout_s
+    while pm.state != "COMPLETED":
+        if time.perf_counter() > deadline:
+            return {"success": False, "error": f"Timed out in {pm.state} at {pm.queue_position()} ({pm.status_message})"}
+        if pm.state == "WAITING_FOR_PEN":
+            time.sleep(paper_change_s * time_scale)
+            pen_changes += pm.user_continue()
+        elif pm.state == "ERROR":
+            recoveries += 1
+            pm.start_queue()
+        time.sleep(0.001)
+    elapsed_s = (time.perf_counter() - started) / time_scale if time_scale else 0.0
+
+    # 2. REPORT
+    count, wait_sum = (a - b for a, b in zip(metrics.snapshot("linecraft_operator_wait_seconds"), waits_before))
+    plotted = len({os.path.basename(p) for p in pm.backend.plotted})
+    return {
+        "success": True,
+        "mode": "plot_manager",
+        "cards": len(set(pm.queue)),
+        "passes": len(pm.queue),
+        "policy": pm.queue_policy,
+        "elapsed_s": round(elapsed_s, 1),
+        "motion_s": round(pm.backend.motion_seconds, 1),
+        "cards_per_hour": round(len(set(pm.queue)) / elapsed_s * 3600, 1) if elapsed_s else 0.0,
+        "operator_waits": int(count),
+        "mean_wait_s": round(wait_sum / count / time_scale, 2) if count and time_scale else 0.0,
+        "paper_change_s": paper_change_s,
+        "pen_changes": pen_changes,
+        "faults": pm.backend.faults,
+        "recoveries": recoveries,
+        "files_plotted": plotted,
+    }
+
+def simulate_queue(timings, cards=None, machines=1, paper_change_s=10.0, fault_rate=0.0, recovery_s=60.0, policy="file", seed=0):
+    """
+    Capacity model (--model): discrete-event run of one shared queue over several plotters
+    (virtual clock, no sleeping, no PlotManager).
+    The batch's cards are repeated to reach `cards`. Each card goes to whichever machine
+    frees up first; a fault costs the partial plot plus recovery_s, then the card is redone.
+    """
+    names = sorted(timings)
+    if not names: return None
+    count = cards or len(names)
+    rng = random.Random(seed)
+
+    # 1. PLAN (same scheduler the live queue uses; no pens -> one group)
+    queue_cards = []
+    for i in range(count):
+        t = timings[names[i % len(names)]]
+        queue_cards.append({"file": f"{i + 1:05d}_{names[i % len(names)]}", "ink_m": t["pendown_mm"] / 1000.0, "est_seconds": t["total_s"]})
+    by_file = {c["file"]: c for c in queue_cards}
+    plan_start = time.perf_counter()
+    plan = scheduler.plan_queue(queue_cards, {}, None, policy)
+    plan_ms = (time.perf_counter() - plan_start) * 1000
+
+    # 2. RUN
+    sim_start = time.perf_counter()
+    free_at = [(0.0, m) for m in range(machines)]
+    heapq.heapify(free_at)
+    busy = [0.0] * machines
+    done = [0] * machines
+    faults = 0
+    makespan = 0.0
+    for name in plan["order"]:
+        clock, m = heapq.heappop(free_at)
+        plot_s = by_file[name]["est_seconds"]
+        while fault_rate and rng.random() < fault_rate:
+            faults += 1
+            lost = plot_s * rng.random()
+            busy[m] += lost
+            clock += lost + recovery_s
+        clock += plot_s
+        busy[m] += plot_s
+        done[m] += 1
+        makespan = max(makespan, clock)
+        heapq.heappush(free_at, (clock + paper_change_s, m))
+
+    return {
+        "success": True,
+        "mode": "model",
+        "cards": count,
+        "machines": machines,
+        "policy": plan["policy"],
+        "makespan_s": round(makespan, 1),
+        "cards_per_hour": round(count / makespan * 3600, 1) if makespan else 0.0,
+        "mean_card_s": round(sum(c["est_seconds"] for c in queue_cards) / count, 2),
+        "faults": faults,
+        "per_machine": [{"machine": m + 1, "cards": done[m], "utilization": round(busy[m] / makespan, 3) if makespan else 0.0}
+                        for m in range(machines)],
+        "plan_ms": round(plan_ms, 1),
+        "simulate_ms": round((time.perf_counter() - sim_start) * 1000, 1),
+    }
+
+def check(report, min_cards_per_hour=None, max_wait_s=None):
+    """Failed limits of a run_queue report, as messages ([] when it passed)."""
+    failures = []
+    if report["files_plotted"] < report["cards"]: failures.append(f"only {report['files_plotted']} of {report['cards']} cards plotted")
+    if min_cards_per_hour and report["cards_per_hour"] < min_cards_per_hour:
+        failures.append(f"throughput {report['cards_per_hour']} cards/h < {min_cards_per_hour}")
+    if max_wait_s is not None and report["mean_wait_s"] > max_wait_s:
+        failures.append(f"mean operator wait {report['mean_wait_s']}s > {max_wait_s}s")
+    return failures
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline load test: the plot queue on the simulated plotter.")
+    parser.add_argument("project", help="Project folder with a generated batch")
+    parser.add_argument("--time-scale", type=float, default=0.001, help="Real seconds slept per simulated second")
+    parser.add_argument("--policy", choices=scheduler.POLICIES, default="file")
+    parser.add_argument("--paper-change", type=float, default=10.0, help="Operator seconds between cards")
+    parser.add_argument("--fault-rate", type=float, default=0.0, help="Chance a plot fails partway")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=600.0, help="Real seconds before the run counts as stuck")
+    parser.add_argument("--min-cards-per-hour", type=float, default=None, help="Fail below this throughput")
+    parser.add_argument("--max-wait", type=float, default=None, help="Fail above this mean operator wait (s)")
+    parser.add_argument("--model", action="store_true", help="Capacity model only (no PlotManager; supports --machines/--cards)")
+    parser.add_argument("--cards", type=int, default=None, help="--model: queue length (batch cards are repeated)")
+    parser.add_argument("--machines", type=int, default=1, help="--model: plotters sharing the queue")
+    parser.add_argument("--recovery", type=float, default=60.0, help="--model: seconds to recover from a fault")
+    parser.add_argument("--json", action="store_true", help="Print the raw report")
+    parser.add_argument("--profile", action="store_true", help=f"Profile the run (batches/{PROFILE_NAME})")
+    args = parser.parse_args()
+
+    # The run writes pens and a recovery session: keep them out of the live state store
+    scratch = tempfile.TemporaryDirectory(prefix="linecraft_load_test_")
+    os.environ["LINECRAFT_DB"] = os.path.join(scratch.name, "load_test.db")
+
+    profiler = profiling.start() if args.profile else None
+    if args.model:
+        started = time.perf_counter()
+        timings = card_timings(args.project)
+        if not timings: raise SystemExit(f"❌ No generated cards in '{args.project}'")
+        print(f"⏱️ Timed {len(timings)} cards in {time.perf_counter() - started:.2f}s")
+        report = simulate_queue(timings, args.cards, args.machines, args.paper_change, args.fault_rate, args.recovery, args.policy, args.seed)
+    else:
+        report = run_queue(args.project, args.time_scale, args.paper_change, args.fault_rate, args.policy, args.seed, args.timeout)
+    if profiler:
+        profile_report = profiling.finish(profiler, os.path.join(batch_store.versions_dir(args.project), PROFILE_NAME))
+        print(f"⏱️ Profile: {profile_report['total_s']}s profiled, saved to {profile_report['file']}")
+        profiling.print_summary(profile_report)
+    if not report.get("success"): raise SystemExit(f"❌ {report.get('error')}")
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    elif args.model:
+        print(f"📊 Model: {report['cards']} cards on {report['machines']} machine(s), policy {report['policy']}")
+        print(f"   Makespan {report['makespan_s'] / 3600:.2f} h, {report['cards_per_hour']} cards/h, {report['mean_card_s']} s/card, {report['faults']} faults")
+        for m in report["per_machine"]:
+            print(f"   Machine {m['machine']}: {m['cards']} cards, {m['utilization'] * 100:.0f}% plotting")
+        print(f"   Planning {report['plan_ms']} ms, simulation {report['simulate_ms']} ms")
+    else:
+        print(f"📊 {report['cards']} cards ({report['passes']} passes) through PlotManager, policy {report['policy']}")
+        print(f"   {report['elapsed_s'] / 3600:.2f} h ({report['motion_s'] / 3600:.2f} h moving), {report['cards_per_hour']} cards/h")
+        print(f"   Operator: {report['operator_waits']} waits, mean {report['mean_wait_s']}s (paper change {report['paper_change_s']}s), {report['pen_changes']} pen changes")
+        print(f"   {report['faults']} faults, {report['recoveries']} recoveries")
+
+    failures = [] if args.model else check(report, args.min_cards_per_hour, args.max_wait)
+    for failure in failures: print(f"❌ {failure}")
+    if failures: raise SystemExit(1)
+    if not args.model and (args.min_cards_per_hour or args.max_wait is not None): print("✅ Within limits")
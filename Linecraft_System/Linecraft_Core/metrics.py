@@ -0,0 +1,124 @@
+import os
+import time
+import threading
+from contextlib import nullcontext
+
+# Set LINECRAFT_METRICS=0 to turn every hook into a no-op
+ENABLED = os.environ.get("LINECRAFT_METRICS", "1") != "0"
+
+FAST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+PLOT_BUCKETS = (1, 5, 10, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+WAIT_BUCKETS = (1, 2, 5, 10, 20, 30, 60, 120, 300, 900)
+INK_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0)
+
+class Histogram:
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.count += 1
+            self.sum += value
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            cumulative = 0
+            for bound, n in zip(self.buckets, self.counts):
+                cumulative += n
+                lines.append(f'{self.name}_bucket{{le="{bound:g}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{le="+Inf"}} {self.count}')
+            lines.append(f"{self.name}_sum {self.sum:.6f}")
+            lines.append(f"{self.name}_count {self.count}")
+        return lines
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0):
+        with self._lock: self.value += amount
+
+    def render(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter", f"{self.name} {self.value:g}"]
+
+class _Timer:
+    __slots__ = ("hist", "start")
+
+    def __init__(self, hist):
+        self.hist = hist
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.observe(time.perf_counter() - self.start)
+        return False
+
+_NOOP = nullcontext()
+_metrics = {}
+
+def _register(metric):
+    _metrics[metric.name] = metric
+    return metric
+
+# --- GENERATOR ---
+_register(Histogram("linecraft_card_generation_seconds", "Time to render one card (process_template).", FAST_BUCKETS))
+_register(Histogram("linecraft_layout_seconds", "Time to lay out one placeholder (_generate_path_group).", FAST_BUCKETS))
+_register(Histogram("linecraft_svg_write_seconds", "Time to serialize one card to disk.", FAST_BUCKETS))
+_register(Counter("linecraft_cards_generated_total", "Cards written by the generator."))
+_register(Counter("linecraft_cards_appended_total", "Cards added to a live batch by continuous intake."))
+# --- PLOTTER ---
+_register(Histogram("linecraft_plot_seconds", "Wall time of one card plot.", PLOT_BUCKETS))
+_register(Histogram("linecraft_subprocess_spawn_seconds", "Time to spawn an axicli process.", FAST_BUCKETS))
+_register(Histogram("linecraft_operator_wait_seconds", "Time spent in WAITING_FOR_PAPER before Continue.", WAIT_BUCKETS))
+_register(Histogram("linecraft_ink_per_card_meters", "Ink deducted per plotted card.", INK_BUCKETS))
+_register(Counter("linecraft_cards_plotted_total", "Cards plotted successfully."))
+_register(Counter("linecraft_plot_errors_total", "Plots that ended in ERROR."))
+
+def set_enabled(flag):
+    global ENABLED
+    ENABLED = bool(flag)
+
+def timed(name):
+    """
+    Context manager that records elapsed seconds into a histogram.
+    Returns a shared no-op when metrics are disabled.
+    """
+    if not ENABLED: return _NOOP
+    return _Timer(_metrics[name])
+
+def observe(name, value):
+    if ENABLED: _metrics[name].observe(value)
+
+def inc(name, amount=1.0):
+    if ENABLED: _metrics[name].inc(amount)
+
+def snapshot(name):
+    """Current (count, sum) of a histogram, or (value, value) of a counter."""
+    metric = _metrics[name]
+    with metric._lock: return (metric.count, metric.sum) if isinstance(metric, Histogram) else (metric.value, metric.value)
+
+def render(gauges=None):
+    """
+    Prometheus text exposition (format 0.0.4). gauges: {name: (help, value)} added at scrape time.
+    """
+    lines = []
+    for metric in _metrics.values(): lines.extend(metric.render())
+    for name, (help_text, value) in (gauges or {}).items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {value:g}"]
+    return "\n".join(lines) + "\n"
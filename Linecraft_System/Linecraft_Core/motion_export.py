@@ -0,0 +1,93 @@
+import os
+import struct
+import xml.etree.ElementTree as ET
+
+import svg_geometry
+import motion_model
+
+# Output formats written next to each card: extension per format
+FORMATS = {"gcode": ".gcode", "lcm": ".lcm"}
+
+# GRBL pen plotters: servo on the spindle output by default (override per machine)
+GCODE_PEN_UP = os.environ.get("LINECRAFT_GCODE_PEN_UP", "M5")
+GCODE_PEN_DOWN = os.environ.get("LINECRAFT_GCODE_PEN_DOWN", "M3 S1000")
+GCODE_PEN_DWELL_S = float(os.environ.get("LINECRAFT_GCODE_PEN_DWELL", "0.15"))
+
+# Compact motion program: header, then per stroke a point count and int32 (x, y) in machine steps
+LCM_MAGIC = b"LCMP1\0"
+LCM_HEADER = struct.Struct("<6sdI")      # magic, steps per mm, stroke count
+STEPS_PER_MM = 2032 / 25.4               # AxiDraw high-resolution mode
+
+def card_strokes(source, tolerance=0.05):
+    """
+    Pen-down polylines of a card in millimetres (page origin, +Y down).
+    source: file path, SVG bytes or a parsed root element.
+    """
+    if isinstance(source, (bytes, bytearray)): root = ET.fromstring(source)
+    elif isinstance(source, str): root = ET.parse(source).getroot()
+    else: root = source
+    k = motion_model.document_scale(root)
+    return [[(x * k, y * k) for x, y in s] for s in svg_geometry.iter_polylines(root, tolerance) if len(s) > 1]
+
+def to_gcode(strokes, limits=None, precision=3):
+    """
+    G-code for GRBL: absolute millimetres, G0 travel at the machine's rapid rate,
+    G1 drawing at the config.py pen-down speed, dwell after each pen move.
+    """
+    limits = limits or motion_model.MotionLimits()
+    fmt = f"{{:.{precision}f}}"
+    dwell = f"G4 P{GCODE_PEN_DWELL_S:g}"
+    lines = ["; Linecraft motion export (origin top-left, +Y down)", "G21", "G90", GCODE_PEN_UP, dwell,
+             f"F{limits.v_down * 60:.0f}"]
+    for stroke in strokes:
+        x, y = stroke[0]
+        lines.append(f"G0 X{fmt.format(x)} Y{fmt.format(y)}")
+        lines += [GCODE_PEN_DOWN, dwell]
+        lines += [f"G1 X{fmt.format(px)} Y{fmt.format(py)}" for px, py in stroke[1:]]
+        lines += [GCODE_PEN_UP, dwell]
+    lines += ["G0 X0 Y0", "M2"]
+    return "\n".join(lines) + "\n"
+
+def to_motion_program(strokes, steps_per_mm=STEPS_PER_MM):
+    parts = [LCM_HEADER.pack(LCM_MAGIC, steps_per_mm, len(strokes))]
+    for stroke in strokes:
+        parts.append(struct.pack("<I", len(stroke)))
+        parts.append(struct.pack(f"<{2 * len(stroke)}i", *(round(v * steps_per_mm) for p in stroke for v in p)))
+    return b"".join(parts)
+
+def read_motion_program(data):
+    """Returns (steps_per_mm, strokes in millimetres)."""
+    magic, steps_per_mm, count = LCM_HEADER.unpack_from(data, 0)
+    if magic != LCM_MAGIC: raise ValueError("Not a Linecraft motion program")
+    offset = LCM_HEADER.size
+    strokes = []
+    for _ in range(count):
+        (n,) = struct.unpack_from("<I", data, offset)
+        offset += 4
+        values = struct.unpack_from(f"<{2 * n}i", data, offset)
+        offset += 8 * n
+        strokes.append([(values[i] / steps_per_mm, values[i + 1] / steps_per_mm) for i in range(0, 2 * n, 2)])
+    return steps_per_mm, strokes
+
+def _encode(strokes, fmt, limits=None):
+    if fmt == "gcode": return to_gcode(strokes, limits).encode("ascii")
+    if fmt == "lcm": return to_motion_program(strokes)
+    raise ValueError(f"Unknown motion format '{fmt}'")
+
+def compile_card(source, fmt, limits=None):
+    """One card as bytes in the given format ('gcode' or 'lcm')."""
+    return _encode(card_strokes(source), fmt, limits)
+
+def export_card(svg_path, formats, limits=None):
+    """
+    Writes the requested formats next to a generated card (001_Name.svg -> 001_Name.gcode).
+    """
+    formats = [f for f in formats if f in FORMATS]
+    if not formats: return []
+    strokes = card_strokes(svg_path)
+    written = []
+    for fmt in formats:
+        target = os.path.splitext(svg_path)[0] + FORMATS[fmt]
+        with open(target, "wb") as f: f.write(_encode(strokes, fmt, limits))
+        written.append(target)
+    return written
@@ -0,0 +1,113 @@
+import os
+import re
+import math
+
+import svg_geometry
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_FILE = os.path.join(BASE_DIR, "config.py")
+
+# AxiDraw limits (axidraw_conf, high-resolution mode); speed/accel settings are % of these
+MAX_SPEED_MM_S = 8.6979 * 25.4
+ACCEL_PENDOWN_MM_S2 = 40.0 * 25.4
+ACCEL_PENUP_MM_S2 = 60.0 * 25.4
+PEN_MOVE_S_AT_50 = 0.25        # One pen raise or lower at pen_rate 50
+
+UNIT_MM = {"mm": 1.0, "cm": 10.0, "in": 25.4, "pt": 25.4 / 72, "pc": 25.4 / 6, "px": 25.4 / 96, "": 25.4 / 96}
+
+def read_motion_config(path=CONFIG_FILE):
+    """
+    Reads the simple 'name = value' settings from config.py without importing it,
+    so edits apply on the next read.
+    """
+    settings = {"speed_pendown": 25.0, "speed_penup": 75.0, "accel": 50.0, "pen_rate_lower": 50.0, "pen_rate_raise": 50.0}
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                m = re.match(r'\s*(\w+)\s*=\s*([-+]?\d+(?:\.\d+)?)', line)
+                if m and m.group(1) in settings: settings[m.group(1)] = float(m.group(2))
+    except OSError: pass
+    return settings
+
+class MotionLimits:
+    def __init__(self, config=None):
+        c = config or read_motion_config()
+        accel = max(c["accel"], 1) / 100.0
+        self.v_down = MAX_SPEED_MM_S * max(c["speed_pendown"], 1) / 100.0
+        self.v_up = MAX_SPEED_MM_S * max(c["speed_penup"], 1) / 100.0
+        self.a_down = ACCEL_PENDOWN_MM_S2 * accel
+        self.a_up = ACCEL_PENUP_MM_S2 * accel
+        self.t_lower = PEN_MOVE_S_AT_50 * 50.0 / max(c["pen_rate_lower"], 1)
+        self.t_raise = PEN_MOVE_S_AT_50 * 50.0 / max(c["pen_rate_raise"], 1)
+
+def document_scale(root):
+    """Millimetres per user unit, from width/height units and the viewBox."""
+    m = re.match(r'\s*([-+]?[\d.]+)\s*([a-z]*)', root.get('width', '') or '')
+    if not m: return UNIT_MM[""]
+    unit_mm = UNIT_MM.get(m.group(2), UNIT_MM[""])
+    if not root.get('viewBox'): return unit_mm
+    width_mm = float(m.group(1)) * unit_mm
+    vb_w = svg_geometry.viewbox(root)[2]
+    return width_mm / vb_w if vb_w else UNIT_MM[""]
+
+def move_time(distance, v_max, accel, v_in=0.0, v_out=0.0):
+    """
+    Trapezoidal (or triangular when too short to reach v_max) profile from v_in to v_out.
+    """
+    if distance <= 0: return 0.0
+    d_acc = (v_max * v_max - v_in * v_in) / (2 * accel)
+    d_dec = (v_max * v_max - v_out * v_out) / (2 * accel)
+    if d_acc + d_dec <= distance:
+        return (v_max - v_in) / accel + (v_max - v_out) / accel + (distance - d_acc - d_dec) / v_max
+    v_peak = math.sqrt(max(accel * distance + (v_in * v_in + v_out * v_out) / 2, 0.0))
+    return max(v_peak - v_in, 0.0) / accel + max(v_peak - v_out, 0.0) / accel
+
+def stroke_time(points, v_max, accel):
+    """
+    Pen-down time of one polyline: junction speeds drop with the turning angle
+    (full stop at 90 degrees or more), then a forward/backward pass keeps every
+    segment reachable under the acceleration limit.
+    """
+    seg = [math.hypot(b[0] - a[0], b[1] - a[1]) for a, b in zip(points, points[1:])]
+    n = len(seg)
+    if n == 0: return 0.0
+    v = [0.0] * (n + 1)
+    for i in range(1, n):
+        (x0, y0), (x1, y1), (x2, y2) = points[i - 1], points[i], points[i + 1]
+        if seg[i - 1] == 0 or seg[i] == 0: continue
+        cos_turn = ((x1 - x0) * (x2 - x1) + (y1 - y0) * (y2 - y1)) / (seg[i - 1] * seg[i])
+        v[i] = v_max * max(0.0, cos_turn)
+    for i in range(n):
+        v[i + 1] = min(v[i + 1], math.sqrt(v[i] * v[i] + 2 * accel * seg[i]))
+    for i in range(n - 1, -1, -1):
+        v[i] = min(v[i], math.sqrt(v[i + 1] * v[i + 1] + 2 * accel * seg[i]))
+    return sum(move_time(seg[i], v_max, accel, v[i], v[i + 1]) for i in range(n))
+
+def plot_time(strokes, limits=None, home=(0.0, 0.0)):
+    """
+    Simulated plot of absolute strokes (mm), starting and ending at home.
+    Returns a breakdown in seconds and millimetres.
+    """
+    limits = limits or MotionLimits()
+    down_s = up_s = pen_s = down_mm = up_mm = 0.0
+    pos = home
+    for stroke in strokes:
+        if len(stroke) < 2: continue
+        hop = math.hypot(stroke[0][0] - pos[0], stroke[0][1] - pos[1])
+        up_s += move_time(hop, limits.v_up, limits.a_up)
+        up_mm += hop
+        down_s += stroke_time(stroke, limits.v_down, limits.a_down)
+        down_mm += svg_geometry.polyline_length(stroke)
+        pen_s += limits.t_lower + limits.t_raise
+        pos = stroke[-1]
+    back = math.hypot(home[0] - pos[0], home[1] - pos[1])
+    up_s += move_time(back, limits.v_up, limits.a_up)
+    up_mm += back
+    return {"total_s": down_s + up_s + pen_s, "pendown_s": down_s, "penup_s": up_s, "pen_lift_s": pen_s,
+            "pendown_mm": down_mm, "penup_mm": up_mm, "strokes": sum(1 for s in strokes if len(s) > 1)}
+
+def svg_plot_time(root, limits=None, tolerance=0.05):
+    """plot_time for a parsed SVG document."""
+    k = document_scale(root)
+    strokes = [[(x * k, y * k) for x, y in s] for s in svg_geometry.iter_polylines(root, tolerance)]
+    return plot_time(strokes, limits)
@@ -0,0 +1,169 @@
+import os
+import csv
+import json
+import time
+import uuid
+import shutil
+import threading
+import job_generator
+from state_store import store
+
+# LAYOUT: <project>/inbox/*.csv|*.jsonl -> inbox/processed or inbox/failed (with a .error.txt)
+INBOX_DIR_NAME = "inbox"
+PROCESSED_DIR_NAME = "processed"
+FAILED_DIR_NAME = "failed"
+ORDER_EXTENSIONS = (".csv", ".jsonl")
+POLL_SECONDS = 2.0
+SETTLE_SECONDS = 1.0        # Files modified more recently may still be being copied in
+
+def inbox_dir(project_path):
+    return os.path.join(project_path, INBOX_DIR_NAME)
+
+def read_order_file(path):
+    """Raw order rows from a CSV (header row) or JSONL (one object per line) file."""
+    if path.endswith(".csv"):
+        with open(path, "r", encoding="utf-8") as f: return [dict(row) for row in csv.DictReader(f)]
+    rows = []
+    with open(path, "r", encoding="utf-8") as f:
+        for n, line in enumerate(f, 1):
+            if not line.strip(): continue
+            row = json.loads(line)
+            if not isinstance(row, dict): raise ValueError(f"line {n}: expected a JSON object")
+            rows.append(row)
+    return rows
+
+class OrderIntake:
+    """
+    Continuous mode: order files dropped into a watched project's inbox (or rows
+    posted to the API, which are written there first) are generated into the
+    project's live batch in arrival order and handed to on_cards, which appends
+    them to the running plot queue. One background thread polls every watched
+    inbox; the watch list survives restarts.
+    """
+    def __init__(self, poll=POLL_SECONDS):
+        self.poll = poll
+        self.on_cards = None          # on_cards(project_path, source, {file: manifest entry}) -> queued count
+        self._projects = {}           # project_path -> counters and last result
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    # --- WATCH LIST ---
+    def resume(self):
+        """Re-watches the projects that were in continuous mode before a restart."""
+        for path in store.get_value("intake_projects") or []:
+            if os.path.isdir(path): self.watch(path)
+
+    def watch(self, project_path):
+        os.makedirs(inbox_dir(project_path), exist_ok=True)
+        with self._lock:
+            self._projects.setdefault(project_path, {"since": time.time(), "files": 0, "rows": 0, "queued": 0,
+                                                     "failed": 0, "last": None, "poll_error": None})
+            store.set_value("intake_projects", list(self._projects))
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._loop, daemon=True, name="linecraft-intake")
+            self._thread.start()
+        self._wake.set()
+
+    def unwatch(self, project_path):
+        with self._lock:
+            self._projects.pop(project_path, None)
+            store.set_value("intake_projects", list(self._projects))
+
+    def status(self, project_path):
+        with self._lock: stats = self._projects.get(project_path)
+        inbox = inbox_dir(project_path)
+        pending = sorted(f for f in os.listdir(inbox) if f.endswith(ORDER_EXTENSIONS)) if os.path.isdir(inbox) else []
+        return {"enabled": stats is not None, "inbox": inbox, "pending": pending, **(dict(stats) if stats else {})}
+
+    # --- API ORDERS ---
+    def submit_rows(self, project_path, rows):
+        """
+        Queues rows posted to the API: written to the inbox as one JSONL file
+        (renamed into place), so they are processed in order and survive a restart.
+        """
+        os.makedirs(inbox_dir(project_path), exist_ok=True)
+        name = f"api_{time.strftime('%Y%m%d-%H%M%S')}_{uuid.uuid4().hex[:6]}.jsonl"
+        path = os.path.join(inbox_dir(project_path), name)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            for row in rows: f.write(json.dumps(row) + "\n")
+        os.replace(path + ".tmp", path)
+        self._wake.set()
+        return name
+
+    # --- WORKER ---
+    def _loop(self):
+        while True:
+            self._wake.wait(self.poll)
+            self._wake.clear()
+            with self._lock: projects = list(self._projects)
+            for project_path in projects:
+                # A failed pass (unreadable inbox, a file that cannot be moved) is logged and retried next poll;
+                # it must never end the watcher thread
+                try:
+                    for path in self._ready_files(project_path): self._process(project_path, path)
+                    error = None
+                except Exception as e:
+                    error = {"at": time.time(), "error": str(e)}
+                    print(f"❌ Intake: polling {project_path} failed: {e}")
+                    try: store.log_event("intake_error", os.path.basename(os.path.normpath(project_path)), message=str(e))
+                    except Exception: pass
+                with self._lock:
+                    if project_path in self._projects: self._projects[project_path]["poll_error"] = error
+
+    def _ready_files(self, project_path):
+        inbox = inbox_dir(project_path)
+        try: names = [f for f in os.listdir(inbox) if f.endswith(ORDER_EXTENSIONS) and not f.startswith(".")]
+        except OSError: return []
+        now, ready = time.time(), []
+        for f in names:
+            path = os.path.join(inbox, f)
+            try: mtime = os.path.getmtime(path)
+            except OSError: continue      # Removed since the listing
+            if now - mtime >= SETTLE_SECONDS: ready.append((mtime, path))
+        # Oldest first, and only once the file has stopped changing
+        return [path for mtime, path in sorted(ready)]
+
+    def _process(self, project_path, path):
+        name = os.path.basename(path)
+        project = os.path.basename(os.path.normpath(project_path))
+        try:
+            rows = read_order_file(path)
+            options = job_generator.generation_options(store.project_settings(project) or _read_settings(project_path))
+            result = job_generator.append_rows_api(project_path, rows, **options)
+        except Exception as e: result = {"success": False, "error": str(e)}
+
+        queued = 0
+        if result.get("cards") and self.on_cards:
+            try: queued = self.on_cards(project_path, result["source"], result["cards"])
+            except Exception as e: print(f"⚠️ Intake: could not queue cards from {name}: {e}")
+
+        with self._lock:
+            stats = self._projects.get(project_path)
+            if stats is not None:
+                stats["files"] += 1
+                stats["rows"] += result.get("count", 0)
+                stats["queued"] += queued
+                stats["failed"] += 0 if result.get("success") else 1
+                stats["last"] = {"file": name, "at": time.time(), "success": bool(result.get("success")),
+                                 "count": result.get("count", 0), "queued": queued, "error": result.get("error")}
+
+        # Move the file out of the inbox so it is never ingested twice (append_rows_api is all-or-nothing,
+        # so a file in failed/ added no cards and can be dropped in again once fixed)
+        target = os.path.join(inbox_dir(project_path), PROCESSED_DIR_NAME if result.get("success") else FAILED_DIR_NAME)
+        os.makedirs(target, exist_ok=True)
+        shutil.move(path, os.path.join(target, name))
+        if result.get("success"):
+            print(f"📥 Intake: {name} -> {result.get('count', 0)} card(s), {queued} queued")
+            store.log_event("intake", project, name, message=f"{result.get('count', 0)} card(s)")
+        else:
+            print(f"❌ Intake: {name} failed: {result.get('error')}")
+            with open(os.path.join(target, name + ".error.txt"), "w") as f: f.write(str(result.get("error")) + "\n")
+            store.log_event("intake_error", project, name, message=result.get("error"))
+
+def _read_settings(project_path):
+    try:
+        with open(os.path.join(project_path, "project_settings.json"), "r") as f: return json.load(f)
+    except (OSError, ValueError): return {}
+
+intake = OrderIntake()
@@ -1,23 +1,42 @@
 import os
-import subprocess
 import time
 import threading
-import json
 import uuid
 import datetime
 import signal
+import queue
+import tempfile
+import functools
+from contextlib import contextmanager, ExitStack
+import batch_store
+import metrics
+import scheduler
+import plotter_backend
+import motion_export
+import motion_model
+import speed_profile
+from state_store import store
 
 # CONFIG
 AXICLI_PATH = "/path/to/your/env/bin/axicli"
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-INVENTORY_FILE = os.path.join(BASE_DIR, "pen_inventory.json")
+INVENTORY_FILE = os.path.join(BASE_DIR, "pen_inventory.json")    # Legacy, imported into the state store once
 SESSION_FILE = os.path.join(BASE_DIR, "session_state.json")
 CONFIG_FILE = os.path.join(BASE_DIR, "config.py") # <--- TARGET THE SINGLE FILE
 
+def _queue_guard(fn):
+    # Queue, current_index and the plan are shared by the API, intake, timers and the plot worker
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        with self._queue_lock: return fn(self, *args, **kwargs)
+    return wrapper
+
 class PlotManager:
     def __init__(self):
-        # QUEUE & STATE
+        # QUEUE & STATE (read and changed only under _queue_lock; re-entrant as guarded methods call each other)
+        self._queue_lock = threading.RLock()
         self.queue = []
+        self.queue_layers = []        # Pen layer each queue entry plots (None = the whole card)
         self.current_index = 0
         self.state = "IDLE"
         self.status_message = "Ready"
@@ -25,7 +44,26 @@ class PlotManager:
         # PREVIEWS
         self.current_project_path = None
         self.current_file = None
+        self.current_layer = None
         self.next_file = None
+        self.batch_container = None   # Set when the batch is a packed .lcb
+        self.batch_source = None      # Batch version being plotted (kept alive while loaded)
+        self.streaming = False        # Plotting a version that is still being generated
+
+        # SCHEDULE: queue order by pen and estimated time, pen changes keyed by queue index
+        self.queue_policy = "file"
+        self.card_meta = {}
+        self.pen_steps = {}
+        self.plan_warnings = []
+        self.layer_stack = 1          # Registered sheets plotted per layer before the next pen (multi-pen cards)
+        self.plan_mode = "per_card"
+
+        # PLOTTER: axicli by default; cards are plotted as stroke chunks so they can resume mid-card
+        self.backend = plotter_backend.create_backend(AXICLI_PATH, CONFIG_FILE)
+        self.chunk_card = None     # Card whose chunks are partly plotted
+        self.chunk_index = 0       # Next chunk to plot for chunk_card
+        self.chunk_layer = None
+        self.chunk_total = 0
 
         # PEN SYSTEM
         self.pens = {}
@@ -34,44 +72,104 @@ class PlotManager:
         # STATS
         self.start_time = 0
         self.session_ink_meters = 0.0
-
-        # INIT
+        self.waiting_since = None    # When the operator was asked to change paper
+
+        # RECOVERY: snapshots are taken under _queue_lock and written after it; older ones never overwrite newer
+        self._session_lock = threading.Lock()
+        self._session_seq = 0
+        self._session_saved = 0
+
+        # PIPELINE: one long-lived worker; the next card is staged while the current one plots
+        self._jobs = queue.Queue()
+        self._worker = None
+        self._prepared = None
+        self._prep_lock = threading.Lock()
+
+        # AUTO-CONTINUE (0 = wait for the operator)
+        self.auto_continue_delay = 0.0
+        self.auto_continue_at = None
+        self._auto_timer = None       # Timer, pedal and dashboard may fire together: all continue under _queue_lock
+        self._auto_seq = 0            # Arming number; a timer that fired before being cancelled or re-armed does nothing
+
+        # INIT (pens and the recovery session live in the SQLite state store)
+        store.migrate_json(INVENTORY_FILE, SESSION_FILE)
         self.load_inventory()
         self.load_session_state()
 
     # --- RECOVERY SYSTEM ---
     def save_session_state(self):
-        data = {
-            "project_path": self.current_project_path,
-            "current_index": self.current_index,
-            "session_ink": self.session_ink_meters,
-            "start_time": self.start_time
-        }
-        with open(SESSION_FILE, 'w') as f:
-            json.dump(data, f, indent=4)
-
+        with self._queue_lock:
+            self._session_seq += 1
+            seq = self._session_seq
+            data = {
+                "project_path": self.current_project_path,
+                "current_index": self.current_index,
+                "session_ink": self.session_ink_meters,
+                "start_time": self.start_time,
+                "auto_continue_delay": self.auto_continue_delay,
+                "queue_policy": self.queue_policy,
+                "queue_order": [os.path.basename(p) for p in self.queue],
+                "queue_layers": list(self.queue_layers),
+                "layer_stack": self.layer_stack,
+                "chunk_card": self.chunk_card,
+                "chunk_layer": self.chunk_layer,
+                "chunk_index": self.chunk_index,
+                "batch_source": self.batch_source
+            }
+        self._write_session(seq, lambda: store.set_value("session", data))
+
+    def _write_session(self, seq, write):
+        with self._session_lock:
+            if seq <= self._session_saved: return
+            write()
+            self._session_saved = seq
+
+    @_queue_guard
     def load_session_state(self):
-        if os.path.exists(SESSION_FILE):
+        data = store.get_value("session")
+        if data:
             try:
-                with open(SESSION_FILE, 'r') as f:
-                    data = json.load(f)
-                    path = data.get("project_path")
-                    if path and os.path.exists(path):
-                        self.load_batch(path)
-                        self.current_index = data.get("current_index", 0)
-                        self.session_ink_meters = data.get("session_ink", 0.0)
-                        self.start_time = data.get("start_time", 0)
-                        self.update_file_pointers()
-                        self.status_message = f"Recovered session at Card {self.current_index + 1}"
+                path = data.get("project_path")
+                if path and os.path.exists(path):
+                    self.queue_policy = data.get("queue_policy", "file")
+                    self.layer_stack = data.get("layer_stack", 1)
+                    # Resume on the version that was being plotted, even if a newer one went live
+                    source = data.get("batch_source")
+                    self.load_batch(path, source=source if source and batch_store.build_info(source) is None else None)
+                    self.current_index = data.get("current_index", 0)
+                    # Keep the recorded order for plotted cards, re-plan the rest
+                    order = data.get("queue_order") or []
+                    layers = data.get("queue_layers") or [None] * len(order)
+                    if _passes(order, layers) == _passes([os.path.basename(p) for p in self.queue], self.queue_layers):
+                        self.queue = [os.path.join(self.batch_source, f) for f in order]
+                        self.queue_layers = list(layers)
+                        # A half-plotted card must stay where it is
+                        partial = self.current_index < len(self.queue) and data.get("chunk_card") == order[self.current_index]
+                        self._replan(self.current_index + (1 if partial else 0))
+                    self.session_ink_meters = data.get("session_ink", 0.0)
+                    self.start_time = data.get("start_time", 0)
+                    self.auto_continue_delay = data.get("auto_continue_delay", 0.0)
+                    self.update_file_pointers()
+                    self.status_message = f"Recovered session at Card {self.current_index + 1}"
+                    if data.get("chunk_card") and data.get("chunk_card") == self.current_file and data.get("chunk_layer") == self.current_layer:
+                        self.chunk_card, self.chunk_layer = self.current_file, self.current_layer
+                        self.chunk_index = data.get("chunk_index", 0)
+                        self.status_message += f" (resumes at chunk {self.chunk_index + 1})"
             except: pass
 
     def clear_session_state(self):
-        if os.path.exists(SESSION_FILE): os.remove(SESSION_FILE)
+        with self._queue_lock:
+            self._session_seq += 1
+            seq = self._session_seq
+        self._write_session(seq, lambda: store.delete_value("session"))
 
     # --- QUEUE NAVIGATION ---
+    @_queue_guard
     def skip_forward(self):
         if self.state in ["PLOTTING"]: return False, "Cannot skip while plotting"
         if self.current_index < len(self.queue) - 1:
+            self._cancel_auto_continue()
+            self._clear_chunk_progress()
             self.current_index += 1
             self.update_file_pointers()
             self.save_session_state()
@@ -79,9 +177,12 @@ class PlotManager:
             return True, "Skipped Forward"
         return False, "End of Queue"
 
+    @_queue_guard
     def skip_backward(self):
         if self.state in ["PLOTTING"]: return False, "Cannot skip while plotting"
         if self.current_index > 0:
+            self._cancel_auto_continue()
+            self._clear_chunk_progress()
             self.current_index -= 1
             self.update_file_pointers()
             self.save_session_state()
@@ -89,26 +190,23 @@ class PlotManager:
             return True, "Skipped Backward"
         return False, "Start of Queue"
 
+    @_queue_guard
     def toggle_pause(self):
         if self.state == "PAUSED":
             self.state = "IDLE"
             self.status_message = "Resumed. Ready to start."
             return "RESUMED"
         else:
+            self._cancel_auto_continue()
             self.state = "PAUSED"
-            self.status_message = "⏸️ Queue PAUSED. Finish current card."
+            self.status_message = "⏸️ Queue PAUSED. Stopping after the current chunk."
             return "PAUSED"
 
     # --- PEN INVENTORY ---
     def load_inventory(self):
-        if os.path.exists(INVENTORY_FILE):
-            try:
-                with open(INVENTORY_FILE, 'r') as f:
-                    data = json.load(f)
-                    self.pens = data.get('pens', {})
-                    self.current_pen_id = data.get('current_pen_id')
-            except: self.create_default_inventory()
-        else: self.create_default_inventory()
+        self.pens = store.load_pens()
+        self.current_pen_id = store.get_value("current_pen_id")
+        if not self.pens: self.create_default_inventory()
 
     def create_default_inventory(self):
         default_id = "default_pen"
@@ -117,56 +215,262 @@ class PlotManager:
         self.save_inventory()
 
     def save_inventory(self):
-        data = {"current_pen_id": self.current_pen_id, "pens": self.pens}
-        with open(INVENTORY_FILE, 'w') as f: json.dump(data, f, indent=4)
+        for pen_id, pen in self.pens.items(): store.save_pen(pen_id, pen)
+        store.set_value("current_pen_id", self.current_pen_id)
 
     def add_pen(self, name, capacity_meters):
         pen_id = str(uuid.uuid4())[:8]
         self.pens[pen_id] = {"name": name, "capacity": float(capacity_meters), "used": 0.0}
         self.current_pen_id = pen_id
-        self.save_inventory()
+        store.save_pen(pen_id, self.pens[pen_id])
+        store.set_value("current_pen_id", pen_id)
         return pen_id
 
     def set_active_pen(self, pen_id):
         if pen_id in self.pens:
             self.current_pen_id = pen_id
-            self.save_inventory()
+            store.set_value("current_pen_id", pen_id)
             return True
         return False
 
-    def deduct_ink(self, meters):
-        if self.current_pen_id and self.current_pen_id in self.pens:
-            self.pens[self.current_pen_id]['used'] += meters
+    def deduct_ink(self, meters, file=None, seconds=None):
+        with self._queue_lock:
+            pen_id = self.current_pen_id
+            if not pen_id or pen_id not in self.pens: return
+            self.pens[pen_id]['used'] += meters
             self.session_ink_meters += meters
-            self.save_inventory()
-            self.save_session_state()
+        store.add_ink(pen_id, meters, self._project_name(), file, seconds)
+        self.save_session_state()
+
+    def _project_name(self):
+        return os.path.basename(self.current_project_path) if self.current_project_path else None
 
     # --- QUEUE LOGIC ---
-    def load_batch(self, project_path):
+    @_queue_guard
+    def load_batch(self, project_path, stream=False, source=None):
+        """
+        Loads the project's live batch version (or `source`). stream=True loads a
+        version that is still being generated; cards are plotted as they appear.
+        """
         self.current_project_path = project_path
-        batch_dir = os.path.join(project_path, "generated_batch")
-        if not os.path.exists(batch_dir): return False, "No batch folder"
-        files = sorted([f for f in os.listdir(batch_dir) if f.endswith(".svg")])
-        if not files: return False, "No SVGs found"
-
-        self.batch_ink_stats = {}
-        try:
-            with open(os.path.join(batch_dir, "batch_stats.json"), 'r') as f: self.batch_ink_stats = json.load(f)
-        except: pass
-
-        self.queue = [os.path.join(batch_dir, f) for f in files]
+        building = batch_store.building_version(project_path) if stream else None
+        if building:
+            info = batch_store.build_info(building) or {}
+            if info.get("packed"): return False, "Batch is being packed; load it when generation finishes"
+        elif not batch_store.has_batch(project_path) and not source: return False, "No batch folder"
+
+        self._cancel_auto_continue()
+        self._discard_prepared()
+        if self.batch_container:
+            self.batch_container.close()
+            self.batch_container = None
+
+        if building: source, container, files = building, None, info.get("cards", [])
+        else: source, container, files = batch_store.open_batch(project_path, source)
+        if not files:
+            if container: container.close()
+            return False, "No SVGs found"
+        self.batch_container = container
+
+        self.batch_ink_stats = batch_store.read_manifest(source, container)
+        self.card_meta = batch_store.read_manifest(source, container, batch_store.CARDS_MANIFEST_NAME)
+
+        # Queue entries stay "<source>/<card>"; for containers the source is the .lcb file
+        # The loaded version is retained so garbage collection of old versions skips it
+        old_source, self.batch_source = self.batch_source, source
+        batch_store.retain(source)
+        if old_source:
+            batch_store.release(old_source)
+            # Deleting old versions is slow disk work: never under the queue lock
+            threading.Thread(target=batch_store.collect_garbage, args=(batch_store.project_of(old_source),), daemon=True).start()
+        self.streaming = bool(building)
+        self.queue = [os.path.join(source, f) for f in files]
+        self.queue_layers = [None] * len(self.queue)
         self.current_index = 0
+        self._clear_chunk_progress()
+        if self.streaming: self.pen_steps, self.plan_warnings = {}, []   # File order until the manifest exists
+        else: self._replan(0)
         self.session_ink_meters = 0.0
         self.update_file_pointers()
         self.state = "IDLE"
-        self.status_message = f"Loaded {len(self.queue)} files."
+        self.status_message = f"Loaded {len(self.queue)} files." + (" (streaming from generation)" if self.streaming else "")
+        self.save_session_state()
+        return True, self.status_message
+
+    @_queue_guard
+    def append_cards(self, project_path, source, cards):
+        """
+        Continuous intake: queues cards just generated into a version, without
+        touching the card being plotted. Only applies when that version is the one
+        loaded (or nothing could be loaded yet). cards: {file: manifest entry}.
+        Returns the number of cards queued.
+        """
+        if not cards or os.path.abspath(project_path) != os.path.abspath(self.current_project_path or ""): return 0
+        if not self.queue and self.state in ["IDLE", "COMPLETED"]:
+            # The project had no cards yet: load the live version now that it has some
+            return len(set(self.queue)) if self.load_batch(project_path)[0] else 0
+        if not self.batch_source or os.path.abspath(source) != os.path.abspath(self.batch_source): return 0
+
+        queued = {os.path.basename(p) for p in self.queue}
+        new = [f for f in cards if f not in queued]
+        if not new: return 0
+        self.card_meta.update(cards)
+        self.batch_ink_stats.update({f: m.get("ink_m", 0.0) for f, m in cards.items()})
+        before = len(self.queue)
+        finished = self.state == "COMPLETED"
+        if finished: self.current_index = min(self.current_index, before - 1)   # Continue moves on to the first new card
+
+        self.queue += [os.path.join(self.batch_source, f) for f in new]
+        self.queue_layers += [None] * len(new)
+        if not self.streaming:
+            # Pending cards are re-planned with the new ones; a pen prompt on screen keeps its card
+            self._replan(self._cards_done() + (1 if self.state == "WAITING_FOR_PEN" else 0))
+        self.update_file_pointers()
+        added = len(new)
+
+        if finished:
+            self.state = "WAITING_FOR_PAPER"
+            self.waiting_since = time.time()
+            self.status_message = f"📥 {added} new card(s) arrived. Change Paper -> Click Continue"
+            self._schedule_auto_continue()
+        elif self.state == "IDLE":
+            self.status_message = f"📥 {added} new card(s) queued ({len(set(self.queue))} cards in total)"
         self.save_session_state()
-        return True, f"Loaded {len(self.queue)} files."
+        return added
+
+    # --- SCHEDULING ---
+    @_queue_guard
+    def _replan(self, done):
+        """
+        Re-orders queue[done:] by pen and policy; queue[:done] is already plotted.
+        Multi-pen cards become one entry per pen layer (queue_layers). Pen swaps /
+        refills the plan needs are stored in pen_steps by queue index.
+        """
+        started = {os.path.basename(p) for p in self.queue[:done]}
+        pinned, cards, seen = [], [], set()
+        for path, layer in zip(self.queue[done:], self.queue_layers[done:]):
+            name = os.path.basename(path)
+            if layer is not None and name in started:
+                # A sheet with layers already on it keeps its remaining passes, in order
+                pinned.append(self._pass_info(name, layer))
+                continue
+            if name in seen: continue
+            seen.add(name)
+            meta = self.card_meta.get(name, {})
+            ink = meta.get("ink_m", self.batch_ink_stats.get(name, 0.5))
+            cards.append({"file": name, "pen": meta.get("pen"), "ink_m": ink, "layers": meta.get("layers"),
+                          "est_seconds": meta.get("est_seconds", scheduler.estimate_card_seconds(ink, 0))})
+        plan = scheduler.plan_queue(cards, self.pens, self.current_pen_id, self.queue_policy,
+                                    stack_size=self.layer_stack, pinned=pinned)
+
+        self.queue = self.queue[:done] + [os.path.join(self.batch_source, f) for f in plan["order"]]
+        self.queue_layers = self.queue_layers[:done] + plan["layers"]
+        self.plan_mode = plan["mode"]
+        self.pen_steps = {k: v for k, v in self.pen_steps.items() if k < done}   # A pen prompt already on screen stays valid
+        index, pending = done, []
+        for step in plan["steps"]:
+            if step["type"] == "pen":
+                pending.append(step)
+            else:
+                if pending: self.pen_steps[index] = pending
+                index, pending = index + 1, []
+        self.plan_warnings = plan["warnings"]
+
+    def _pass_info(self, name, layer=None):
+        """Pen, ink and estimate of one queue entry: a pen layer of a card, or the whole card."""
+        meta = self.card_meta.get(name, {})
+        info = {"file": name, "layer": layer, "pen": meta.get("pen"),
+                "ink_m": meta.get("ink_m", self.batch_ink_stats.get(name, 0.5)), "est_seconds": meta.get("est_seconds", 0.0)}
+        for entry in meta.get("layers") or []:
+            if entry["layer"] == layer:
+                info.update(pen=entry.get("pen") or meta.get("pen"), ink_m=entry.get("ink_m", 0.0), est_seconds=entry.get("est_seconds", 0.0))
+        return info
+
+    @_queue_guard
+    def _entry(self, index):
+        return self._pass_info(os.path.basename(self.queue[index]), self.queue_layers[index])
+
+    def _cards_done(self):
+        # The current card counts as plotted once we are past its plot
+        return self.current_index + (1 if self.state in ["PLOTTING", "WAITING_FOR_PAPER", "COMPLETED"] else 0)
+
+    @_queue_guard
+    def set_queue_policy(self, policy):
+        if policy not in scheduler.POLICIES: return False, f"Unknown policy '{policy}'"
+        self.queue_policy = policy
+        if self.queue and self.batch_source:
+            self._replan(self._cards_done())
+            self.update_file_pointers()
+            self.save_session_state()
+        return True, f"Queue ordered by {policy}"
+
+    @_queue_guard
+    def set_layer_stack(self, sheets):
+        """Registered sheets plotted per pen layer before swapping (1 = finish each card in turn)."""
+        try: self.layer_stack = max(1, int(sheets))
+        except (TypeError, ValueError): return False, "Invalid stack size"
+        if self.queue and self.batch_source:
+            self._replan(self._cards_done())
+            self.update_file_pointers()
+            self.save_session_state()
+        return True, f"Multi-pen cards: up to {self.layer_stack} sheet(s) per layer ({self.plan_mode})"
+
+    @_queue_guard
+    def _pending_pen_steps(self, index):
+        """Planned pen changes for a card that still apply to the pen now loaded."""
+        steps = []
+        for step in self.pen_steps.get(index, []):
+            pen = self.pens.get(step["pen_id"])
+            if pen is None: continue
+            if step["action"] == "swap" and step["pen_id"] == self.current_pen_id: continue
+            if step["action"] == "refill":
+                if pen["capacity"] - pen["used"] >= self._entry(index)["ink_m"]: continue
+            steps.append(step)
+        return steps
+
+    def _apply_pen_steps(self, index):
+        for step in self._pending_pen_steps(index):
+            if step["action"] == "refill": self.pens[step["pen_id"]]["used"] = 0.0
+            self.current_pen_id = step["pen_id"]
+        self.pen_steps.pop(index, None)
+        self.save_inventory()
 
+    def plan_summary(self, limit=20):
+        """Upcoming sequence from the current card: pen changes and cards with estimates."""
+        # Snapshot under the lock, walk the (possibly long) queue after releasing it
+        with self._queue_lock:
+            first = max(self.current_index, 0)
+            entries = list(zip(self.queue[first:], self.queue_layers[first:]))
+            pen_steps, pens = dict(self.pen_steps), dict(self.pens)
+            summary = {"policy": self.queue_policy, "mode": self.plan_mode, "layer_stack": self.layer_stack,
+                       "pen_swaps": sum(len(v) for k, v in pen_steps.items() if k >= self.current_index),
+                       "warnings": self.plan_warnings}
+        upcoming = []
+        remaining_s = 0.0
+        for index, (path, layer) in enumerate(entries, first):
+            entry = self._pass_info(os.path.basename(path), layer)
+            name, est = entry["file"], entry["est_seconds"]
+            remaining_s += est
+            if len(upcoming) >= limit: continue
+            for step in pen_steps.get(index, []):
+                upcoming.append({"type": "pen", "action": step["action"], "pen_id": step["pen_id"],
+                                 "pen_name": pens.get(step["pen_id"], {}).get("name"), "reason": step["reason"]})
+            upcoming.append({"type": "card", "index": index + 1, "file": name, "layer": entry["layer"], "est_seconds": est})
+        summary.update(est_remaining_seconds=round(remaining_s, 1), upcoming=upcoming)
+        return summary
+
+    @_queue_guard
+    def queue_position(self):
+        """(current index, queue length), read together for status pages."""
+        return self.current_index, len(self.queue)
+
+    @_queue_guard
     def update_file_pointers(self):
         self.current_file = os.path.basename(self.queue[self.current_index]) if 0 <= self.current_index < len(self.queue) else None
+        self.current_layer = self.queue_layers[self.current_index] if 0 <= self.current_index < len(self.queue_layers) else None
         self.next_file = os.path.basename(self.queue[self.current_index + 1]) if 0 <= self.current_index + 1 < len(self.queue) else None
 
+    @_queue_guard
     def start_queue(self):
         if not self.queue: return False, "Queue empty"
         if self.state == "PAUSED": return False, "Queue is Paused"
@@ -176,6 +480,7 @@ class PlotManager:
         self.process_current_file()
         return True, "Batch Started"
 
+    @_queue_guard
     def process_current_file(self):
         if self.current_index >= len(self.queue):
             self.state = "COMPLETED"
@@ -183,59 +488,287 @@ class PlotManager:
             self.clear_session_state()
             return
 
-        file_path = self.queue[self.current_index]
-        self.status_message = f"Plotting {self.current_index + 1}/{len(self.queue)}..."
-        t = threading.Thread(target=self._run_plot_thread, args=(file_path,))
-        t.start()
-
-    def _run_plot_thread(self, file_path):
+        # PEN CHANGE FIRST (planned swap or refill before this card)
+        steps = self._pending_pen_steps(self.current_index)
+        if steps:
+            step = steps[-1]
+            pen_name = self.pens[step["pen_id"]]["name"]
+            self.state = "WAITING_FOR_PEN"
+            self.waiting_since = time.time()
+            if step["action"] == "refill": self.status_message = f"🖊️ Replace pen '{pen_name}' ({step['reason']}) -> Click Continue"
+            elif self.current_index > 0 and self.queue[self.current_index - 1] == self.queue[self.current_index]:
+                self.status_message = f"🖊️ Load pen '{pen_name}' for layer {self.current_layer} (keep the paper in place) -> Click Continue"
+            else: self.status_message = f"🖊️ Load pen '{pen_name}' -> Click Continue"
+            return
+        self.pen_steps.pop(self.current_index, None)
+
+        self.status_message = f"Plotting {self.current_index + 1}/{len(self.queue)}" + (f" (layer {self.current_layer})..." if self.current_layer else "...")
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._worker_loop, daemon=True)
+            self._worker.start()
+        self._jobs.put(self.current_index)
+
+    def _worker_loop(self):
+        while True:
+            self._run_plot_job(self._jobs.get())
+
+    @contextmanager
+    def _plot_file(self, file_path):
+        """
+        Yields a real SVG path for the plotter. Cards inside a packed container
+        are decompressed to a temp file on demand and removed afterwards.
+        """
+        if self.batch_container and not os.path.exists(file_path):
+            with self.batch_container.extracted(os.path.basename(file_path)) as tmp_path:
+                yield tmp_path
+        else:
+            yield file_path
+
+    def _precompiled_program(self, file_path, fmt, stack):
+        name = os.path.splitext(os.path.basename(file_path))[0] + motion_export.FORMATS[fmt]
+        if self.batch_container:
+            if not self.batch_container.has_file(name): return None
+            return stack.enter_context(self.batch_container.extracted_file(name))
+        path = os.path.join(os.path.dirname(file_path), name)
+        return path if os.path.exists(path) else None
+
+    # --- JOB STAGING ---
+    def _prepare_job(self, index):
+        """
+        Everything a card needs before the pen moves: resolved/extracted file,
+        file contents warm in the OS cache, and the finished command line.
+        """
+        with self._queue_lock: file_path, layer = self.queue[index], self.queue_layers[index]
+        settings = self.card_settings(os.path.basename(file_path))
+        stack = ExitStack()
         try:
-            # 1. COMMAND CONSTRUCTION
-            cmd = [AXICLI_PATH, file_path]
-
-            # 2. CHECK FOR CONFIG FILE
-            if os.path.exists(CONFIG_FILE):
-                cmd += ['--config', CONFIG_FILE]
-            else:
-                # Safe Fallback if you delete the file by accident
-                cmd += ['--speed_pendown', '25', '--speed_penup', '75']
-
-            # 3. RUN PLOT
-            subprocess.run(
-                cmd,
-                check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
-            )
-
-            # 4. DEDUCT INK & CLEANUP
-            fname = os.path.basename(file_path)
-            self.deduct_ink(self.batch_ink_stats.get(fname, 0.5))
+            svg_path = stack.enter_context(self._plot_file(file_path))
+            chunk_dir = stack.enter_context(tempfile.TemporaryDirectory(prefix="linecraft_chunks_"))
+            # Multi-pen cards: only this pass's pen layer is sent to the plotter
+            if layer is not None: svg_path = plotter_backend.layer_file(svg_path, layer, chunk_dir)
+            chunks = plotter_backend.split_card(svg_path, chunk_dir)
+            # Backends that run motion programs take the one compiled at generation time (if still at that speed)
+            program_format = getattr(self.backend, "program_format", None)
+            compiled_speed = self.card_meta.get(os.path.basename(file_path), {}).get("speed_pendown")
+            if program_format and layer is None and len(chunks) == 1 and compiled_speed == settings["speed_pendown"]:
+                program = self._precompiled_program(file_path, program_format, stack)
+                if program: chunks = [program]
+            cmds = [self.backend.build_command(c, settings) for c in chunks]
+        except Exception:
+            stack.close()
+            raise
+        return {"index": index, "file_path": file_path, "layer": layer, "svg_path": svg_path, "chunks": chunks, "cmds": cmds,
+                "settings": settings, "cleanup": stack}
+
+    def card_settings(self, fname):
+        """
+        Motion settings for one card: config.py, the card's speed profile from
+        generation, then the project's speed_overrides.json. All re-read per card.
+        """
+        return speed_profile.effective_settings(motion_model.read_motion_config(CONFIG_FILE),
+                                                self.card_meta.get(fname, {}).get("speed"),
+                                                speed_profile.read_overrides(self.current_project_path), fname)
+
+    def _await_card(self, index, poll=0.5):
+        """
+        Streaming: blocks until generation has written the card. Once the build
+        finishes, the manifests are read and the remaining cards re-planned.
+        """
+        with self._queue_lock: path = self.queue[index]
+        while self.streaming:
+            if batch_store.build_info(self.batch_source) is None:
+                with self._queue_lock:
+                    self.streaming = False
+                    self.batch_ink_stats = batch_store.read_manifest(self.batch_source, None)
+                    self.card_meta = batch_store.read_manifest(self.batch_source, None, batch_store.CARDS_MANIFEST_NAME)
+                    self._replan(index + 1)
+                break
+            if os.path.exists(path): return
+            self.status_message = f"⏳ Waiting for card {index + 1} to be generated..."
+            time.sleep(poll)
+        if not os.path.exists(path): raise RuntimeError(f"{os.path.basename(path)} was not generated")
+        with self._queue_lock: self.status_message = f"Plotting {index + 1}/{len(self.queue)}..."
+
+    def _stage_next(self, index):
+        # Runs while the current card is plotting
+        with self._queue_lock:
+            if index >= len(self.queue): return
+            path = self.queue[index]
+        if self.streaming and not os.path.exists(path): return
+        try: job = self._prepare_job(index)
+        except Exception: return
+        with self._prep_lock:
+            old, self._prepared = self._prepared, job
+        if old: old["cleanup"].close()
+
+    def _take_prepared(self, index):
+        with self._prep_lock:
+            job, self._prepared = self._prepared, None
+        with self._queue_lock: entry = (self.queue[index], self.queue_layers[index]) if index < len(self.queue) else None
+        if job and job["index"] == index and entry == (job["file_path"], job["layer"]):
+            return job
+        if job: job["cleanup"].close()
+        return self._prepare_job(index)
+
+    def _discard_prepared(self):
+        with self._prep_lock:
+            job, self._prepared = self._prepared, None
+        if job: job["cleanup"].close()
+
+    def _run_plot_job(self, index):
+        job = None
+        try:
+            if self.streaming: self._await_card(index)
+            job = self._take_prepared(index)
+            fname, layer = os.path.basename(job["file_path"]), job["layer"]
+            total = len(job["chunks"])
+            start = self.chunk_index if self.chunk_card == fname and self.chunk_layer == layer and self.chunk_index < total else 0
+            self.chunk_card, self.chunk_layer, self.chunk_index, self.chunk_total = fname, layer, start, total
+            started = time.time()
+
+            # 3. PLOT CHUNK BY CHUNK (progress saved after each, a pause stops at the next boundary)
+            with metrics.timed("linecraft_plot_seconds"):
+                for k in range(start, total):
+                    if k > start and self.state == "PAUSED": break
+                    if total > 1:
+                        with self._queue_lock: self.status_message = f"Plotting {index + 1}/{len(self.queue)} (chunk {k + 1}/{total})..."
+                    stage = (lambda: self._stage_next(index + 1)) if k == start else None
+                    self.backend.plot(job["chunks"][k], job["cmds"][k], while_plotting=stage, settings=job["settings"])
+                    self.chunk_index = k + 1
+                    if total > 1: self.save_session_state()
+
+            self._after_plot(index, job, started)
 
-            subprocess.run([AXICLI_PATH, '--mode', 'manual', '--manual_cmd', 'disable_xy'], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except Exception as e:
+            with self._queue_lock:
+                self.state = "ERROR"
+                self.status_message = f"Error: {str(e)}"
+                resumable = self.chunk_total > 1 and self.chunk_index > 0
+                if resumable: self.status_message += f" (Start resumes at chunk {self.chunk_index + 1}/{self.chunk_total})"
+            if resumable: self.save_session_state()
+            metrics.inc("linecraft_plot_errors_total")
+            store.log_event("error", self._project_name(), self.current_file, self.current_pen_id, str(e))
+        finally:
+            if job: job["cleanup"].close()
+
+    def _after_plot(self, index, job, started):
+        """
+        Bookkeeping once the pen is up: progress of a paused card, or ink, metrics
+        and the next step. Machine and store I/O run outside the queue lock.
+        """
+        total = len(job["chunks"])
+        fname = os.path.basename(job["file_path"])
+        self.backend.manual('disable_xy', check=True)
+        if self.chunk_index < total:
+            self.status_message = f"⏸️ Paused mid-card (chunk {self.chunk_index}/{total} done). Resume and Start to finish it, Prev/Next to restart."
+            self.save_session_state()
+            return
 
-            # 5. NEXT STEP
+        # 4. DEDUCT INK & CLEANUP
+        with self._queue_lock:
+            self._clear_chunk_progress()
+            ink = self._entry(index)["ink_m"]
+            same_sheet_next = index + 1 < len(self.queue) and self.queue[index + 1] == job["file_path"]
+        self.deduct_ink(ink, fname, round(time.time() - started, 1))
+        metrics.observe("linecraft_ink_per_card_meters", ink)
+        if not same_sheet_next: metrics.inc("linecraft_cards_plotted_total")
+
+        # 5. NEXT STEP
+        with self._queue_lock:
             if self.state == "PAUSED":
-                self.save_session_state()
                 self.status_message = "⏸️ Paused. Check Quality. Resume to Reprint or Next to Skip."
+            elif same_sheet_next:
+                # Next pen layer of the same sheet: the paper stays, only the pen may change
+                self.current_index += 1
+                self.update_file_pointers()
+                self.process_current_file()
             elif self.current_index + 1 < len(self.queue):
                 self.state = "WAITING_FOR_PAPER"
-                self.status_message = "⚠️ Change Paper -> Click Continue"
-                self.save_session_state()
+                self.waiting_since = time.time()
+                next_layer = self.queue_layers[self.current_index + 1]
+                next_name = os.path.basename(self.queue[self.current_index + 1])
+                if next_layer is not None and next_name in {os.path.basename(p) for p in self.queue[:self.current_index + 1]}:
+                    self.status_message = f"⚠️ Feed sheet {next_name} again (registered) for layer {next_layer} -> Click Continue"
+                else: self.status_message = "⚠️ Change Paper -> Click Continue"
+                self._schedule_auto_continue()
             else:
                 self.state = "COMPLETED"
                 self.status_message = "All done!"
-                self.clear_session_state()
-
-        except Exception as e:
-            self.state = "ERROR"
-            self.status_message = f"Error: {str(e)}"
-
+            completed = self.state == "COMPLETED"
+        if completed: self.clear_session_state()
+        else: self.save_session_state()
+
+    def _clear_chunk_progress(self):
+        self.chunk_card, self.chunk_layer, self.chunk_index, self.chunk_total = None, None, 0, 0
+
+    # --- AUTO-CONTINUE & EXTERNAL TRIGGERS ---
+    @_queue_guard
+    def set_auto_continue(self, delay_seconds):
+        self.auto_continue_delay = max(0.0, float(delay_seconds or 0))
+        if self.auto_continue_delay == 0: self._cancel_auto_continue()
+        elif self.state == "WAITING_FOR_PAPER": self._schedule_auto_continue()
+        if self.current_project_path: self.save_session_state()
+
+    def _schedule_auto_continue(self):
+        self._cancel_auto_continue()
+        if self.auto_continue_delay <= 0: return
+        self.auto_continue_at = time.time() + self.auto_continue_delay
+        self.status_message = f"⚠️ Change Paper -> auto-continue in {self.auto_continue_delay:g}s"
+        self._auto_seq += 1
+        self._auto_timer = threading.Timer(self.auto_continue_delay, self._auto_continue, args=(self._auto_seq,))
+        self._auto_timer.daemon = True
+        self._auto_timer.start()
+
+    def _cancel_auto_continue(self):
+        if self._auto_timer: self._auto_timer.cancel()
+        self._auto_timer = None
+        self.auto_continue_at = None
+
+    @_queue_guard
+    def _auto_continue(self, seq):
+        # Checked under the lock: the operator may have continued (or re-armed the timer) since it fired
+        if self._auto_timer is None or seq != self._auto_seq: return
+        self._auto_timer = None
+        self.auto_continue_at = None
+        if self.state == "WAITING_FOR_PAPER": self.user_continue()
+
+    @_queue_guard
+    def trigger(self):
+        """
+        One-button hook for foot pedals / keyboard wedges: continue after a paper
+        change, or start the loaded queue when idle.
+        """
+        if self.state in ["WAITING_FOR_PAPER", "WAITING_FOR_PEN"]:
+            self.user_continue()
+            return True, "Continued"
+        if self.state == "IDLE" and self.queue:
+            return self.start_queue()
+        return False, f"Nothing to trigger ({self.state})"
+
+    @_queue_guard
     def user_continue(self):
         if self.state == "WAITING_FOR_PAPER":
+            self._cancel_auto_continue()
+            if self.waiting_since:
+                metrics.observe("linecraft_operator_wait_seconds", time.time() - self.waiting_since)
+                self.waiting_since = None
             self.current_index += 1
             self.update_file_pointers()
             self.state = "PLOTTING"
             self.process_current_file()
             return True
+        if self.state == "WAITING_FOR_PEN":
+            if self.waiting_since:
+                metrics.observe("linecraft_operator_wait_seconds", time.time() - self.waiting_since)
+                self.waiting_since = None
+            self._apply_pen_steps(self.current_index)
+            self.state = "PLOTTING"
+            self.process_current_file()
+            return True
         return False
 
+def _passes(files, layers):
+    # Queue entries as comparable (card, layer) pairs
+    return sorted((f, layer or 0) for f, layer in zip(files, layers))
+
 manager = PlotManager()
@@ -0,0 +1,245 @@
+import os
+import time
+import random
+import subprocess
+import xml.etree.ElementTree as ET
+
+import svg_geometry
+import motion_model
+import motion_export
+import metrics
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_FILE = os.path.join(BASE_DIR, "config.py")
+
+ET.register_namespace('', "http://www.w3.org/2000/svg")
+ET.register_namespace('inkscape', "http://www.inkscape.org/namespaces/inkscape")
+
+# Cards with more pen-down strokes than this are plotted in chunks (0 = never split)
+CHUNK_STROKES = int(os.environ.get("LINECRAFT_CHUNK_STROKES", "250"))
+
+# axicli options a per-card speed profile may set (they override --config)
+MOTION_OPTIONS = ("speed_pendown", "speed_penup", "accel", "pen_rate_lower", "pen_rate_raise")
+
+# --- CHUNKING ---
+def split_card(svg_path, out_dir, max_strokes=CHUNK_STROKES, tolerance=0.05):
+    """
+    Splits a card into chunk SVGs of about max_strokes strokes, in drawing order.
+    Each chunk is the card itself with only some of its drawable elements, so
+    groups, layers, styles and transforms plot exactly as in the whole card; only
+    a path with more strokes than a chunk is divided (its pieces keep its attributes).
+    Returns [svg_path] unchanged when the card fits in one chunk, or holds content
+    that cannot be divided (text, clones).
+    The split is deterministic, so a saved chunk index stays valid across restarts.
+    """
+    if max_strokes <= 0: return [svg_path]
+    tree = ET.parse(svg_path)
+    root = tree.getroot()
+    if svg_geometry.has_unsplittable(root): return [svg_path]
+    elements = [(e, [s for s in svg_geometry.path_to_polylines(svg_geometry.shape_to_d(e), tolerance) if len(s) > 1])
+                for e in svg_geometry.drawable_elements(root)]
+    if sum(len(strokes) for _, strokes in elements) <= max_strokes: return [svg_path]
+
+    # Whole elements per chunk; an element that would overflow starts the next one
+    parts, count = [{}], 0
+    for elem, strokes in elements:
+        if len(strokes) <= max_strokes or svg_geometry.local_tag(elem) != 'path':
+            if count and count + len(strokes) > max_strokes: parts, count = parts + [{}], 0
+            parts[-1][elem] = None
+            count += len(strokes)
+            continue
+        for start in range(0, len(strokes), max_strokes):
+            if count: parts, count = parts + [{}], 0
+            piece = strokes[start:start + max_strokes]
+            parts[-1][elem] = svg_geometry.polylines_to_d(piece, precision=3)
+            count = len(piece)
+
+    base = os.path.splitext(os.path.basename(svg_path))[0]
+    chunks = []
+    for k, keep in enumerate(parts):
+        chunk_path = os.path.join(out_dir, f"{base}.chunk{k:03d}.svg")
+        ET.ElementTree(svg_geometry.subset_copy(root, keep)).write(chunk_path, encoding="utf-8", xml_declaration=True)
+        chunks.append(chunk_path)
+    return chunks
+
+# --- PEN LAYERS ---
+def layer_file(svg_path, layer, out_dir):
+    """
+    Writes the card with only the drawable content of one pen layer (numbered
+    Inkscape layers / data-layer groups, see svg_geometry.pen_layer) and returns its path.
+    """
+    tree = ET.parse(svg_path)
+    base = os.path.splitext(os.path.basename(svg_path))[0]
+    layer_path = os.path.join(out_dir, f"{base}.layer{layer}.svg")
+    ET.ElementTree(svg_geometry.layer_copy(tree.getroot(), layer)).write(layer_path, encoding="utf-8", xml_declaration=True)
+    return layer_path
+
+# --- BACKENDS ---
+class AxiCliBackend:
+    """
+    Plots through the axicli command line tool (one process per file).
+    """
+    name = "axicli"
+
+    def __init__(self, path, config_file=CONFIG_FILE):
+        self.path = path
+        self.config_file = config_file
+
+    def build_command(self, file_path, settings=None):
+        # 1. COMMAND CONSTRUCTION
+        cmd = [self.path, file_path]
+
+        # 2. CHECK FOR CONFIG FILE
+        if os.path.exists(self.config_file):
+            cmd += ['--config', self.config_file]
+        elif not settings:
+            # Safe Fallback if you delete the file by accident
+            cmd += ['--speed_pendown', '25', '--speed_penup', '75']
+
+        # 3. PER-CARD SPEED PROFILE (command line options win over the config file)
+        for key in MOTION_OPTIONS:
+            if settings and key in settings: cmd += [f'--{key}', str(int(round(settings[key])))]
+        return cmd
+
+    def plot(self, file_path, cmd=None, while_plotting=None, settings=None):
+        if cmd is None: cmd = self.build_command(file_path, settings)
+
+        # 3. RUN PLOT (spawn timed separately from the plot itself)
+        spawn_start = time.perf_counter()
+        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        metrics.observe("linecraft_subprocess_spawn_seconds", time.perf_counter() - spawn_start)
+        if while_plotting: while_plotting()
+        if proc.wait() != 0:
+            raise subprocess.CalledProcessError(proc.returncode, cmd)
+
+    def manual(self, command, check=False):
+        """axicli manual command: raise_pen, lower_pen, disable_xy, ..."""
+        subprocess.run([self.path, '--mode', 'manual', '--manual_cmd', command], check=check,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+class SimulatedBackend:
+    """
+    Stand-in plotter for tests, demos and load tests: no hardware, no subprocess.
+    Each file is timed with the motion model (card speed profile or config.py, trapezoidal moves).
+    time_scale: fraction of the simulated time to actually sleep (0 = instant).
+    fault_rate: chance that a plot fails partway; fail_on(n) forces the n-th next call to fail.
+    """
+    name = "sim"
+
+    def __init__(self, time_scale=0.0, fault_rate=0.0, seed=None, config_file=CONFIG_FILE):
+        self.time_scale = time_scale
+        self.fault_rate = fault_rate
+        self.config_file = config_file
+        self.rng = random.Random(seed)
+        self.plotted = []
+        self.manual_log = []
+        self.motion_seconds = 0.0
+        self.faults = 0
+        self.last_timing = None
+        self._fail_at = None
+
+    def fail_on(self, call_number):
+        self._fail_at = len(self.plotted) + self.faults + call_number
+
+    def build_command(self, file_path, settings=None):
+        return ["sim", file_path]
+
+    def plot(self, file_path, cmd=None, while_plotting=None, settings=None):
+        # Re-read like axicli --config, so speed edits apply to the next file
+        limits = motion_model.MotionLimits(settings or motion_model.read_motion_config(self.config_file))
+        timing = motion_model.svg_plot_time(ET.parse(file_path).getroot(), limits)
+        if while_plotting: while_plotting()
+
+        forced = self._fail_at is not None and len(self.plotted) + self.faults + 1 >= self._fail_at
+        if forced or (self.fault_rate and self.rng.random() < self.fault_rate):
+            if forced: self._fail_at = None
+            self.faults += 1
+            self._run(timing["total_s"] * self.rng.random())
+            raise RuntimeError(f"Simulated fault while plotting {os.path.basename(file_path)}")
+
+        self._run(timing["total_s"])
+        self.last_timing = timing
+        self.plotted.append(file_path)
+
+    def _run(self, seconds):
+        self.motion_seconds += seconds
+        if self.time_scale > 0: time.sleep(seconds * self.time_scale)
+
+    def manual(self, command, check=False):
+        self.manual_log.append(command)
+
+class GrblBackend:
+    """
+    Streams G-code to a GRBL pen plotter over serial (needs pyserial).
+    Takes precompiled .gcode programs as-is; SVG files are compiled on the fly.
+    """
+    name = "grbl"
+    program_format = "gcode"
+
+    def __init__(self, port, baud=115200, config_file=CONFIG_FILE):
+        self.port = port
+        self.baud = baud
+        self.config_file = config_file
+        self._serial = None
+
+    def _connection(self):
+        if self._serial is None:
+            try: import serial
+            except ImportError: raise RuntimeError("GRBL backend needs pyserial (pip install pyserial)")
+            conn = serial.Serial(self.port, self.baud, timeout=30)
+            conn.write(b"\r\n\r\n")
+            time.sleep(2)               # GRBL resets when the port opens
+            conn.reset_input_buffer()
+            self._serial = conn
+        return self._serial
+
+    def _send(self, line):
+        conn = self._connection()
+        conn.write(line.encode("ascii") + b"\n")
+        while True:
+            reply = conn.readline().decode("ascii", "replace").strip()
+            if reply == "ok": return
+            if reply.startswith("error") or reply.startswith("ALARM"):
+                raise RuntimeError(f"GRBL {reply} on '{line}'")
+            if not reply: raise RuntimeError(f"GRBL did not answer '{line}'")
+
+    def build_command(self, file_path, settings=None):
+        return ["grbl", self.port, file_path]
+
+    def plot(self, file_path, cmd=None, while_plotting=None, settings=None):
+        if file_path.endswith(".gcode"):
+            with open(file_path, "r", encoding="ascii") as f: program = f.read()
+        else:
+            limits = motion_model.MotionLimits(settings or motion_model.read_motion_config(self.config_file))
+            program = motion_export.compile_card(file_path, "gcode", limits).decode("ascii")
+        self._connection()
+        if while_plotting: while_plotting()
+        for line in program.splitlines():
+            line = line.split(';')[0].strip()
+            if line: self._send(line)
+
+    def manual(self, command, check=False):
+        # GRBL releases the motors by itself after its idle delay ($1)
+        gcode = {"raise_pen": motion_export.GCODE_PEN_UP, "lower_pen": motion_export.GCODE_PEN_DOWN}.get(command)
+        if not gcode: return
+        try: self._send(gcode)
+        except Exception:
+            if check: raise
+
+def create_backend(axicli_path, config_file=CONFIG_FILE):
+    """
+    LINECRAFT_BACKEND=sim selects the simulator (LINECRAFT_SIM_TIME_SCALE,
+    LINECRAFT_SIM_FAULT_RATE tune it), grbl a serial GRBL plotter
+    (LINECRAFT_GRBL_PORT, LINECRAFT_GRBL_BAUD); anything else plots through axicli.
+    """
+    kind = os.environ.get("LINECRAFT_BACKEND", "axicli").lower()
+    if kind == "sim":
+        print("🧪 Plotter backend: simulator")
+        return SimulatedBackend(time_scale=float(os.environ.get("LINECRAFT_SIM_TIME_SCALE", "0.05")),
+                                fault_rate=float(os.environ.get("LINECRAFT_SIM_FAULT_RATE", "0")),
+                                config_file=config_file)
+    if kind == "grbl":
+        print("🔌 Plotter backend: GRBL")
+        return GrblBackend(os.environ.get("LINECRAFT_GRBL_PORT", "/dev/ttyUSB0"),
+                           int(os.environ.get("LINECRAFT_GRBL_BAUD", "115200")), config_file)
+    return AxiCliBackend(axicli_path, config_file)
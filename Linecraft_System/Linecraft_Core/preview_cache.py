@@ -0,0 +1,127 @@
+import hashlib
+import struct
+import threading
+import zlib
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+
+import svg_geometry
+
+# DEFAULTS
+PREVIEW_TOLERANCE = 0.5     # Curve flattening in user units; plenty for a thumbnail
+SVG_PRECISION = 1           # Decimal places kept in the simplified path
+PNG_WIDTH = 320
+MAX_PNG_WIDTH = 1200
+
+def render_preview_svg(svg_bytes, precision=SVG_PRECISION):
+    """
+    Collapses every drawable element of a card into ONE reduced-precision path.
+    Browsers render one long path far faster than thousands of transformed glyph paths.
+    """
+    root = ET.fromstring(svg_bytes)
+    min_x, min_y, width, height = svg_geometry.viewbox(root)
+    strokes = list(svg_geometry.iter_polylines(root, PREVIEW_TOLERANCE))
+    d = svg_geometry.polylines_to_d(strokes, precision)
+    stroke_w = max(width, height) / 400.0
+    out = (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="{min_x:g} {min_y:g} {width:g} {height:g}">'
+           f'<rect x="{min_x:g}" y="{min_y:g}" width="{width:g}" height="{height:g}" fill="white"/>'
+           f'<path d="{d}" fill="none" stroke="black" stroke-width="{stroke_w:.3g}" '
+           f'stroke-linecap="round" stroke-linejoin="round"/></svg>')
+    return out.encode('utf-8')
+
+def render_preview_png(svg_bytes, width=PNG_WIDTH):
+    """
+    Rasterizes a card locally (no external renderer) into a greyscale PNG thumbnail.
+    """
+    root = ET.fromstring(svg_bytes)
+    min_x, min_y, vb_w, vb_h = svg_geometry.viewbox(root)
+    width = max(16, min(MAX_PNG_WIDTH, int(width)))
+    scale = width / vb_w if vb_w else 1.0
+    height = max(1, int(round(vb_h * scale)))
+    pixels = bytearray(b'\xff' * (width * height))
+
+    def plot(x, y):
+        if 0 <= x < width and 0 <= y < height: pixels[y * width + x] = 0
+
+    for stroke in svg_geometry.iter_polylines(root, PREVIEW_TOLERANCE / max(scale, 1e-6)):
+        pts = [((x - min_x) * scale, (y - min_y) * scale) for x, y in stroke]
+        for (x0, y0), (x1, y1) in zip(pts, pts[1:]):
+            # DDA line: one sample per pixel along the longer axis
+            steps = int(max(abs(x1 - x0), abs(y1 - y0))) + 1
+            for i in range(steps + 1):
+                t = i / steps
+                plot(int(x0 + (x1 - x0) * t), int(y0 + (y1 - y0) * t))
+
+    raw = b''.join(b'\x00' + bytes(pixels[r * width:(r + 1) * width]) for r in range(height))
+
+    def chunk(tag, data):
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff)
+
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 0, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(raw, 6))
+            + chunk(b'IEND', b''))
+
+class PreviewCache:
+    """
+    LRU cache of rendered previews keyed by (content hash, format, width).
+    The content hash doubles as the HTTP ETag, so unchanged cards answer 304.
+    """
+    MIMETYPES = {"svg": "image/svg+xml", "png": "image/png"}
+
+    def __init__(self, max_entries=512, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._hashes = {}   # source signature -> content hash (avoids re-hashing unchanged files)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def content_hash(self, svg_bytes, signature=None):
+        if signature is not None:
+            cached = self._hashes.get(signature)
+            if cached: return cached
+        digest = hashlib.sha1(svg_bytes).hexdigest()
+        if signature is not None:
+            if len(self._hashes) > self.max_entries * 4: self._hashes.clear()
+            self._hashes[signature] = digest
+        return digest
+
+    def etag_for(self, digest, fmt, width):
+        return f"{digest[:20]}-{fmt}-{width}"
+
+    def get(self, svg_bytes, fmt="svg", width=PNG_WIDTH, signature=None):
+        """
+        Returns (etag, data, mimetype). Renders on a miss.
+        """
+        if fmt not in self.MIMETYPES: fmt = "svg"
+        if fmt == "svg": width = 0
+        digest = self.content_hash(svg_bytes, signature)
+        key = (digest, fmt, width)
+
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self.etag_for(*key), data, self.MIMETYPES[fmt]
+            self.misses += 1
+
+        data = render_preview_png(svg_bytes, width) if fmt == "png" else render_preview_svg(svg_bytes)
+
+        with self._lock:
+            if key not in self._items:
+                self._items[key] = data
+                self._bytes += len(data)
+            while self._items and (len(self._items) > self.max_entries or self._bytes > self.max_bytes):
+                _, old = self._items.popitem(last=False)
+                self._bytes -= len(old)
+        return self.etag_for(*key), data, self.MIMETYPES[fmt]
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._items), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
+
+cache = PreviewCache()
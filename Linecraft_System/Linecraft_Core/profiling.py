@@ -0,0 +1,87 @@
+import os
+import pstats
+import cProfile
+
+# Profiles are standard pstats dumps: open with snakeviz, tuna, gprof2dot or python -m pstats
+PROFILE_NAME = "generation.prof"     # Inside the batch version it was recorded for (packed into .lcb with it)
+SAMPLE_NAME = "sample.prof"          # Latest N-card sample run, next to the batch versions
+SAMPLE_CARDS = 50
+TOP = 15
+
+# Functions reported on their own in every summary: label -> (file, function name) pairs
+FOCUS = {
+    "process_template": [("template_engine.py", "process_template")],
+    "_generate_path_group": [("template_engine.py", "_generate_path_group")],
+    "path_length": [("font_registry.py", "path_length")],   # Glyph ink lengths, measured once per loaded font
+    "layout": [("template_engine.py", "_layout_text")],
+    "serialization": [("ElementTree.py", "tostring"), ("~", "<method 'write' of '_io.BufferedWriter' objects>"),
+                      ("__init__.py", "dump")],
+}
+
+def start():
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+def finish(profiler, path, top=TOP):
+    """Stops the profiler, writes its stats to path (renamed into place) and returns summary()."""
+    profiler.disable()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    profiler.dump_stats(path + ".tmp")
+    os.replace(path + ".tmp", path)
+    return summary(pstats.Stats(profiler), path, top)
+
+def label(key):
+    """'font_registry.py:68 path_length' for a pstats key (file, line, function)."""
+    path, line, name = key
+    return name if path == "~" else f"{os.path.basename(path)}:{line} {name}"
+
+def summary(stats, path=None, top=TOP):
+    """
+    The top functions by own time, plus the FOCUS functions (calls, time including
+    callees, share of the run), from a pstats.Stats.
+    """
+    total = stats.total_tt or 1e-9
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:top]
+    hot_spots = [{"function": label(key), "calls": nc, "self_s": round(tt, 4), "cumulative_s": round(ct, 4),
+                  "self_pct": round(100 * tt / total, 1)} for key, (cc, nc, tt, ct, callers) in rows]
+
+    focus = {}
+    for name, targets in FOCUS.items():
+        calls, cumulative = 0, 0.0
+        for (path_, line, func), (cc, nc, tt, ct, callers) in stats.stats.items():
+            if any(func == f and os.path.basename(path_) == os.path.basename(p) for p, f in targets):
+                calls += nc
+                cumulative += ct
+        focus[name] = {"calls": calls, "cumulative_s": round(cumulative, 4), "pct": round(100 * cumulative / total, 1),
+                       "per_call_ms": round(1000 * cumulative / calls, 3) if calls else 0.0}
+    return {"file": path, "total_s": round(stats.total_tt, 4), "hot_spots": hot_spots, "focus": focus}
+
+def print_summary(report, top=10):
+    for name, f in report["focus"].items():
+        if f["calls"]: print(f"   {name}: {f['cumulative_s']}s ({f['pct']}%), {f['calls']} calls, {f['per_call_ms']} ms/call")
+    print("   Hot spots (own time):")
+    for h in report["hot_spots"][:top]:
+        print(f"   {h['self_pct']:5.1f}%  {h['self_s']:8.4f}s  {h['calls']:>8}  {h['function']}")
+
+if __name__ == "__main__":
+    import json
+    import argparse
+    import job_generator
+
+    parser = argparse.ArgumentParser(description="Profile a project's card generation (full batch or a sample of cards).")
+    parser.add_argument("project", help="Project folder with input.csv and template.svg")
+    parser.add_argument("--cards", type=int, default=None, help=f"Profile only the first N cards (no batch is written; e.g. {SAMPLE_CARDS})")
+    parser.add_argument("--top", type=int, default=TOP)
+    parser.add_argument("--json", action="store_true", help="Print the raw report")
+    args = parser.parse_args()
+
+    try:
+        with open(os.path.join(args.project, "project_settings.json"), "r") as f: settings = json.load(f)
+    except (OSError, ValueError): settings = {}
+    options = job_generator.generation_options(settings)
+    if args.cards: result = job_generator.profile_cards_api(args.project, cards=args.cards, top=args.top, **options)
+    else: result = job_generator.generate_batch_api(args.project, compress=bool(settings.get("compress_batch")), profile=True, profile_top=args.top, **options)
+    if not result.get("success"): raise SystemExit(f"❌ {result.get('error')}")
+    if args.json: print(json.dumps(result["profile"], indent=2))
+    else: print_summary(result["profile"], args.top)
@@ -0,0 +1,124 @@
+from motion_model import read_motion_config, MAX_SPEED_MM_S, PEN_MOVE_S_AT_50
+
+POLICIES = ("file", "shortest_first", "longest_first")
+
+AVG_TRAVEL_MM = 6.0            # Typical pen-up hop between strokes of handwriting
+
+def estimate_card_seconds(ink_m, pen_lifts, config=None):
+    """
+    Rough plot duration from pen-down length and number of pen lifts.
+    """
+    c = config or read_motion_config()
+    v_down = MAX_SPEED_MM_S * max(c["speed_pendown"], 1) / 100.0
+    v_up = MAX_SPEED_MM_S * max(c["speed_penup"], 1) / 100.0
+    pen_time = PEN_MOVE_S_AT_50 * (50.0 / max(c["pen_rate_lower"], 1) + 50.0 / max(c["pen_rate_raise"], 1))
+    return (ink_m * 1000.0) / v_down + pen_lifts * (pen_time + AVG_TRAVEL_MM / v_up)
+
+def resolve_pen(requested, pens):
+    """Matches a CSV/setting pen value to an inventory id (by id, then by name)."""
+    if not requested: return None
+    if requested in pens: return requested
+    wanted = str(requested).strip().lower()
+    for pen_id, pen in pens.items():
+        if pen.get("name", "").strip().lower() == wanted: return pen_id
+    return None
+
+def card_passes(card):
+    """
+    Plot passes of one card: one per pen layer for layered cards (lowest layer
+    first), otherwise the whole card. Layers without a pen of their own use the card's.
+    """
+    layers = card.get("layers")
+    if not layers: return [dict(card, layer=None)]
+    return [{"file": card["file"], "layer": l["layer"], "pen": l.get("pen") or card.get("pen"),
+             "ink_m": l.get("ink_m", 0.0), "est_seconds": l.get("est_seconds", 0.0)}
+            for l in sorted(layers, key=lambda l: l["layer"])]
+
+def stack_passes(cards, stack_size=1):
+    """
+    Orders the passes of cards (already in plotting order). stack_size=1: each card
+    is finished (all its layers) before the next sheet. Larger stacks plot layer 1
+    on up to stack_size registered sheets, then layer 2 on the same sheets, and so on.
+    """
+    passes = []
+    for start in range(0, len(cards), max(1, stack_size)):
+        stack = [card_passes(c) for c in cards[start:start + max(1, stack_size)]]
+        for round_index in range(max(len(p) for p in stack)):
+            passes += [p[round_index] for p in stack if round_index < len(p)]
+    return passes
+
+def plan_queue(cards, pens, current_pen_id, policy="file", reserve_m=0.0, stack_size=1, pinned=()):
+    """
+    Orders cards to minimise pen swaps and never start a card the pen cannot finish.
+
+    cards: [{"file", "pen", "ink_m", "est_seconds", "layers"?}] in file order; layered
+    cards ({"layer", "pen", "ink_m", "est_seconds"} per pen layer) are plotted as one
+    pass per layer, per card or in stacks of up to stack_size sheets, whichever
+    needs fewer pen swaps. pinned: passes that must come first, in the given order.
+    Returns {"order": [files], "layers": [layer or None], "steps": [...], "pen_swaps": n,
+    "mode", "warnings": [...]} where steps interleave {"type": "card"} entries with
+    {"type": "pen"} swap/refill entries.
+    """
+    if policy not in POLICIES: policy = "file"
+    warnings = []
+
+    # 1. GROUP BY PEN (cards without a pen use whatever is loaded; layered cards by their first layer)
+    groups = {}
+    first_seen = {}
+    for pos, card in enumerate(cards):
+        for p in card_passes(card):
+            if p.get("pen") and resolve_pen(p["pen"], pens) is None:
+                warnings.append(f"{card['file']}: pen '{p['pen']}' is not in the inventory; using the loaded pen.")
+        pen_id = resolve_pen(card_passes(card)[0].get("pen"), pens) or current_pen_id
+        # Layers without a pen of their own stay on the card's pen, even after a swap for another layer
+        groups.setdefault(pen_id, []).append(dict(card, pen=pen_id) if card.get("layers") else card)
+        first_seen.setdefault(pen_id, pos)
+
+    # Loaded pen first (no swap), then in order of first appearance
+    group_order = sorted(groups, key=lambda p: (p != current_pen_id, first_seen[p]))
+
+    # 2. ORDER WITHIN GROUPS
+    for pen_id in group_order:
+        if policy == "shortest_first": groups[pen_id].sort(key=lambda c: c.get("est_seconds", 0))
+        elif policy == "longest_first": groups[pen_id].sort(key=lambda c: -c.get("est_seconds", 0))
+    ordered = [card for pen_id in group_order for card in groups[pen_id]]
+
+    # 3. PER CARD OR STACKED: whichever swaps pens less often (per card on a tie: less paper handling)
+    plans = [("per_card", _walk(list(pinned) + stack_passes(ordered, 1), pens, current_pen_id, reserve_m))]
+    if stack_size > 1 and any(c.get("layers") for c in ordered):
+        plans.append(("stacked", _walk(list(pinned) + stack_passes(ordered, stack_size), pens, current_pen_id, reserve_m)))
+    mode, (steps, swaps, walk_warnings) = min(plans, key=lambda plan: plan[1][1])
+    cards_steps = [s for s in steps if s["type"] == "card"]
+
+    return {"order": [s["file"] for s in cards_steps], "layers": [s["layer"] for s in cards_steps], "steps": steps,
+            "pen_swaps": swaps, "mode": mode, "stack_size": stack_size if mode == "stacked" else 1, "policy": policy,
+            "warnings": warnings + walk_warnings, "est_total_seconds": round(sum(c.get("est_seconds", 0.0) for c in cards), 1)}
+
+def _walk(passes, pens, current_pen_id, reserve_m=0.0):
+    """Walks passes in order with pen capacity: returns (steps, pen swaps + refills, warnings)."""
+    remaining = {p: pen.get("capacity", 0.0) - pen.get("used", 0.0) for p, pen in pens.items()}
+    steps = []
+    warnings = []
+    swaps = 0
+    loaded = current_pen_id
+    for p in passes:
+        pen_id = resolve_pen(p.get("pen"), pens) or loaded
+        if pen_id != loaded:
+            reason = f"Layer {p['layer']} of {p['file']}" if p.get("layer") else "Card requires this pen"
+            steps.append({"type": "pen", "action": "swap", "pen_id": pen_id, "reason": reason})
+            swaps += 1
+            loaded = pen_id
+        capacity = pens.get(pen_id, {}).get("capacity", 0.0)
+        need = p.get("ink_m", 0.0) + reserve_m
+        if pen_id in remaining and remaining[pen_id] < need:
+            if capacity >= need:
+                steps.append({"type": "pen", "action": "refill", "pen_id": pen_id,
+                              "reason": f"{remaining[pen_id]:.2f} m left, card needs {p.get('ink_m', 0.0):.2f} m"})
+                swaps += 1
+                remaining[pen_id] = capacity
+            else:
+                warnings.append(f"{p['file']}: needs more ink than a full pen holds.")
+        if pen_id in remaining: remaining[pen_id] -= p.get("ink_m", 0.0)
+        steps.append({"type": "card", "file": p["file"], "layer": p.get("layer"), "pen_id": pen_id,
+                      "est_seconds": round(p.get("est_seconds", 0.0), 1)})
+    return steps, swaps, warnings
@@ -0,0 +1,162 @@
+import os
+import json
+import math
+import threading
+
+import svg_geometry
+
+# Card geometry that plots well at the config.py pen-down speed; cards are scaled relative to it
+REF_SIZE_MM = 6.0            # Ink-weighted stroke extent (glyph size)
+REF_TURN_PER_MM = 0.6        # Direction change (radians) per mm of ink (curvature / density)
+REF_RUN_MM = 5.0             # Length-weighted straight run
+STRAIGHT_TURN_RAD = math.radians(12)
+FACTOR_RANGE = (0.6, 1.6)
+SPEED_RANGE = (5, 80)        # Pen-down speed limits (%) the adaptive profile may choose
+
+OVERRIDES_NAME = "speed_overrides.json"
+OVERRIDE_KEYS = ("scale", "min_speed", "max_speed", "speed_pendown", "speed_penup", "accel", "pen_rate_lower", "pen_rate_raise")
+
+# --- GEOMETRY ---
+def polyline_stats(strokes):
+    """
+    Additive geometry sums for pen-down polylines (any unit):
+    ink length, extent * length, total turning, straight-run sums and stroke count.
+    """
+    s = {"ink": 0.0, "extent_ink": 0.0, "turn": 0.0, "run": 0.0, "run_sq": 0.0, "longest": 0.0, "strokes": 0}
+    for pts in strokes:
+        if len(pts) < 2: continue
+        xs, ys = [p[0] for p in pts], [p[1] for p in pts]
+        length = svg_geometry.polyline_length(pts)
+        s["ink"] += length
+        s["extent_ink"] += math.hypot(max(xs) - min(xs), max(ys) - min(ys)) * length
+        s["strokes"] += 1
+        run = 0.0
+        prev = None
+        for a, b in zip(pts, pts[1:]):
+            seg = math.hypot(b[0] - a[0], b[1] - a[1])
+            if seg == 0: continue
+            heading = math.atan2(b[1] - a[1], b[0] - a[0])
+            if prev is not None:
+                turn = abs((heading - prev + math.pi) % (2 * math.pi) - math.pi)
+                s["turn"] += turn
+                if turn > STRAIGHT_TURN_RAD:
+                    _close_run(s, run)
+                    run = 0.0
+            run += seg
+            prev = heading
+        _close_run(s, run)
+    return s
+
+def _close_run(s, run):
+    s["run"] += run
+    s["run_sq"] += run * run
+    s["longest"] = max(s["longest"], run)
+
+def scale_stats(s, k):
+    """Stats of the same geometry drawn k times larger."""
+    return {"ink": s["ink"] * k, "extent_ink": s["extent_ink"] * k * k, "turn": s["turn"], "run": s["run"] * k,
+            "run_sq": s["run_sq"] * k * k, "longest": s["longest"] * k, "strokes": s["strokes"]}
+
+def add_stats(total, s):
+    for key, value in s.items():
+        total[key] = max(total.get(key, 0.0), value) if key == "longest" else total.get(key, 0) + value
+    return total
+
+def features(s):
+    ink = s.get("ink", 0.0)
+    if ink <= 0: return None
+    return {"size_mm": round(s["extent_ink"] / ink, 2), "turn_per_mm": round(s["turn"] / ink, 3),
+            "run_mm": round(s["run_sq"] / s["run"], 2) if s["run"] else 0.0,
+            "longest_run_mm": round(s["longest"], 1), "strokes": s["strokes"]}
+
+# --- PROFILE ---
+def speed_factor(f):
+    """
+    Pen-down speed relative to config.py: large simple text faster, tiny dense text slower.
+    """
+    size = (max(f["size_mm"], 0.1) / REF_SIZE_MM) ** 0.5
+    curvature = (REF_TURN_PER_MM / max(f["turn_per_mm"], 0.01)) ** 0.25
+    runs = (max(f["run_mm"], 0.1) / REF_RUN_MM) ** 0.25
+    return min(max(size * curvature * runs, FACTOR_RANGE[0]), FACTOR_RANGE[1])
+
+def card_profile(stats):
+    """Manifest entry for one card: {"factor", "features"} (None when nothing is drawn)."""
+    f = features(stats)
+    if f is None: return None
+    return {"factor": round(speed_factor(f), 3), "features": f}
+
+def effective_settings(base, profile=None, overrides=None, card=None):
+    """
+    Motion settings for one card: config.py values, scaled by the card's profile,
+    then the project's overrides (project-wide, then per card).
+    overrides: {"adaptive": true, "scale": 1.0, "min_speed": 5, "max_speed": 80,
+                "speed_pendown": .., "accel": .., "cards": {"001_Name.svg": {...}}}
+    """
+    overrides = overrides if isinstance(overrides, dict) else {}
+    cards = overrides.get("cards") if isinstance(overrides.get("cards"), dict) else {}
+    per_card = cards.get(card) if isinstance(cards.get(card), dict) else {}
+    # Entries that are not positive numbers are ignored here (the API rejects them), never raised at plot time
+    o = {}
+    for key, value in list(overrides.items()) + list(per_card.items()):
+        if key in OVERRIDE_KEYS and _number(value) is not None: o[key] = _number(value)
+    adaptive = per_card.get("adaptive", overrides.get("adaptive", True)) is not False
+    settings = dict(base)
+    if "speed_pendown" in o: settings["speed_pendown"] = o["speed_pendown"]
+    elif profile and adaptive:
+        lo, hi = o.get("min_speed", SPEED_RANGE[0]), o.get("max_speed", SPEED_RANGE[1])
+        speed = base["speed_pendown"] * profile["factor"] * o.get("scale", 1.0)
+        settings["speed_pendown"] = float(round(min(max(speed, lo), hi)))
+    for key in ("speed_penup", "accel", "pen_rate_lower", "pen_rate_raise"):
+        if key in o: settings[key] = o[key]
+    return settings
+
+def _number(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)): return None
+    return float(value) if math.isfinite(value) and value > 0 else None
+
+def validate_overrides(data):
+    """Problems with an overrides object (unknown keys, values that are not positive numbers); [] when valid."""
+    if not isinstance(data, dict): return ["Expected a JSON object"]
+    errors = []
+    def check(entries, where):
+        for key, value in entries.items():
+            if key == "adaptive":
+                if not isinstance(value, bool): errors.append(f"{where}adaptive: expected true or false")
+            elif key not in OVERRIDE_KEYS: errors.append(f"{where}{key}: unknown setting")
+            elif _number(value) is None: errors.append(f"{where}{key}: expected a positive number, got {json.dumps(value)}")
+    check({k: v for k, v in data.items() if k != "cards"}, "")
+    cards = data.get("cards", {})
+    if not isinstance(cards, dict): errors.append("cards: expected an object of {card file: settings}")
+    else:
+        for card, entries in cards.items():
+            if isinstance(entries, dict): check(entries, f"cards.{card}.")
+            else: errors.append(f"cards.{card}: expected an object")
+    return errors
+
+# --- PER-PROJECT OVERRIDES (re-read when the file changes) ---
+_overrides = {}
+_overrides_lock = threading.Lock()
+
+def overrides_path(project_path):
+    return os.path.join(project_path, OVERRIDES_NAME)
+
+def read_overrides(project_path):
+    if not project_path: return {}
+    path = overrides_path(project_path)
+    try: mtime = os.path.getmtime(path)
+    except OSError: return {}
+    with _overrides_lock:
+        cached = _overrides.get(path)
+        if cached and cached[0] == mtime: return cached[1]
+    try:
+        with open(path, "r") as f: data = json.load(f)
+    except (OSError, ValueError): data = {}
+    if not isinstance(data, dict): data = {}
+    with _overrides_lock: _overrides[path] = (mtime, data)
+    return data
+
+def write_overrides(project_path, data):
+    path = overrides_path(project_path)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f: json.dump(data, f, indent=4)
+    os.replace(tmp_path, path)
@@ -0,0 +1,192 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+import batch_store
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_FILE = os.environ.get("LINECRAFT_DB", os.path.join(BASE_DIR, "linecraft.db"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS pens (
+    id TEXT PRIMARY KEY, name TEXT NOT NULL, capacity REAL NOT NULL, used REAL NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS projects (
+    name TEXT PRIMARY KEY, path TEXT, settings TEXT NOT NULL DEFAULT '{}',
+    generated_at REAL, card_count INTEGER NOT NULL DEFAULT 0);
+CREATE TABLE IF NOT EXISTS cards (
+    project TEXT NOT NULL, file TEXT NOT NULL, row INTEGER, pen TEXT, ink_m REAL,
+    pen_lifts INTEGER, est_seconds REAL, PRIMARY KEY (project, file));
+CREATE INDEX IF NOT EXISTS cards_pen ON cards (pen);
+CREATE TABLE IF NOT EXISTS plot_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, at REAL NOT NULL, project TEXT, file TEXT,
+    event TEXT NOT NULL, pen_id TEXT, ink_m REAL, seconds REAL, message TEXT);
+CREATE INDEX IF NOT EXISTS plot_events_project ON plot_events (project, at);
+CREATE INDEX IF NOT EXISTS plot_events_at ON plot_events (at);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, project TEXT NOT NULL, archived_at TEXT NOT NULL,
+    archive_path TEXT, session_ink REAL, total_seconds INTEGER, pen_id TEXT, report TEXT,
+    UNIQUE (project, archived_at));
+"""
+
+class StateStore:
+    """
+    Local SQLite store for pens, the recovery session, projects, per-card stats,
+    plot events and archived runs. WAL mode: the plot worker writes while the
+    API threads read. One connection per thread.
+    """
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self._local = threading.local()
+        with self._conn() as c: c.executescript(SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # --- KEY/VALUE (session, active pen) ---
+    def get_value(self, key, default=None):
+        row = self._conn().execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+        return json.loads(row["value"]) if row else default
+
+    def set_value(self, key, value):
+        with self._conn() as c:
+            c.execute("INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def delete_value(self, key):
+        with self._conn() as c: c.execute("DELETE FROM kv WHERE key = ?", (key,))
+
+    # --- PENS ---
+    def load_pens(self):
+        rows = self._conn().execute("SELECT * FROM pens ORDER BY created_at").fetchall()
+        return {r["id"]: {"name": r["name"], "capacity": r["capacity"], "used": r["used"]} for r in rows}
+
+    def save_pen(self, pen_id, pen):
+        with self._conn() as c:
+            c.execute("INSERT INTO pens (id, name, capacity, used, created_at) VALUES (?, ?, ?, ?, ?) "
+                      "ON CONFLICT(id) DO UPDATE SET name = excluded.name, capacity = excluded.capacity, used = excluded.used",
+                      (pen_id, pen["name"], float(pen["capacity"]), float(pen.get("used", 0.0)), time.time()))
+
+    def add_ink(self, pen_id, meters, project=None, file=None, seconds=None):
+        """Books one plotted card: pen usage and a 'plotted' event in one transaction."""
+        with self._conn() as c:
+            c.execute("UPDATE pens SET used = used + ? WHERE id = ?", (meters, pen_id))
+            c.execute("INSERT INTO plot_events (at, project, file, event, pen_id, ink_m, seconds) VALUES (?, ?, ?, 'plotted', ?, ?, ?)",
+                      (time.time(), project, file, pen_id, meters, seconds))
+
+    # --- PROJECTS & CARDS ---
+    def save_project_settings(self, name, path, settings):
+        with self._conn() as c:
+            c.execute("INSERT INTO projects (name, path, settings) VALUES (?, ?, ?) "
+                      "ON CONFLICT(name) DO UPDATE SET path = excluded.path, settings = excluded.settings",
+                      (name, path, json.dumps(settings or {})))
+
+    def project_settings(self, name):
+        row = self._conn().execute("SELECT settings FROM projects WHERE name = ?", (name,)).fetchone()
+        return json.loads(row["settings"]) if row else None
+
+    def record_cards(self, name, path, manifest, generated_at=None):
+        """Replaces the project's card stats with a freshly generated manifest."""
+        rows = [(name, f, m.get("row"), m.get("pen"), m.get("ink_m"), m.get("pen_lifts"), m.get("est_seconds"))
+                for f, m in manifest.items()]
+        with self._conn() as c:
+            c.execute("INSERT INTO projects (name, path) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET path = excluded.path", (name, path))
+            c.execute("DELETE FROM cards WHERE project = ?", (name,))
+            c.executemany("INSERT INTO cards VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            c.execute("UPDATE projects SET generated_at = ?, card_count = ? WHERE name = ?",
+                      (generated_at or time.time(), len(rows), name))
+
+    def card_summary(self, name):
+        row = self._conn().execute("SELECT COUNT(*) AS cards, COALESCE(SUM(ink_m), 0) AS ink_m, "
+                                   "COALESCE(SUM(est_seconds), 0) AS est_seconds FROM cards WHERE project = ?", (name,)).fetchone()
+        return dict(row)
+
+    # --- EVENTS, RUNS & REPORTS ---
+    def log_event(self, event, project=None, file=None, pen_id=None, message=None):
+        with self._conn() as c:
+            c.execute("INSERT INTO plot_events (at, project, file, event, pen_id, message) VALUES (?, ?, ?, ?, ?, ?)",
+                      (time.time(), project, file, event, pen_id, message))
+
+    def record_run(self, project, report, archive_path=None):
+        with self._conn() as c:
+            c.execute("INSERT OR IGNORE INTO runs (project, archived_at, archive_path, session_ink, total_seconds, pen_id, report) "
+                      "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                      (project, report.get("archived_at"), archive_path, report.get("session_ink_meters"),
+                       report.get("total_time_seconds"), report.get("pen_used_id"), json.dumps(report)))
+
+    def history(self, project=None, limit=100):
+        where, args = ("WHERE project = ?", [project]) if project else ("", [])
+        events = self._conn().execute(f"SELECT * FROM plot_events {where} ORDER BY at DESC LIMIT ?", args + [limit]).fetchall()
+        runs = self._conn().execute(f"SELECT project, archived_at, archive_path, session_ink, total_seconds, pen_id FROM runs {where} "
+                                    "ORDER BY archived_at DESC LIMIT ?", args + [limit]).fetchall()
+        return {"events": [dict(r) for r in events], "runs": [dict(r) for r in runs]}
+
+    def ink_report(self, since=None):
+        """Plotted cards, ink and plot time per project and pen (optionally since a unix time)."""
+        rows = self._conn().execute(
+            "SELECT project, pen_id, COUNT(*) AS cards, ROUND(SUM(ink_m), 4) AS ink_m, ROUND(SUM(seconds), 1) AS seconds "
+            "FROM plot_events WHERE event = 'plotted' AND at >= ? GROUP BY project, pen_id ORDER BY project, pen_id",
+            (since or 0,)).fetchall()
+        return [dict(r) for r in rows]
+
+    # --- MIGRATION FROM THE JSON FILES ---
+    def migrate_json(self, inventory_file=None, session_file=None, projects_root=None, archives_root=None):
+        """
+        Imports the pre-database JSON state. Safe to run on every start: pens and
+        the session are only taken when the store has none, projects and runs
+        are upserted. The JSON files are left in place.
+        """
+        imported = []
+        if inventory_file and os.path.exists(inventory_file) and not self.load_pens():
+            data = _read_json(inventory_file) or {}
+            for pen_id, pen in (data.get("pens") or {}).items(): self.save_pen(pen_id, pen)
+            if data.get("current_pen_id"): self.set_value("current_pen_id", data["current_pen_id"])
+            imported.append(inventory_file)
+
+        if session_file and os.path.exists(session_file) and self.get_value("session") is None:
+            data = _read_json(session_file)
+            if data: self.set_value("session", data); imported.append(session_file)
+
+        if projects_root and os.path.isdir(projects_root):
+            for name in sorted(os.listdir(projects_root)):
+                path = os.path.join(projects_root, name)
+                settings = _read_json(os.path.join(path, "project_settings.json"))
+                if settings is None: continue
+                fresh = self.project_settings(name) is None
+                if fresh: self.save_project_settings(name, path, settings)
+                if batch_store.has_batch(path) and not self.card_summary(name)["cards"]:
+                    source, container, _ = batch_store.open_batch(path)
+                    try:
+                        manifest = batch_store.read_manifest(source, container, batch_store.CARDS_MANIFEST_NAME)
+                        if not manifest:
+                            manifest = {f: {"ink_m": ink} for f, ink in batch_store.read_manifest(source, container).items()}
+                    finally:
+                        if container: container.close()
+                    if manifest: self.record_cards(name, path, manifest, os.path.getmtime(path)); fresh = True
+                if fresh: imported.append(path)
+
+        if archives_root and os.path.isdir(archives_root):
+            for name in sorted(os.listdir(archives_root)):
+                project_dir = os.path.join(archives_root, name)
+                if not os.path.isdir(project_dir): continue
+                for stamp in sorted(os.listdir(project_dir)):
+                    report = _read_json(os.path.join(project_dir, stamp, "run_report.json"))
+                    if report:
+                        report.setdefault("archived_at", stamp)
+                        self.record_run(name, report, os.path.join(project_dir, stamp))
+        return imported
+
+def _read_json(path):
+    try:
+        with open(path, "r") as f: return json.load(f)
+    except (OSError, ValueError): return None
+
+store = StateStore()
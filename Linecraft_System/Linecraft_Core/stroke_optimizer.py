@@ -0,0 +1,80 @@
+import numpy as np
+
+# Millimetres on paper (callers convert them to their drawing units): endpoints closer
+# than this are drawn as one stroke; RDP drops points that move the line by less than
+# two AxiDraw high-resolution steps
+JOIN_TOLERANCE_MM = 0.1
+SIMPLIFY_TOLERANCE_MM = 2 / (2032 / 25.4)
+
+def join_strokes(strokes, tolerance=JOIN_TOLERANCE_MM):
+    """
+    Chains strokes whose endpoints meet within tolerance (reversing a stroke when
+    its end is the closer one). Greedy, in drawing order: each chain keeps taking
+    the nearest unused stroke that touches its tail, so connected letters join too.
+    strokes: list of (n, 2) arrays. Returns a new list of arrays.
+    """
+    if len(strokes) < 2: return list(strokes)
+    starts = np.array([s[0] for s in strokes])
+    ends = np.array([s[-1] for s in strokes])
+    used = np.zeros(len(strokes), dtype=bool)
+    chains = []
+    for i in range(len(strokes)):
+        if used[i]: continue
+        used[i] = True
+        parts = [strokes[i]]
+        tail = ends[i]
+        while True:
+            d_start = np.hypot(*(starts - tail).T)
+            d_end = np.hypot(*(ends - tail).T)
+            d_start[used] = np.inf
+            d_end[used] = np.inf
+            j = int(np.argmin(np.minimum(d_start, d_end)))
+            if min(d_start[j], d_end[j]) > tolerance: break
+            used[j] = True
+            nxt = strokes[j] if d_start[j] <= d_end[j] else strokes[j][::-1]
+            parts.append(nxt[1:])
+            tail = nxt[-1]
+        chains.append(np.concatenate(parts) if len(parts) > 1 else parts[0])
+    return chains
+
+def simplify(points, tolerance=SIMPLIFY_TOLERANCE_MM):
+    """
+    Ramer-Douglas-Peucker on one (n, 2) polyline; each split measures all its
+    points against the chord in one vectorized step.
+    """
+    n = len(points)
+    if n < 3: return points
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        i, j = stack.pop()
+        if j - i < 2: continue
+        a, b = points[i], points[j]
+        inner = points[i + 1:j]
+        chord = b - a
+        length = np.hypot(*chord)
+        if length == 0: dist = np.hypot(*(inner - a).T)
+        else: dist = np.abs(chord[0] * (inner[:, 1] - a[1]) - chord[1] * (inner[:, 0] - a[0])) / length
+        k = int(np.argmax(dist))
+        if dist[k] > tolerance:
+            k += i + 1
+            keep[k] = True
+            stack += [(i, k), (k, j)]
+    return points[keep]
+
+def optimize(strokes, join_tolerance=JOIN_TOLERANCE_MM, simplify_tolerance=SIMPLIFY_TOLERANCE_MM):
+    """
+    Join, then simplify. Returns (strokes as lists of (x, y), stats) where stats
+    counts pen lifts and points before and after.
+    """
+    arrays = [np.asarray(s, dtype=float) for s in strokes if len(s) > 1]
+    stats = {"lifts_before": len(arrays), "points_before": int(sum(len(s) for s in arrays))}
+    result = [simplify(s, simplify_tolerance) for s in join_strokes(arrays, join_tolerance)]
+    stats["lifts_after"] = len(result)
+    stats["points_after"] = int(sum(len(s) for s in result))
+    return [s.tolist() for s in result], stats
+
+def polyline_length(points):
+    points = np.asarray(points, dtype=float)
+    return float(np.hypot(*np.diff(points, axis=0).T).sum()) if len(points) > 1 else 0.0
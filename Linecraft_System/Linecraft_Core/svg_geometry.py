@@ -0,0 +1,384 @@
+import math
+import re
+
+# --- PATH TOKENIZER ---
+# Handles glued tokens ("M365 15.8L352.244-43.9"), exponents and implicit repeats.
+_TOKEN_RE = re.compile(r'([MmZzLlHhVvCcSsQqTtAa])|([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)')
+_ARG_COUNT = {'M': 2, 'L': 2, 'H': 1, 'V': 1, 'C': 6, 'S': 4, 'Q': 4, 'T': 2, 'A': 7, 'Z': 0}
+_ARC_FLAG_RE = re.compile(r'\s*,?\s*([01])')
+
+IDENTITY = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+INKSCAPE_NS = "{http://www.inkscape.org/namespaces/inkscape}"
+_LAYER_NUMBER_RE = re.compile(r'\s*(\d+)')
+SKIP_TAGS = {'defs', 'metadata', 'namedview', 'title', 'desc', 'clipPath', 'mask', 'symbol',
+             'pattern', 'marker', 'style', 'script', 'linearGradient', 'radialGradient'}
+
+def tokenize_path(d_string):
+    """
+    Splits SVG path data into [(command, [args...]), ...].
+    Implicit repeats are expanded ("L 1 2 3 4" -> two L commands; extra M pairs -> L).
+    Arc flags may be written without separators ("a5 5 0 011 1"), as browsers accept.
+    """
+    commands = []
+    pos = 0
+    cmd = None
+    args = []
+    length = len(d_string)
+
+    def flush():
+        if cmd is None: return
+        upper = cmd.upper()
+        n = _ARG_COUNT[upper]
+        if n == 0:
+            commands.append((cmd, []))
+            return
+        first = True
+        for i in range(0, len(args) - n + 1, n):
+            c = cmd
+            if not first and upper == 'M': c = 'L' if cmd == 'M' else 'l'
+            commands.append((c, args[i:i + n]))
+            first = False
+
+    while pos < length:
+        ch = d_string[pos]
+        if ch in ' \t\r\n,':
+            pos += 1
+            continue
+        # Arc flags (4th and 5th argument) are single 0/1 digits
+        if cmd is not None and cmd in 'Aa' and len(args) % 7 in (3, 4):
+            m = _ARC_FLAG_RE.match(d_string, pos)
+            if m:
+                args.append(float(m.group(1)))
+                pos = m.end()
+                continue
+        m = _TOKEN_RE.match(d_string, pos)
+        if not m:
+            pos += 1  # Unknown character, skip it
+            continue
+        if m.group(1):
+            flush()
+            cmd = m.group(1)
+            args = []
+        else:
+            args.append(float(m.group(2)))
+        pos = m.end()
+    flush()
+    return commands
+
+# --- CURVE FLATTENING ---
+def _segments_for(points, tolerance):
+    approx = sum(math.hypot(points[i + 1][0] - points[i][0], points[i + 1][1] - points[i][1]) for i in range(len(points) - 1))
+    return max(1, min(128, int(math.ceil(math.sqrt(approx / max(tolerance, 1e-6))))))
+
+def _cubic(p0, p1, p2, p3, tolerance):
+    n = _segments_for((p0, p1, p2, p3), tolerance)
+    out = []
+    for i in range(1, n + 1):
+        t = i / n
+        mt = 1 - t
+        a, b, c, d = mt * mt * mt, 3 * mt * mt * t, 3 * mt * t * t, t * t * t
+        out.append((a * p0[0] + b * p1[0] + c * p2[0] + d * p3[0], a * p0[1] + b * p1[1] + c * p2[1] + d * p3[1]))
+    return out
+
+def _quad(p0, p1, p2, tolerance):
+    n = _segments_for((p0, p1, p2), tolerance)
+    out = []
+    for i in range(1, n + 1):
+        t = i / n
+        mt = 1 - t
+        a, b, c = mt * mt, 2 * mt * t, t * t
+        out.append((a * p0[0] + b * p1[0] + c * p2[0], a * p0[1] + b * p1[1] + c * p2[1]))
+    return out
+
+def arc_to_points(p0, rx, ry, phi_deg, large_arc, sweep, p1, tolerance):
+    # SVG 1.1 implementation notes F.6.5: endpoint -> center parameterization
+    if p0 == p1: return []
+    rx, ry = abs(rx), abs(ry)
+    if rx == 0 or ry == 0: return [p1]
+    phi = math.radians(phi_deg % 360)
+    cos_p, sin_p = math.cos(phi), math.sin(phi)
+    dx, dy = (p0[0] - p1[0]) / 2, (p0[1] - p1[1]) / 2
+    x1p = cos_p * dx + sin_p * dy
+    y1p = -sin_p * dx + cos_p * dy
+    lam = (x1p * x1p) / (rx * rx) + (y1p * y1p) / (ry * ry)
+    if lam > 1:
+        s = math.sqrt(lam)
+        rx, ry = rx * s, ry * s
+    num = rx * rx * ry * ry - rx * rx * y1p * y1p - ry * ry * x1p * x1p
+    den = rx * rx * y1p * y1p + ry * ry * x1p * x1p
+    coef = math.sqrt(max(0.0, num / den)) if den else 0.0
+    if bool(large_arc) == bool(sweep): coef = -coef
+    cxp, cyp = coef * rx * y1p / ry, -coef * ry * x1p / rx
+    cx = cos_p * cxp - sin_p * cyp + (p0[0] + p1[0]) / 2
+    cy = sin_p * cxp + cos_p * cyp + (p0[1] + p1[1]) / 2
+
+    def angle(ux, uy, vx, vy):
+        return math.atan2(ux * vy - uy * vx, ux * vx + uy * vy)
+
+    theta1 = angle(1, 0, (x1p - cxp) / rx, (y1p - cyp) / ry)
+    delta = angle((x1p - cxp) / rx, (y1p - cyp) / ry, (-x1p - cxp) / rx, (-y1p - cyp) / ry)
+    if not sweep and delta > 0: delta -= 2 * math.pi
+    elif sweep and delta < 0: delta += 2 * math.pi
+
+    arc_len = abs(delta) * max(rx, ry)
+    n = max(2, min(256, int(math.ceil(math.sqrt(arc_len / max(tolerance, 1e-6)) * 2))))
+    out = []
+    for i in range(1, n + 1):
+        t = theta1 + delta * i / n
+        x, y = rx * math.cos(t), ry * math.sin(t)
+        out.append((cos_p * x - sin_p * y + cx, sin_p * x + cos_p * y + cy))
+    out[-1] = p1
+    return out
+
+def path_to_polylines(d_string, tolerance=0.1):
+    """
+    Normalizes path data (absolute/relative, lines, curves, arcs) into absolute polylines.
+    Returns a list of strokes, each a list of (x, y) tuples. One stroke per pen-down run.
+    """
+    strokes = []
+    current = None
+    cx, cy = 0.0, 0.0
+    sx, sy = 0.0, 0.0
+    last_ctrl = None     # For S/T reflection
+    last_cmd = ''
+
+    for cmd, a in tokenize_path(d_string):
+        upper = cmd.upper()
+        rel = cmd.islower()
+        ox, oy = (cx, cy) if rel else (0.0, 0.0)
+
+        if upper == 'M':
+            cx, cy = a[0] + ox, a[1] + oy
+            sx, sy = cx, cy
+            current = [(cx, cy)]
+            strokes.append(current)
+            last_ctrl = None
+        elif upper == 'Z':
+            if current is not None and (cx, cy) != (sx, sy): current.append((sx, sy))
+            cx, cy = sx, sy
+            current = None
+            last_ctrl = None
+        else:
+            if current is None:
+                current = [(cx, cy)]
+                strokes.append(current)
+            if upper == 'L':
+                cx, cy = a[0] + ox, a[1] + oy
+                current.append((cx, cy))
+                last_ctrl = None
+            elif upper == 'H':
+                cx = a[0] + ox
+                current.append((cx, cy))
+                last_ctrl = None
+            elif upper == 'V':
+                cy = a[0] + oy
+                current.append((cx, cy))
+                last_ctrl = None
+            elif upper == 'C':
+                p1 = (a[0] + ox, a[1] + oy)
+                p2 = (a[2] + ox, a[3] + oy)
+                p3 = (a[4] + ox, a[5] + oy)
+                current.extend(_cubic((cx, cy), p1, p2, p3, tolerance))
+                last_ctrl = p2
+                cx, cy = p3
+            elif upper == 'S':
+                p1 = (2 * cx - last_ctrl[0], 2 * cy - last_ctrl[1]) if last_ctrl and last_cmd in 'CcSs' else (cx, cy)
+                p2 = (a[0] + ox, a[1] + oy)
+                p3 = (a[2] + ox, a[3] + oy)
+                current.extend(_cubic((cx, cy), p1, p2, p3, tolerance))
+                last_ctrl = p2
+                cx, cy = p3
+            elif upper == 'Q':
+                p1 = (a[0] + ox, a[1] + oy)
+                p2 = (a[2] + ox, a[3] + oy)
+                current.extend(_quad((cx, cy), p1, p2, tolerance))
+                last_ctrl = p1
+                cx, cy = p2
+            elif upper == 'T':
+                p1 = (2 * cx - last_ctrl[0], 2 * cy - last_ctrl[1]) if last_ctrl and last_cmd in 'QqTt' else (cx, cy)
+                p2 = (a[0] + ox, a[1] + oy)
+                current.extend(_quad((cx, cy), p1, p2, tolerance))
+                last_ctrl = p1
+                cx, cy = p2
+            elif upper == 'A':
+                p1 = (a[5] + ox, a[6] + oy)
+                current.extend(arc_to_points((cx, cy), a[0], a[1], a[2], a[3], a[4], p1, tolerance))
+                last_ctrl = None
+                cx, cy = p1
+        last_cmd = cmd
+
+    return [s for s in strokes if len(s) > 1]
+
+def polyline_length(points):
+    return sum(math.hypot(points[i + 1][0] - points[i][0], points[i + 1][1] - points[i][1]) for i in range(len(points) - 1))
+
+def polylines_to_d(strokes, precision=2):
+    """
+    Serializes absolute polylines back to compact path data.
+    """
+    fmt = f"{{:.{precision}f}}"
+    parts = []
+    for stroke in strokes:
+        if len(stroke) < 2: continue
+        x, y = stroke[0]
+        parts.append(f"M{fmt.format(x)} {fmt.format(y)}")
+        parts.append("L" + " ".join(f"{fmt.format(px)} {fmt.format(py)}" for px, py in stroke[1:]))
+    return "".join(parts)
+
+# --- TRANSFORMS ---
+def multiply(m1, m2):
+    """Returns m1 x m2 (apply m2 first, then m1)."""
+    a1, b1, c1, d1, e1, f1 = m1
+    a2, b2, c2, d2, e2, f2 = m2
+    return (a1 * a2 + c1 * b2, b1 * a2 + d1 * b2,
+            a1 * c2 + c1 * d2, b1 * c2 + d1 * d2,
+            a1 * e2 + c1 * f2 + e1, b1 * e2 + d1 * f2 + f1)
+
+def apply(m, x, y):
+    return (m[0] * x + m[2] * y + m[4], m[1] * x + m[3] * y + m[5])
+
+def parse_transform(transform_str):
+    """
+    Parses an SVG transform attribute into an affine tuple (a, b, c, d, e, f).
+    """
+    m = IDENTITY
+    if not transform_str: return m
+    for name, raw in re.findall(r'(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)', transform_str):
+        v = [float(x) for x in re.findall(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?', raw)]
+        if name == 'matrix' and len(v) == 6: t = tuple(v)
+        elif name == 'translate': t = (1, 0, 0, 1, v[0] if v else 0, v[1] if len(v) > 1 else 0)
+        elif name == 'scale':
+            sx = v[0] if v else 1
+            t = (sx, 0, 0, v[1] if len(v) > 1 else sx, 0, 0)
+        elif name == 'rotate' and v:
+            r = math.radians(v[0])
+            t = (math.cos(r), math.sin(r), -math.sin(r), math.cos(r), 0, 0)
+            if len(v) == 3:
+                t = multiply(multiply((1, 0, 0, 1, v[1], v[2]), t), (1, 0, 0, 1, -v[1], -v[2]))
+        elif name == 'skewX' and v: t = (1, 0, math.tan(math.radians(v[0])), 1, 0, 0)
+        elif name == 'skewY' and v: t = (1, math.tan(math.radians(v[0])), 0, 1, 0, 0)
+        else: continue
+        m = multiply(m, t)
+    return m
+
+# --- DOCUMENT HELPERS ---
+def local_tag(elem):
+    return elem.tag.split('}')[-1] if isinstance(elem.tag, str) else ''
+
+def _num(elem, name, default=0.0):
+    try: return float(str(elem.get(name, default)).replace('px', '').replace('mm', '').split()[0])
+    except (ValueError, IndexError): return default
+
+def shape_to_d(elem):
+    """
+    Converts basic shapes to equivalent path data. Returns None for non-drawable elements.
+    """
+    tag = local_tag(elem)
+    if tag == 'path': return elem.get('d')
+    if tag == 'line':
+        return f"M{_num(elem, 'x1')} {_num(elem, 'y1')}L{_num(elem, 'x2')} {_num(elem, 'y2')}"
+    if tag in ('polyline', 'polygon'):
+        pts = re.findall(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?', elem.get('points', ''))
+        if len(pts) < 4: return None
+        d = f"M{pts[0]} {pts[1]}L" + " ".join(pts[2:])
+        return d + ("Z" if tag == 'polygon' else "")
+    if tag == 'rect':
+        x, y, w, h = _num(elem, 'x'), _num(elem, 'y'), _num(elem, 'width'), _num(elem, 'height')
+        if w <= 0 or h <= 0: return None
+        return f"M{x} {y}H{x + w}V{y + h}H{x}Z"
+    if tag in ('circle', 'ellipse'):
+        cx, cy = _num(elem, 'cx'), _num(elem, 'cy')
+        if tag == 'circle': rx = ry = _num(elem, 'r')
+        else: rx, ry = _num(elem, 'rx'), _num(elem, 'ry')
+        if rx <= 0 or ry <= 0: return None
+        return f"M{cx - rx} {cy}A{rx} {ry} 0 1 0 {cx + rx} {cy}A{rx} {ry} 0 1 0 {cx - rx} {cy}Z"
+    return None
+
+def is_hidden(elem):
+    style = elem.get('style', '')
+    return 'display:none' in style.replace(' ', '') or elem.get('display') == 'none'
+
+def iter_polylines(elem, tolerance=0.1, matrix=IDENTITY):
+    """
+    Walks an SVG tree and yields every drawable stroke as absolute polylines in
+    root user units (all nested transforms applied).
+    """
+    tag = local_tag(elem)
+    if tag in SKIP_TAGS or is_hidden(elem): return
+    m = multiply(matrix, parse_transform(elem.get('transform')))
+    d = shape_to_d(elem)
+    if d:
+        for stroke in path_to_polylines(d, tolerance):
+            yield [apply(m, x, y) for x, y in stroke]
+    for child in elem:
+        yield from iter_polylines(child, tolerance, m)
+
+# --- PEN LAYERS ---
+def pen_layer(elem):
+    """
+    Pen layer an element assigns to its contents, or None: a data-layer attribute,
+    or an Inkscape layer whose label starts with a number ("2 - Red", as AxiDraw's layer mode).
+    """
+    value = elem.get('data-layer')
+    if value is None and elem.get(INKSCAPE_NS + 'groupmode') == 'layer':
+        m = _LAYER_NUMBER_RE.match(elem.get(INKSCAPE_NS + 'label', ''))
+        value = m.group(1) if m else None
+    try: return int(value) if value is not None else None
+    except ValueError: return None
+
+def drawable_layers(elem, layer=1):
+    """Pen layers holding at least one drawable element (unnumbered content is layer 1)."""
+    if local_tag(elem) in SKIP_TAGS or is_hidden(elem): return set()
+    layer = pen_layer(elem) or layer
+    found = {layer} if shape_to_d(elem) else set()
+    for child in elem: found |= drawable_layers(child, layer)
+    return found
+
+def layer_copy(elem, layer, inherited=1):
+    """Copy of a tree without the drawable elements of other pen layers (groups and defs kept)."""
+    own = pen_layer(elem) or inherited
+    out = elem.makeelement(elem.tag, dict(elem.attrib))
+    out.text, out.tail = elem.text, elem.tail
+    for child in elem:
+        if local_tag(child) not in SKIP_TAGS and shape_to_d(child) and (pen_layer(child) or own) != layer: continue
+        out.append(layer_copy(child, layer, own))
+    return out
+
+# --- CHUNKS ---
+UNSPLITTABLE_TAGS = {'text', 'use'}   # Plotted content that is not path data (cards with it plot whole)
+
+def drawable_elements(elem):
+    """Visible drawable elements (paths and basic shapes) in document order."""
+    if local_tag(elem) in SKIP_TAGS or is_hidden(elem): return []
+    found = [elem] if shape_to_d(elem) else []
+    for child in elem: found += drawable_elements(child)
+    return found
+
+def has_unsplittable(elem):
+    if local_tag(elem) in SKIP_TAGS or is_hidden(elem): return False
+    return local_tag(elem) in UNSPLITTABLE_TAGS or any(has_unsplittable(child) for child in elem)
+
+def subset_copy(elem, parts):
+    """
+    Copy of a tree with only the drawable elements in parts (groups, styles, transforms
+    and defs kept). parts: {element: None to keep it as is, or replacement path data}.
+    """
+    out = elem.makeelement(elem.tag, dict(elem.attrib))
+    out.text, out.tail = elem.text, elem.tail
+    if parts.get(elem) is not None: out.set('d', parts[elem])
+    for child in elem:
+        if local_tag(child) not in SKIP_TAGS and shape_to_d(child) and child not in parts: continue
+        out.append(subset_copy(child, parts))
+    return out
+
+def viewbox(root):
+    """
+    Returns (min_x, min_y, width, height) of the root viewBox, falling back to width/height.
+    """
+    vb = root.get('viewBox')
+    if vb:
+        try:
+            parts = [float(v) for v in vb.replace(',', ' ').split()]
+            if len(parts) == 4: return tuple(parts)
+        except ValueError: pass
+    return (0.0, 0.0, _num(root, 'width', 100.0), _num(root, 'height', 100.0))
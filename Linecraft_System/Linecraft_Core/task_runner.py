@@ -0,0 +1,55 @@
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+class TaskRunner:
+    """
+    Runs slow API work (generation, archiving, machine commands) off the request
+    threads. Jobs get an id the client can poll; machine commands share one
+    worker so they reach the hardware in order.
+    """
+    def __init__(self, workers=2, history=200):
+        self.history = history
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="linecraft-job")
+        self._machine = ThreadPoolExecutor(max_workers=1, thread_name_prefix="linecraft-machine")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind, fn, *args, machine=False, **kwargs):
+        job_id = uuid.uuid4().hex[:12]
+        job = {"id": job_id, "kind": kind, "state": "queued", "result": None, "error": None,
+               "submitted": time.time(), "started": None, "finished": None}
+        with self._lock:
+            self._jobs[job_id] = job
+            self._trim()
+        (self._machine if machine else self._pool).submit(self._run, job, fn, args, kwargs)
+        return job_id
+
+    def _run(self, job, fn, args, kwargs):
+        # State changes are made under the lock, so get()/list() never copy a half-updated job
+        with self._lock: job.update(state="running", started=time.time())
+        try:
+            result = fn(*args, **kwargs)
+            update = {"result": result, "state": "done"}
+        except Exception as e: update = {"error": str(e), "state": "failed"}
+        with self._lock: job.update(update, finished=time.time())
+
+    def _trim(self):
+        # Forget the oldest finished jobs beyond the history size
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.history: break
+            if self._jobs[job_id]["state"] in ("done", "failed"): del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def list(self, limit=20):
+        with self._lock:
+            jobs = [dict(j) for j in reversed(self._jobs.values())]
+        return jobs[:limit]
+
+runner = TaskRunner()
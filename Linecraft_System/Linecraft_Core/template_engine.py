@@ -1,96 +1,355 @@
 import xml.etree.ElementTree as ET
 import random
-import importlib
 import math
 import re
+import threading
+import numpy as np
+import json
+import hashlib
+from collections import OrderedDict
+from font_registry import registry as font_registry
+import svg_geometry
+import speed_profile
+import motion_model
+import stroke_optimizer
+import card_bounds
+import metrics
+from layout_cache import cache as layout_cache
+
+# per_row: variants seeded from the row contents (same CSV row -> same card, every run)
+# per_value: the same text always gets the same variants
+# random: fresh variants on every generation
+VARIATION_POLICIES = ("per_row", "per_value", "random")
+
+def row_fingerprint(row):
+    """Stable id of a CSV row's contents (independent of row order and process)."""
+    return hashlib.sha1(json.dumps(row, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+TEXT_TAGS = ('text', 'tspan', 'flowPara')
+SHAPE_TAGS = ('rect', 'circle', 'ellipse', 'line', 'polyline', 'polygon')
+SHAPE_ATTRS = ('x', 'y', 'width', 'height', 'rx', 'ry', 'cx', 'cy', 'r', 'x1', 'y1', 'x2', 'y2', 'points')
+
+SLOT_TAG = 'linecraft-slot'   # Placeholder marker inside a compiled template (never written to a card)
+_SLOT_RE = re.compile(rb'<linecraft-slot n="(\d+)" />')
+
+# Compiled templates by (template hash, font, font version, variation, optimize, placeholder keys)
+COMPILED_TEMPLATE_LIMIT = 8
+_compiled_templates = OrderedDict()
+_compiled_lock = threading.Lock()
 
 ET.register_namespace('', "http://www.w3.org/2000/svg")
 ET.register_namespace('inkscape', "http://www.inkscape.org/namespaces/inkscape")
 ET.register_namespace('sodipodi', "http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd")
 
+def _raster_layer(root, images):
+    """
+    Preview-only SVG holding just the template's raster images (with the groups,
+    transforms and defs around them), to lay under a card on screen.
+    """
+    keep = set()
+    parent_map = {c: p for p in root.iter() for c in p}
+    for image in images:
+        node = image
+        while node is not None and node not in keep:
+            keep.add(node)
+            node = parent_map.get(node)
+
+    def prune(src):
+        dst = ET.Element(src.tag, src.attrib)
+        dst.text = src.text if src.text and src.text.strip() else None
+        for child in src:
+            if child in keep or svg_geometry.local_tag(child) == 'defs':
+                dst.append(prune(child) if child in keep else child)
+        return dst
+    return ET.tostring(prune(root), encoding='utf-8', xml_declaration=True)
+
+def _element_matrix(elem, parent_map):
+    # Accumulated transform of an element (its own included) up to the root
+    chain = []
+    while elem is not None:
+        chain.append(elem)
+        elem = parent_map.get(elem)
+    matrix = svg_geometry.IDENTITY
+    for node in reversed(chain):
+        matrix = svg_geometry.multiply(matrix, svg_geometry.parse_transform(node.get('transform')))
+    return matrix
+
+def _resolve_slots(root, keys, parent_map):
+    """
+    (key, target) for every placeholder the template fills, in document order: a
+    text/tspan/flowPara whose text contains the key (spaces ignored); the target is
+    its enclosing <text> when there is one (the generated group replaces it).
+    """
+    slots = []
+    for elem in root.iter():
+        if svg_geometry.local_tag(elem) not in TEXT_TAGS or not elem.text: continue
+        clean_content = elem.text.replace(" ", "")
+        for key in keys:
+            if key.replace(" ", "") not in clean_content: continue
+            target_elem = elem
+            parent = parent_map.get(elem)
+            while parent is not None:
+                if svg_geometry.local_tag(parent) == 'text':
+                    target_elem = parent
+                    break
+                if parent == root: break
+                parent = parent_map.get(parent)
+            slots.append((key, target_elem))
+    return slots
+
+def _unit_mm(matrix, mm_per_unit):
+    # Millimetres per user unit of content drawn under matrix (its mean scale; root units -> mm)
+    a, b, c, d = matrix[:4]
+    return mm_per_unit * math.sqrt(abs(a * d - b * c))
+
+def _inherited_layer(elem, parent_map):
+    # Nearest pen layer among the element and its ancestors; unnumbered content is layer 1
+    while elem is not None:
+        layer = svg_geometry.pen_layer(elem)
+        if layer: return layer
+        elem = parent_map.get(elem)
+    return 1
+
 class VisualTemplateEngine:
-    def __init__(self, template_path, font_name="primary_variation", offset_x=0.0, offset_y=0.0):
+    def __init__(self, template_path, font_name="primary_variation", offset_x=0.0, offset_y=0.0, variation="per_row", font=None, optimize_strokes=False, placeholder_layers=None, bounds_check="flag", safe_margin=0.0):
         self.template_path = template_path
         self.offset_x = float(offset_x)
         self.offset_y = float(offset_y)
+        self.variation = variation if variation in VARIATION_POLICIES else "per_row"
+        self.optimize_strokes = bool(optimize_strokes)   # Join touching strokes + RDP per text value
+        # Pen layer per placeholder key (overrides the numbered template layer the text sits in)
+        self.placeholder_layers = {k: int(v) for k, v in (placeholder_layers or {}).items() if str(v).strip().isdigit() and int(v) > 0}
+        self._rng = random.Random()   # 'random' policy only; never the shared module RNG
+        # Placeholder boxes vs page, machine travel, safe margin (template units) and each other
+        self.bounds_check = bounds_check if bounds_check in card_bounds.MODES else "flag"
+        self.safe_margin = float(safe_margin or 0.0)
 
-        # 1. SMART IMPORT: Try Variable folder first, then Standard
-        self.loaded_font = None
-        try:
-            self.loaded_font = importlib.import_module(f"font_library.variable.{font_name}")
-            print(f"🔹 Loaded Variable Font: {font_name}")
-        except ModuleNotFoundError:
-            try:
-                self.loaded_font = importlib.import_module(f"font_library.standard.{font_name}")
-                print(f"🔹 Loaded Standard Font: {font_name}")
-            except ModuleNotFoundError:
+        # 1. FONT LOOKUP: Variable folder first, then Standard (cached across generations)
+        # A ready font object (e.g. a worker's glyph atlas) can be passed in instead
+        self.font = font
+        if self.font is None:
+            self.font = font_registry.get(font_name)
+            if self.font:
+                print(f"🔹 Loaded {self.font.kind} Font: {font_name}")
+            else:
                 print(f"❌ CRITICAL: Font '{font_name}' not found in variable or standard folders!")
 
+        self._template_texts = None
+        self._stroke_counts = {}
+        self.last_pen_lifts = 0   # Strokes drawn by the last process_template call
+        self.last_geometry = {}   # speed_profile stats (mm) of everything drawn by the last call
+        self._glyph_stats = {}
+        self._glyph_polylines = {}
+        self.last_stroke_stats = {}   # Pen lifts / points before and after optimization (last call)
+        self.last_layers = {}   # {pen layer: {"ink", "lifts"}} of the last call; empty for single-layer templates
+        self.last_bounds = []   # Bounds / collision issues of the last call (card_bounds.check + shrink notes)
+        self._glyph_bounds = {}
+        self._limits = None     # (compiled template, card_bounds.frame) of the last card
+        self._static_geometry = None   # (stats of the template's own artwork, mm per user unit)
+        self._compiled = None   # (placeholder keys, compiled template) of the last card
+
         self.FONT_REF_HEIGHT = 20.0
 
-# ... inside VisualTemplateEngine class ...
+    def placeholder_keys(self, keys):
+        """
+        Which of the given CSV keys the template will actually replace.
+        Uses the same matching rule as process_template (spaces ignored).
+        """
+        if self._template_texts is None:
+            root = ET.parse(self.template_path).getroot()
+            self._template_texts = [elem.text.replace(" ", "") for elem in root.iter()
+                                    if elem.tag.split('}')[-1] in ['text', 'tspan', 'flowPara'] and elem.text]
+        return [k for k in keys if any(k.replace(" ", "") in t for t in self._template_texts)]
 
-    def process_template(self, replacements, output_filename):
-        # 1. RELOAD TEMPLATE
+    def template_fields(self):
+        """Names written as {FIELD} anywhere in the template's text."""
+        self.placeholder_keys([])
+        return {m for t in self._template_texts for m in re.findall(r'\{([^{}]+)\}', t)}
+
+    def placeholder_slots(self, keys):
+        """
+        Static layout of every placeholder the template will fill, for checks that
+        must not render: [{key, x, y, scale, matrix, page, mm_per_unit}] where matrix
+        maps the generated group's coordinates to root user units and page is the viewBox.
+        """
         tree = ET.parse(self.template_path)
         root = tree.getroot()
+        page = svg_geometry.viewbox(root)
+        mm_per_unit = motion_model.document_scale(root)
+        parent_map = {c: p for p in root.iter() for c in p}
 
-        items_to_replace = []
-        total_ink_length_mm = 0.0  # Track ink in Millimeters
+        slots = []
+        for key, target_elem in _resolve_slots(root, keys, parent_map):
+            # Accumulated transform of the element the group is appended to
+            matrix = _element_matrix(parent_map.get(target_elem), parent_map)
+            x, y = self._get_position(target_elem)
+            slots.append({"key": key, "x": x + self.offset_x, "y": y + self.offset_y,
+                          "scale": self._get_scale(target_elem), "matrix": matrix, "page": page, "mm_per_unit": mm_per_unit})
+        return slots
 
-        # 2. SCAN
-        for elem in root.iter():
-            tag_name = elem.tag.split('}')[-1]
-            if tag_name in ['text', 'tspan', 'flowPara']:
-                content = elem.text
-                if content:
-                    clean_content = content.replace(" ", "")
-                    for key, value in replacements.items():
-                        clean_key = key.replace(" ", "")
-                        if clean_key in clean_content:
-                            items_to_replace.append((elem, key, value))
-
-        if not items_to_replace:
-            tree.write(output_filename, encoding='utf-8', xml_declaration=True)
-            return 0.0 # Return 0 ink if nothing replaced
+    def compile_template(self, keys):
+        """
+        The template with everything that is the same on every card pre-rendered:
+        static (non-placeholder) text laid out as single-stroke paths in the
+        selected font, basic shapes converted to paths, raster images moved out
+        to a preview-only layer. The result is serialized once into byte chunks
+        around the placeholder slots, so a card only lays out and writes its
+        variable text. Built once per template hash, font and placeholder keys.
+        Returns {"chunks", "slots", "ink", "lifts", "geometry", "raster", "layers",
+                 "layer_totals", "static_texts", "shapes", "images", "frame"};
+        slots are (key, x, y, scale, pen layer, layer set by placeholder_layers);
+        frame is {"page", "mm_per_unit", "matrices"} (slot group -> root) for bounds checks.
+        """
+        keys = tuple(keys)
+        if self._compiled and self._compiled[0] == keys: return self._compiled[1]
+        with open(self.template_path, 'rb') as f: data = f.read()
+        font = self.font
+        cache_key = (hashlib.sha1(data).hexdigest(), font.name if font else None, font.mtime if font else None,
+                     self.variation, self.optimize_strokes, tuple(sorted(self.placeholder_layers.items())), keys)
+        with _compiled_lock:
+            compiled = _compiled_templates.get(cache_key)
+            if compiled: _compiled_templates.move_to_end(cache_key)
+        if compiled is None:
+            compiled = self._compile(data, keys)
+            with _compiled_lock:
+                _compiled_templates[cache_key] = compiled
+                while len(_compiled_templates) > COMPILED_TEMPLATE_LIMIT: _compiled_templates.popitem(last=False)
+        self._compiled = (keys, compiled)
+        self._static_geometry = compiled["geometry"]
+        return compiled
 
+    def _compile(self, data, keys):
+        root = ET.fromstring(data)
         parent_map = {c: p for p in root.iter() for c in p}
+        clean_keys = [k.replace(" ", "") for k in keys]
+        ns = root.tag[:root.tag.index('}') + 1] if root.tag.startswith('{') else ''
+        ink, lifts, static_texts, shapes = 0.0, 0, 0, 0
+        layer_totals = {}
+        mm_per_unit = motion_model.document_scale(root)
 
-        # 3. REPLACE & MEASURE
-        for elem, key, value in items_to_replace:
-            target_elem = elem
-            parent = parent_map.get(elem)
+        # 1. STATIC TEXT -> FONT STROKES (placeholder texts are left for the cards)
+        for text_elem in [e for e in root.iter() if svg_geometry.local_tag(e) == 'text']:
+            lines = [e for e in text_elem.iter() if svg_geometry.local_tag(e) in TEXT_TAGS and e.text and e.text.strip()]
+            if not lines or any(k in e.text.replace(" ", "") for e in lines for k in clean_keys): continue
+            group = ET.Element('g')
+            for name in ('id', 'transform', 'data-layer'):
+                if text_elem.get(name): group.set(name, text_elem.get(name))
+            totals = layer_totals.setdefault(_inherited_layer(text_elem, parent_map), {"ink": 0.0, "lifts": 0})
+            unit_mm = _unit_mm(_element_matrix(text_elem, parent_map), mm_per_unit)
+            for e in lines:
+                # tspans without their own position/size inherit the text element's
+                x, y = self._get_position(e if e.get('x') is not None else text_elem)
+                scale = self._get_scale(e if 'font-size' in e.get('style', '') else text_elem)
+                elements, ink_len, line_lifts, _ = self._layout_text(e.text, scale, unit_mm=unit_mm)
+                line_group = ET.SubElement(group, 'g')
+                line_group.set('transform', f"translate({x},{y})")
+                line_group.extend(elements)
+                ink += ink_len
+                lifts += line_lifts
+                totals["ink"] += ink_len
+                totals["lifts"] += line_lifts
+            parent = parent_map[text_elem]
+            index = list(parent).index(text_elem)
+            parent.remove(text_elem)
+            parent.insert(index, group)
+            parent_map.update((c, group) for c in group)
+            static_texts += 1
 
-            while parent is not None:
-                p_tag = parent.tag.split('}')[-1]
-                if p_tag == 'text':
-                    target_elem = parent
-                    break
-                if parent == root: break
-                parent = parent_map.get(parent)
+        # 2. SHAPES -> PATHS
+        for elem in root.iter():
+            if svg_geometry.local_tag(elem) not in SHAPE_TAGS: continue
+            d = svg_geometry.shape_to_d(elem)
+            if not d: continue
+            for name in SHAPE_ATTRS: elem.attrib.pop(name, None)
+            elem.tag = ns + 'path'
+            elem.set('d', d)
+            shapes += 1
 
-            x, y = self._get_position(target_elem)
-            scale = self._get_scale(target_elem)
+        # 3. RASTER IMAGES -> PREVIEW-ONLY LAYER (the plotter cannot draw them)
+        images = [e for e in root.iter() if svg_geometry.local_tag(e) == 'image']
+        raster = _raster_layer(root, images) if images else None
+        for image in images: parent_map[image].remove(image)
 
-            new_group, ink_len = self._generate_path_group(value, x, y, scale)
-            total_ink_length_mm += ink_len # Add length of this text block
+        # Template artwork (now including the static text) is the same on every card: measured once
+        geometry = (speed_profile.polyline_stats(svg_geometry.iter_polylines(root)), motion_model.document_scale(root))
 
+        # 4. PLACEHOLDER SLOTS (_resolve_slots): each filled
+        # text is replaced by its group(s), appended to the text's parent
+        slots, targets, matrices = [], [], []
+        for key, target_elem in _resolve_slots(root, keys, parent_map):
             text_parent = parent_map.get(target_elem)
-            if text_parent:
-                text_parent.append(new_group)
-                try: text_parent.remove(target_elem)
-                except ValueError: pass
+            if text_parent is None: continue
+            x, y = self._get_position(target_elem)
+            marker = ET.SubElement(text_parent, SLOT_TAG)
+            marker.set('n', str(len(slots)))
+            layer = self.placeholder_layers.get(key) or _inherited_layer(target_elem, parent_map)
+            slots.append((key, x, y, self._get_scale(target_elem), layer, key in self.placeholder_layers))
+            targets.append((text_parent, target_elem))
+            matrices.append(_element_matrix(text_parent, parent_map))
+        for text_parent, target_elem in targets:
+            try: text_parent.remove(target_elem)
+            except ValueError: pass
+
+        layers = sorted(svg_geometry.drawable_layers(root) | {slot[4] for slot in slots})
+
+        # 5. SERIALIZE ONCE: static bytes between the slot markers
+        parts = _SLOT_RE.split(ET.tostring(root, encoding='utf-8', xml_declaration=True))
+        chunks = parts[0::2]
 
-        # 4. SAVE
-        tree.write(output_filename, encoding='utf-8', xml_declaration=True)
+        if static_texts or shapes or images:
+            print(f"🧩 Template compiled: {static_texts} static text blocks to strokes, {shapes} shapes to paths, "
+                  f"{len(images)} images to the preview layer ({sum(len(c) for c in chunks) // 1024} KB static)")
+        return {"chunks": chunks, "slots": slots, "ink": ink, "lifts": lifts, "geometry": geometry, "raster": raster,
+                "layers": layers, "layer_totals": layer_totals, "static_texts": static_texts, "shapes": shapes, "images": len(images),
+                "frame": {"page": svg_geometry.viewbox(root), "mm_per_unit": geometry[1], "matrices": matrices,
+                          "unit_mm": [_unit_mm(m, geometry[1]) for m in matrices]}}
+
+    def process_template(self, replacements, output_filename):
+        # 1. COMPILED TEMPLATE (static content rendered and serialized once)
+        compiled = self.compile_template(replacements.keys())
+        total_ink_length_mm = compiled["ink"]  # Track ink in Millimeters (static text is drawn on every card)
+        self.last_pen_lifts = compiled["lifts"]
+        self.last_geometry = {}
+        self.last_stroke_stats = {}
+        layered = compiled["layers"] != [1]
+        self.last_layers = {n: dict(compiled["layer_totals"].get(n, {"ink": 0.0, "lifts": 0})) for n in compiled["layers"]} if layered else {}
+        row_seed = row_fingerprint(replacements)
+        self.last_bounds = []
+
+        # 2. LAY OUT each placeholder slot, then check (and in shrink mode fix) where the text lands
+        layouts = []
+        for (key, x, y, scale, layer, explicit), unit_mm in zip(compiled["slots"], compiled["frame"]["unit_mm"]):
+            with metrics.timed("linecraft_layout_seconds"):
+                layouts.append(self._layout_for(replacements[key], scale, f"{row_seed}:{key}", unit_mm))
+        scales = [slot[3] for slot in compiled["slots"]]
+        if self.bounds_check != "off" and layouts: layouts, scales = self._check_bounds(compiled, replacements, row_seed, layouts, scales)
+
+        # 3. MEASURE each placeholder group (per pen layer when the template has several)
+        groups = []
+        for (key, x, y, _, layer, explicit), layout, scale in zip(compiled["slots"], layouts, scales):
+            lifts_before = self.last_pen_lifts
+            new_group, ink_len = self._generate_path_group(replacements[key], x, y, scale, layout=layout)
+            if explicit: new_group.set('data-layer', str(layer))
+            total_ink_length_mm += ink_len # Add length of this text block
+            if layered:
+                self.last_layers[layer]["ink"] += ink_len
+                self.last_layers[layer]["lifts"] += self.last_pen_lifts - lifts_before
+            groups.append(ET.tostring(new_group, encoding='utf-8'))
+
+        # 4. SAVE: static chunks around the card's own groups
+        self._finish_geometry()
+        chunks = compiled["chunks"]
+        with metrics.timed("linecraft_svg_write_seconds"):
+            with open(output_filename, 'wb') as f:
+                f.write(chunks[0])
+                for group, chunk in zip(groups, chunks[1:]):
+                    f.write(group)
+                    f.write(chunk)
 
         # 5. RETURN INK IN METERS (mm / 1000)
         return total_ink_length_mm / 1000.0
-    # (Keep _get_position, _get_scale, _generate_path_group, _estimate_path_length EXACTLY as they were)
-    # I am omitting them here to save space, but DO NOT DELETE THEM from your file.
-    # Just replace the __init__ method at the top.
 
-    # ... [Paste the rest of the helper functions from the previous version here] ...
+    # --- PLACEMENT AND LAYOUT HELPERS (ink is measured with font_registry.path_length) ---
 
     def _get_position(self, elem):
         try:
@@ -111,93 +370,185 @@ class VisualTemplateEngine:
                 except: pass
         return font_size / self.FONT_REF_HEIGHT
 
-    def _generate_path_group(self, text, start_x, start_y, scale):
+    def _generate_path_group(self, text, start_x, start_y, scale, seed=None, layout=None):
+        # Glyphs are positioned relative to the slot; the group carries the slot position
         group = ET.Element('g')
+        group.set('transform', f"translate({start_x + self.offset_x},{start_y + self.offset_y})")
+        if layout is None: layout = self._layout_for(text, scale, seed)
+        self._use_layout(group, scale, *layout)
+        return group, layout[1]
+
+    def _layout_for(self, text, scale, seed=None, unit_mm=None):
+        # LAYOUT-ONCE: repeated layouts are reused whenever the variants are
+        # deterministic (plain fonts by text, per_value by text, per_row by seed)
+        font = self.font
+        key = None
+        if font and (not font.has_variation or self.variation != "random"):
+            variant_key = None if not font.has_variation else "per_value" if self.variation == "per_value" else seed
+            # Optimized layouts depend on the slot's size on paper (tolerances are in mm)
+            key = (text, scale, font.name, font.mtime, variant_key, self.optimize_strokes, unit_mm if self.optimize_strokes else None)
+            cached = layout_cache.get(key)
+            if cached: return cached
+
+        layout = self._layout_text(text, scale, seed, unit_mm)
+        if key: layout_cache.put(key, *layout)
+        return layout
+
+    def _check_bounds(self, compiled, replacements, row_seed, layouts, scales):
+        """
+        Root-space boxes of this card's placeholder groups (from the layouts' glyph
+        boxes) against the page, machine travel, safe margin and each other. In
+        "shrink" mode offending texts are laid out again smaller, about their slot
+        origin. Issues go to last_bounds. Returns (layouts, scales) to draw.
+        """
+        if self._limits is None or self._limits[0] is not compiled:
+            frame = compiled["frame"]
+            origins = np.array([(x + self.offset_x, y + self.offset_y) for _, x, y, *_ in compiled["slots"]], dtype=float).reshape(-1, 2)
+            matrices = np.array(frame["matrices"], dtype=float).reshape(-1, 6)
+            self._limits = (compiled, card_bounds.frame(frame["page"], frame["mm_per_unit"], self.safe_margin),
+                            np.hstack([origins, origins]), matrices)
+        _, limits, origin_boxes, matrices = self._limits
+        keys = [slot[0] for slot in compiled["slots"]]
+        frame_units = compiled["frame"]["unit_mm"]
+
+        def root_boxes(layouts):
+            local = np.array([layout[3]["bounds"] if layout[3] and layout[3].get("bounds") else (np.nan,) * 4 for layout in layouts], dtype=float)
+            return card_bounds.to_root(local + origin_boxes, matrices)
+
+        boxes = root_boxes(layouts)
+        notes = []
+        if self.bounds_check == "shrink":
+            root_origins = card_bounds.to_root(origin_boxes, matrices)[:, :2]
+            factors = card_bounds.shrink_factors(boxes, root_origins, limits)
+            if (factors < 1).any():
+                layouts, scales = list(layouts), list(scales)
+                for i in np.flatnonzero(factors < 1):
+                    scales[i] = scales[i] * float(factors[i])
+                    layouts[i] = self._layout_for(replacements[keys[i]], scales[i], f"{row_seed}:{keys[i]}", frame_units[i])
+                    notes.append({"level": "warning", "code": "shrunk", "message": f"{keys[i]} shrunk to {factors[i]:.0%} to fit.", "field": keys[i]})
+                boxes = root_boxes(layouts)
+        self.last_bounds = card_bounds.check(keys, boxes, limits) + notes
+        return layouts, scales
+
+    def _use_layout(self, group, scale, elements, ink_len, lifts, info):
+        group.extend(elements)
+        self.last_pen_lifts += lifts
+        if info and info.get("geometry"):
+            # Optimized layouts are already in slot units and carry their own geometry
+            speed_profile.add_stats(self.last_geometry, info["geometry"])
+            speed_profile.add_stats(self.last_stroke_stats, info["strokes"])
+        else: self._add_geometry(elements, scale)
+
+    def _finish_geometry(self):
+        static, mm_per_unit = self._static_geometry
+        total = speed_profile.add_stats(dict(static), self.last_geometry)
+        self.last_geometry = speed_profile.scale_stats(total, mm_per_unit)
+
+    def _add_geometry(self, elements, scale):
+        # Glyph geometry is measured once per variant (font units), then scaled per slot
+        group = {}
+        for e in elements:
+            d = e.get('d')
+            stats = self._glyph_stats.get(d)
+            if stats is None:
+                stats = speed_profile.polyline_stats(svg_geometry.path_to_polylines(d))
+                self._glyph_stats[d] = stats
+            speed_profile.add_stats(group, stats)
+        if group: speed_profile.add_stats(self.last_geometry, speed_profile.scale_stats(group, scale))
+
+    def _glyph_box(self, d):
+        # (min_x, min_y, max_x, max_y) of a glyph variant in font units, from its cached polylines
+        if d not in self._glyph_bounds:
+            strokes = self._glyph_strokes(d)
+            points = np.concatenate(strokes) if strokes else None
+            self._glyph_bounds[d] = tuple(float(v) for v in (*points.min(axis=0), *points.max(axis=0))) if points is not None else None
+        return self._glyph_bounds[d]
+
+    def _glyph_strokes(self, d):
+        # Glyph polylines in font units, flattened once per variant
+        strokes = self._glyph_polylines.get(d)
+        if strokes is None:
+            strokes = [np.asarray(p, dtype=float) for p in svg_geometry.path_to_polylines(d, 0.05) if len(p) > 1]
+            self._glyph_polylines[d] = strokes
+        return strokes
+
+    def _layout_text(self, text, scale, seed=None, unit_mm=None):
+        """
+        Returns (elements relative to the slot origin, ink, pen lifts, info).
+        info is None, or for optimized layouts {"geometry", "strokes"} stats.
+        unit_mm: millimetres per slot unit on paper, for the optimizer's tolerances
+        (None = slot units are taken as mm).
+        """
+        elements = []
+        placed = []   # Optimized layouts: glyph strokes in slot units
+        box = [math.inf, math.inf, -math.inf, -math.inf]   # Glyph extent in slot units
         group_ink_length = 0.0
-        cursor_x = start_x + self.offset_x
-        cursor_y = start_y + self.offset_y
-
-        space_width = 10.0
-        line_height = 30.0
-        static_font_data = {}
-        static_widths = {}
-        default_width = 18.0
-
-        if self.loaded_font:
-            space_width = getattr(self.loaded_font, 'SPACE_WIDTH_MM', 10.0)
-            line_height = getattr(self.loaded_font, 'LINE_HEIGHT_MM', 30.0)
-            static_font_data = getattr(self.loaded_font, 'STATIC_FONT', {})
-            static_widths = getattr(self.loaded_font, 'CHAR_WIDTHS', {})
-            default_width = getattr(self.loaded_font, 'CHAR_WIDTH_MM', 18.0)
+        pen_lifts = 0
+        cursor_x = 0.0
+        cursor_y = 0.0
+
+        font = self.font
+        space_width = font.space_width if font else 10.0
+        line_height = font.line_height if font else 30.0
+        default_width = font.default_width if font else 18.0
+        if self.variation == "per_value": rng = random.Random(text)
+        elif self.variation == "per_row": rng = random.Random(seed if seed is not None else text)
+        else: rng = self._rng
 
         for char in text:
             if char == '\n':
-                cursor_x = start_x + self.offset_x
+                cursor_x = 0.0
                 cursor_y += (line_height * scale)
                 continue
             if char == ' ':
                 cursor_x += (space_width * scale)
                 continue
 
-            path_d = ""
             current_char_width = default_width
-            raw_data = static_font_data.get(char, static_font_data.get('?'))
-
-            if raw_data:
-                if isinstance(raw_data, list):
-                    choice = random.choice(raw_data)
-                    if isinstance(choice, tuple) or isinstance(choice, list):
-                        path_d = choice[0]
-                        current_char_width = float(choice[1])
-                    else:
-                        path_d = choice
-                        current_char_width = static_widths.get(char, default_width)
-                elif isinstance(raw_data, str):
-                    path_d = raw_data
-                    current_char_width = static_widths.get(char, default_width)
-
-            if path_d:
-                path = ET.SubElement(group, 'path')
+            variants = font.variants(char) if font else None
+
+            if variants:
+                path_d, current_char_width, glyph_len = variants[0] if len(variants) == 1 else rng.choice(variants)
+                gb = self._glyph_box(path_d)
+                if gb:
+                    box = [min(box[0], cursor_x + gb[0] * scale), min(box[1], cursor_y + gb[1] * scale),
+                           max(box[2], cursor_x + gb[2] * scale), max(box[3], cursor_y + gb[3] * scale)]
+                if self.optimize_strokes:
+                    placed += [p * scale + (cursor_x, cursor_y) for p in self._glyph_strokes(path_d)]
+                    cursor_x += (current_char_width * scale)
+                    continue
+                path = ET.Element('path')
                 path.set('d', path_d)
                 path.set('style', 'fill:none;stroke:black;stroke-width:2;stroke-linecap:round;stroke-linejoin:round')
                 transform = f"translate({cursor_x},{cursor_y}) scale({scale})"
                 path.set('transform', transform)
-                group_ink_length += (self._estimate_path_length(path_d) * scale)
+                elements.append(path)
+                group_ink_length += (glyph_len * scale)
+                pen_lifts += self._stroke_count(path_d)
 
             cursor_x += (current_char_width * scale)
 
-        return group, group_ink_length
-
-    def _estimate_path_length(self, d_string):
-        tokens = re.findall(r'[A-Za-z]|[-+]?[0-9]*\.?[0-9]+', d_string)
-        total_dist = 0.0
-        current_x, current_y = 0.0, 0.0
-        start_x, start_y = 0.0, 0.0
-        i = 0
-        while i < len(tokens):
-            cmd = tokens[i]
-            if cmd in ['M','L','C','Q','A','Z','m','l','c','q','a','z']: i += 1
-            else: i += 1; continue
-            if cmd == 'M':
-                if i+1 < len(tokens):
-                    current_x, current_y = float(tokens[i]), float(tokens[i+1])
-                    start_x, start_y = current_x, current_y
-                    i += 2
-            elif cmd == 'L':
-                if i+1 < len(tokens):
-                    tx, ty = float(tokens[i]), float(tokens[i+1])
-                    total_dist += math.sqrt((tx-current_x)**2 + (ty-current_y)**2)
-                    current_x, current_y = tx, ty
-                    i += 2
-            elif cmd in ['C', 'Q']:
-                skip = 6 if cmd == 'C' else 4
-                if i+(skip-1) < len(tokens):
-                    tx, ty = float(tokens[i+(skip-2)]), float(tokens[i+(skip-1)])
-                    dist = math.sqrt((tx-current_x)**2 + (ty-current_y)**2)
-                    total_dist += (dist * 1.2)
-                    current_x, current_y = tx, ty
-                    i += skip
-            elif cmd in ['Z', 'z']:
-                total_dist += math.sqrt((start_x-current_x)**2 + (start_y-current_y)**2)
-                current_x, current_y = start_x, start_y
-        return total_dist
+        bounds = tuple(box) if box[0] <= box[2] else None
+        if self.optimize_strokes: return self._optimized_layout(placed, scale, bounds, unit_mm)
+        return elements, group_ink_length, pen_lifts, {"bounds": bounds}
+
+    def _optimized_layout(self, placed, scale, bounds=None, unit_mm=None):
+        # One path per text value: touching strokes joined (also across letters), then simplified;
+        # the tolerances are on paper, so they are converted to slot units first
+        units = 1.0 / unit_mm if unit_mm else 1.0
+        strokes, counts = stroke_optimizer.optimize(placed, stroke_optimizer.JOIN_TOLERANCE_MM * units,
+                                                    stroke_optimizer.SIMPLIFY_TOLERANCE_MM * units)
+        if not strokes: return [], 0.0, 0, None
+        path = ET.Element('path')
+        path.set('d', svg_geometry.polylines_to_d(strokes, precision=3))
+        path.set('style', f'fill:none;stroke:black;stroke-width:{2 * scale:g};stroke-linecap:round;stroke-linejoin:round')
+        ink = sum(stroke_optimizer.polyline_length(s) for s in strokes)
+        return [path], ink, len(strokes), {"geometry": speed_profile.polyline_stats(strokes), "strokes": counts, "bounds": bounds}
+
+    def _stroke_count(self, d_string):
+        # Each moveto starts a new pen-down stroke
+        count = self._stroke_counts.get(d_string)
+        if count is None:
+            count = max(1, d_string.count('M') + d_string.count('m'))
+            self._stroke_counts[d_string] = count
+        return count
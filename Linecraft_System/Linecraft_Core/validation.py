@@ -0,0 +1,148 @@
+import os
+import re
+import time
+from collections import defaultdict
+
+from template_engine import VisualTemplateEngine
+from font_registry import registry as font_registry
+from job_generator import read_rows, card_filename, card_digits, DEFAULT_BODY, _engine_options
+import svg_geometry
+import card_bounds
+
+FIELD_RE = re.compile(r'\{([^{}]+)\}')
+UNSAFE_FILENAME_CHARS = set('/\\:*?"<>|')
+
+def _issue(level, code, message, field=None):
+    issue = {"level": level, "code": code, "message": message}
+    if field: issue["field"] = field
+    return issue
+
+def validate_batch(project_path, font_name="primary_variation", body_template="", offset_x=0.0, offset_y=0.0, strict_glyphs=False, default_pen=None, variation="per_row", motion_exports=(), optimize_strokes=False, layer_pens=None, placeholder_layers=None, bounds_check="flag", safe_margin=0.0):
+    """
+    Dry run over input.csv: nothing is rendered or written. Takes the same options
+    as generate_batch_api (job_generator.generation_options).
+    Checks columns vs. template fields, unsupported glyphs, estimated text extents
+    vs. the page, machine travel and safe area (as the bounds_check mode will treat
+    them), and output file names. Returns a per-row report.
+    """
+    started = time.perf_counter()
+    csv_file = os.path.join(project_path, "input.csv")
+    template_file = os.path.join(project_path, "template.svg")
+
+    if not os.path.exists(csv_file): return {"success": False, "error": "input.csv missing."}
+    if not os.path.exists(template_file): return {"success": False, "error": "template.svg missing."}
+
+    try:
+        engine = VisualTemplateEngine(template_file, font_name=font_name, **_engine_options(
+            offset_x, offset_y, variation, optimize_strokes, placeholder_layers, bounds_check, safe_margin))
+        rows = read_rows(csv_file, body_template)
+    except Exception as e: return {"success": False, "error": f"Engine Error: {str(e)}"}
+
+    errors = []
+    font = font_registry.get(font_name)
+    if font is None: errors.append(_issue("error", "font_missing", f"Font '{font_name}' not found."))
+
+    # 1. COLUMNS VS FIELDS
+    columns = [k for k in (rows[0].keys() if rows else []) if k != 'BODY']
+    known = set(columns) | {'BODY'}
+    for field in sorted(set(FIELD_RE.findall(body_template or DEFAULT_BODY)) - known):
+        errors.append(_issue("error", "body_field_missing", f"Body template uses {{{field}}} but the CSV has no such column.", field))
+    for field in sorted(engine.template_fields() - {k.replace(" ", "") for k in known}):
+        errors.append(_issue("error", "template_field_missing", f"template.svg has {{{field}}} but the CSV has no such column.", field))
+    if not rows: errors.append(_issue("error", "empty_csv", "input.csv has no rows."))
+
+    # 2. SLOT GEOMETRY (once per template; the same page / travel / safe limits as generation)
+    keys = engine.placeholder_keys(list(rows[0].keys())) if rows else []
+    slots = []
+    for slot in engine.placeholder_slots(keys):
+        m = slot["matrix"]
+        limits = card_bounds.frame(slot["page"], slot["mm_per_unit"], engine.safe_margin)
+        hard = [max(limits["page"][0], limits["travel"][0]), max(limits["page"][1], limits["travel"][1]),
+                min(limits["page"][2], limits["travel"][2]), min(limits["page"][3], limits["travel"][3])]
+        root_x, root_y = svg_geometry.apply(m, slot["x"], slot["y"])
+        slots.append((slot["key"], slot["scale"] * abs(m[0]), slot["scale"] * abs(m[3]), root_x, root_y, hard, limits["safe"]))
+
+    # Mean advance per char; unsupported chars render as '?'
+    advances = {}
+    fallback_adv = 10.0
+    space_adv, line_h = 10.0, 30.0
+    if font:
+        advances = {c: sum(w for _, w, _ in v) / len(v) for c, v in font.glyphs.items()}
+        fallback_adv = advances.get('?', font.default_width)
+        space_adv, line_h = font.space_width, font.line_height
+    advances[' '] = space_adv
+
+    extent_cache = {}
+    def extent(text):
+        if text not in extent_cache:
+            lines = text.split('\n')
+            width = max(sum(advances.get(c, fallback_adv) for c in line) for line in lines)
+            extent_cache[text] = (width, (len(lines) - 1) * line_h)
+        return extent_cache[text]
+
+    # 3. PER ROW
+    report_rows = []
+    names = defaultdict(list)
+    digits = card_digits(len(rows))
+    for i, row in enumerate(rows):
+        issues = []
+        for key, sx, sy, root_x, root_y, hard, safe in slots:
+            text = row.get(key) or ""
+            if not text.strip():
+                issues.append(_issue("warning", "empty_value", f"{key} is empty.", key))
+                continue
+            if font:
+                missing = font.missing_chars(text)
+                if missing:
+                    issues.append(_issue("error", "unsupported_chars", f"{key} has characters the font lacks: {''.join(sorted(missing))}", key))
+            if engine.bounds_check == "off": continue
+            width, height = extent(text)
+            box = (root_x, root_y, root_x + width * sx, root_y + height * sy)
+            if root_x < hard[0] or root_y < hard[1]:
+                issues.append(_issue("error", "slot_off_page", f"{key} starts outside the page or machine travel.", key))
+                continue
+            # Shrink mode pulls a value back into the safe area when half size or more is enough
+            fit = card_bounds.fit_scale(box, (root_x, root_y), safe)
+            if fit < 1.0 and engine.bounds_check == "shrink" and fit >= card_bounds.MIN_SHRINK:
+                issues.append(_issue("warning", "will_shrink", f"{key} will be shrunk to ~{fit:.0%} to fit the safe area.", key))
+                continue
+            if box[2] > hard[2]:
+                issues.append(_issue("error", "too_wide", f"{key} is ~{box[2] - root_x:.1f} wide but only {hard[2] - root_x:.1f} is available.", key))
+            if box[3] > hard[3]:
+                issues.append(_issue("error", "too_tall", f"{key} runs ~{box[3] - hard[3]:.1f} below the page or machine travel.", key))
+            if box[2] <= hard[2] and box[3] <= hard[3] and fit < 1.0:
+                issues.append(_issue("warning", "outside_safe_area", f"{key} reaches into the safe margin.", key))
+
+        # The exact name the generator writes, so the checks cannot drift from it
+        filename = card_filename(i + 1, row, digits)
+        safe_name = filename.split("_", 1)[1][:-len(".svg")]
+        names[safe_name].append(i + 1)
+        if UNSAFE_FILENAME_CHARS & set(safe_name):
+            issues.append(_issue("error", "unsafe_filename", f"Output name '{filename}' contains characters that are not allowed in file names.", 'NAME'))
+
+        if issues: report_rows.append({"row": i + 1, "file": filename, "issues": issues})
+
+    # 4. BATCH-WIDE NAME CHECKS
+    by_row = {r["row"]: r for r in report_rows}
+    for safe_name, row_numbers in names.items():
+        if len(row_numbers) < 2: continue
+        for n in row_numbers:
+            entry = by_row.get(n)
+            if entry is None:
+                entry = {"row": n, "file": card_filename(n, rows[n - 1], digits), "issues": []}
+                by_row[n] = entry
+                report_rows.append(entry)
+            others = ", ".join(str(r) for r in row_numbers if r != n)
+            entry["issues"].append(_issue("warning", "duplicate_name", f"Same NAME as row(s) {others}; possible duplicate order.", 'NAME'))
+    report_rows.sort(key=lambda r: r["row"])
+
+    row_errors = sum(1 for r in report_rows if any(x["level"] == "error" for x in r["issues"]))
+    return {
+        "success": True,
+        "ok": not any(e["level"] == "error" for e in errors) and row_errors == 0,
+        "rows_checked": len(rows),
+        "rows_with_errors": row_errors,
+        "errors": errors,
+        "rows": report_rows,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
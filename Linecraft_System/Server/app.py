@@ -1,13 +1,11 @@
-from flask import Flask, jsonify, request, send_file
+from flask import Flask, jsonify, request, send_file, Response
 from flask_cors import CORS
 import sys
 import os
 import shutil
 import json
 import datetime
-import subprocess
 import time
-import importlib
 
 # --- PATH CONFIG ---
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -17,34 +15,37 @@ PROJECTS_ROOT = os.path.join(SYSTEM_ROOT, 'Projects')
 ARCHIVES_ROOT = os.path.join(SYSTEM_ROOT, 'Archives')
 
 sys.path.append(CORE_PATH)
-from job_generator import generate_batch_api
+from job_generator import generate_batch_api, read_rows, glyph_coverage, generation_options, profile_cards_api
+from font_registry import registry as font_registry
+from template_engine import VisualTemplateEngine
+from validation import validate_batch
 from plot_manager import manager as plot_manager
-
-FONT_LIB_PATH = os.path.join(CORE_PATH, 'font_library')
-AXICLI_PATH = "/path/to/your/env/bin/axicli"
+import batch_store
+from preview_cache import cache as preview_cache
+from layout_cache import cache as layout_cache
+import threading
+import metrics
+from task_runner import runner as task_runner
+from state_store import store
+import speed_profile
+import profiling
+from order_intake import intake as order_intake
+
+# Projects and archived runs from before the state store (no-op once imported)
+store.migrate_json(projects_root=PROJECTS_ROOT, archives_root=ARCHIVES_ROOT)
 
 app = Flask(__name__)
 CORS(app)
 
+# Continuous intake: ingested orders go straight onto the live plot queue; resume watched inboxes
+order_intake.on_cards = plot_manager.append_cards
+order_intake.resume()
+
 # --- 1. FONTS ---
 @app.route('/fonts', methods=['GET'])
 def list_fonts():
-    fonts = []
-    # Scan Variable Folder
-    var_path = os.path.join(FONT_LIB_PATH, "variable")
-    if os.path.exists(var_path):
-        for f in sorted(os.listdir(var_path)):
-            if f.endswith(".py") and f != "__init__.py":
-                fonts.append({"name": f.replace(".py", ""), "type": "Variable"})
-
-    # Scan Standard Folder
-    std_path = os.path.join(FONT_LIB_PATH, "standard")
-    if os.path.exists(std_path):
-        for f in sorted(os.listdir(std_path)):
-            if f.endswith(".py") and f != "__init__.py":
-                fonts.append({"name": f.replace(".py", ""), "type": "Standard"})
-
-    return jsonify({"fonts": fonts})
+    # Indexed once, refreshed on folder/file mtime change; includes glyph coverage & metrics
+    return jsonify({"fonts": font_registry.list_fonts()})
 
 # --- 2. PEN MANAGEMENT ---
 @app.route('/pens', methods=['GET'])
@@ -74,7 +75,8 @@ def select_pen():
 def load_queue():
     name = request.json.get('project')
     project_path = os.path.join(PROJECTS_ROOT, name)
-    success, msg = plot_manager.load_batch(project_path)
+    # stream: start on a batch that is still being generated (cards plot as they are written)
+    success, msg = plot_manager.load_batch(project_path, stream=bool(request.json.get('stream')))
     return jsonify({"success": success, "message": msg})
 
 @app.route('/queue/start', methods=['POST'])
@@ -87,6 +89,32 @@ def continue_queue():
     if plot_manager.user_continue(): return jsonify({"success": True})
     return jsonify({"error": "Not waiting"}), 400
 
+@app.route('/queue/trigger', methods=['GET', 'POST'])
+def trigger_queue():
+    # Local hook for foot pedals / keyboard scripts: continue after paper change, or start
+    if request.remote_addr not in ('127.0.0.1', '::1'): return jsonify({"error": "Local only"}), 403
+    success, msg = plot_manager.trigger()
+    return jsonify({"success": success, "message": msg})
+
+@app.route('/queue/auto_continue', methods=['POST'])
+def set_auto_continue():
+    try: delay = float((request.json or {}).get('delay', 0) or 0)
+    except (TypeError, ValueError): return jsonify({"error": "Invalid delay"}), 400
+    plot_manager.set_auto_continue(delay)
+    return jsonify({"success": True, "delay": plot_manager.auto_continue_delay})
+
+@app.route('/queue/policy', methods=['POST'])
+def set_queue_policy():
+    # Re-plans the cards not yet plotted: file | shortest_first | longest_first
+    success, msg = plot_manager.set_queue_policy((request.json or {}).get('policy', 'file'))
+    return jsonify({"success": success, "message": msg, "plan": plot_manager.plan_summary()}), (200 if success else 400)
+
+@app.route('/queue/layer_stack', methods=['POST'])
+def set_layer_stack():
+    # Multi-pen cards: registered sheets plotted per pen layer before the next pen (1 = card by card)
+    success, msg = plot_manager.set_layer_stack((request.json or {}).get('sheets', 1))
+    return jsonify({"success": success, "message": msg, "plan": plot_manager.plan_summary()}), (200 if success else 400)
+
 @app.route('/queue/skip/forward', methods=['POST'])
 def skip_forward():
     success, msg = plot_manager.skip_forward()
@@ -106,32 +134,103 @@ def toggle_pause():
 def queue_status():
     duration = int(time.time() - plot_manager.start_time) if plot_manager.start_time > 0 else 0
     active_pen = plot_manager.pens.get(plot_manager.current_pen_id, {})
+    index, total = plot_manager.queue_position()
 
     return jsonify({
         "state": plot_manager.state,
         "current_file": plot_manager.current_file,
+        "current_layer": plot_manager.current_layer,
         "next_file": plot_manager.next_file,
-        "current_index": plot_manager.current_index + 1,
-        "total_files": len(plot_manager.queue),
+        "current_index": index + 1,
+        "total_files": total,
         "message": plot_manager.status_message,
+        "auto_continue_delay": plot_manager.auto_continue_delay,
+        "auto_continue_in": max(0, round(plot_manager.auto_continue_at - time.time(), 1)) if plot_manager.auto_continue_at else None,
         "stats": {
             "duration_str": str(datetime.timedelta(seconds=duration)),
             "pen_name": active_pen.get('name', 'Unknown'),
             "pen_capacity": active_pen.get('capacity', 200),
             "pen_used": active_pen.get('used', 0)
             # REMOVED: "current_speed" to fix the crash
-        }
+        },
+        "plan": plot_manager.plan_summary()
     })
 
 @app.route('/preview/<project_name>/<filename>')
 def serve_preview(project_name, filename):
-    path = os.path.join(PROJECTS_ROOT, project_name, "generated_batch", filename)
+    project_path = os.path.join(PROJECTS_ROOT, project_name)
+    path = os.path.join(batch_store.batch_dir(project_path), filename)
     if os.path.exists(path): return send_file(path)
+
+    # Packed batch: stream the stored SVGZ as-is when the browser accepts gzip
+    packed = batch_store.container_path(project_path)
+    if os.path.exists(packed):
+        container = batch_store.BatchContainer(packed)
+        try:
+            if not container.has_card(filename): return "Not Found", 404
+            if 'gzip' in request.headers.get('Accept-Encoding', ''):
+                resp = Response(container.read_svgz(filename), mimetype='image/svg+xml')
+                resp.headers['Content-Encoding'] = 'gzip'
+                resp.headers['Vary'] = 'Accept-Encoding'
+                return resp
+            return Response(container.read_svg(filename), mimetype='image/svg+xml')
+        finally:
+            container.close()
     return "Not Found", 404
 
+@app.route('/raster/<project_name>')
+def serve_raster_layer(project_name):
+    # Template images left out of the plotted cards, for laying under a preview
+    data = batch_store.read_side_file(os.path.join(PROJECTS_ROOT, project_name), batch_store.RASTER_LAYER_NAME)
+    if data is None: return "Not Found", 404
+    return Response(data, mimetype='image/svg+xml')
+
+@app.route('/thumbnail/<project_name>/<filename>')
+def serve_thumbnail(project_name, filename):
+    """
+    Lightweight preview: ?format=svg (single simplified path) or ?format=png&width=320.
+    """
+    fmt = request.args.get('format', 'svg')
+    width = request.args.get('width', 320, type=int)
+    svg_bytes, signature = batch_store.read_card(os.path.join(PROJECTS_ROOT, project_name), filename)
+    if svg_bytes is None: return "Not Found", 404
+
+    etag, data, mimetype = preview_cache.get(svg_bytes, fmt, width, signature=signature)
+    if request.if_none_match and etag in request.if_none_match:
+        resp = Response(status=304)
+    else:
+        resp = Response(data, mimetype=mimetype)
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp
+
+def _warm_previews(project_path, limit=50):
+    # Pre-render the first thumbnails so the dashboard never waits on them
+    _, container, cards = batch_store.open_batch(project_path)
+    if container: container.close()
+    for card in cards[:limit]:
+        svg_bytes, signature = batch_store.read_card(project_path, card)
+        if svg_bytes is not None:
+            try: preview_cache.get(svg_bytes, 'svg', signature=signature)
+            except Exception: pass
+
 # --- 4. PROJECT & ARCHIVE ---
+def _run_or_queue(kind, fn, *args):
+    """
+    Runs fn inline, or hands it to the task runner when the body asks for
+    {"async": true}; the caller then polls /jobs/<id> for the result.
+    """
+    if (request.get_json(silent=True) or {}).get('async'):
+        job_id = task_runner.submit(kind, fn, *args)
+        return jsonify({"success": True, "job_id": job_id, "status_url": f"/jobs/{job_id}"}), 202
+    return jsonify(fn(*args))
+
 @app.route('/projects/<name>/archive', methods=['POST'])
 def archive_project(name):
+    compress = (request.get_json(silent=True) or {}).get('compress', False)
+    return _run_or_queue("archive", _archive, name, compress)
+
+def _archive(name, compress):
     project_path = os.path.join(PROJECTS_ROOT, name)
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M")
     archive_path = os.path.join(ARCHIVES_ROOT, name, timestamp)
@@ -146,19 +245,25 @@ def archive_project(name):
     }
     with open(os.path.join(archive_path, "run_report.json"), "w") as f:
         json.dump(report, f, indent=4)
+    store.record_run(name, report, archive_path)
 
     # Move/Copy Files
     if os.path.exists(os.path.join(project_path, "input.csv")):
         shutil.move(os.path.join(project_path, "input.csv"), os.path.join(archive_path, f"input_{timestamp}.csv"))
-    batch_dir = os.path.join(project_path, "generated_batch")
+    batch_dir = batch_store.batch_dir(project_path)
+    packed = batch_store.container_path(project_path)
     if os.path.exists(batch_dir):
-        shutil.move(batch_dir, os.path.join(archive_path, "plots"))
+        if compress: batch_store.pack_batch(batch_dir, os.path.join(archive_path, "plots.lcb"), remove_source=True)
+        else: shutil.move(batch_dir, os.path.join(archive_path, "plots"))
+    if os.path.exists(packed):
+        shutil.move(packed, os.path.join(archive_path, "plots.lcb"))
     if os.path.exists(os.path.join(project_path, "project_settings.json")):
         shutil.copy(os.path.join(project_path, "project_settings.json"), os.path.join(archive_path, "settings_snapshot.json"))
     if os.path.exists(os.path.join(project_path, "template.svg")):
         shutil.copy(os.path.join(project_path, "template.svg"), os.path.join(archive_path, "layout_snapshot.svg"))
+    batch_store.collect_garbage(project_path)   # Older batch versions nothing is plotting from
 
-    return jsonify({"success": True})
+    return {"success": True}
 
 # --- STANDARD CRUD ---
 @app.route('/projects', methods=['GET'])
@@ -177,56 +282,222 @@ def create_project():
     if os.path.exists(path): return jsonify({"error": "Exists"}), 400
     os.makedirs(path)
     with open(os.path.join(path, "project_settings.json"), "w") as f: json.dump({}, f)
+    store.save_project_settings(safe_name, path, {})
     return jsonify({"success": True})
 
 @app.route('/projects/<name>/details', methods=['GET'])
 def get_project_details(name):
     path = os.path.join(PROJECTS_ROOT, name)
     if not os.path.exists(path): return jsonify({"error": "Not found"}), 404
-    settings = {}
-    if os.path.exists(os.path.join(path, "project_settings.json")):
+    settings = store.project_settings(name)
+    if settings is None and os.path.exists(os.path.join(path, "project_settings.json")):
         with open(os.path.join(path, "project_settings.json")) as f: settings = json.load(f)
     has_csv = os.path.exists(os.path.join(path, "input.csv"))
     has_template = os.path.exists(os.path.join(path, "template.svg"))
-    batch_path = os.path.join(path, "generated_batch")
-    svg_count = len([f for f in os.listdir(batch_path) if f.endswith('.svg')]) if os.path.exists(batch_path) else 0
-    return jsonify({"settings": settings, "has_csv": has_csv, "has_template": has_template, "svg_count": svg_count})
+    _, container, cards = batch_store.open_batch(path)
+    if container: container.close()
+    svg_count = len(cards)
+    return jsonify({"settings": settings or {}, "has_csv": has_csv, "has_template": has_template, "svg_count": svg_count,
+                    "cards": store.card_summary(name)})
 
 @app.route('/projects/<name>/generate', methods=['POST'])
 def generate_project(name):
-    data = request.json
+    data = dict(request.json)
+    data.pop('async', None)
+    return _run_or_queue("generate", _generate, name, data)
+
+def _generate(name, data):
     project_path = os.path.join(PROJECTS_ROOT, name)
+    profile = bool(data.pop('profile', False))   # One-off: not saved with the settings
     with open(os.path.join(project_path, "project_settings.json"), "w") as f: json.dump(data, f)
+    store.save_project_settings(name, project_path, data)
     result = generate_batch_api(
         project_path=project_path,
-        font_name=data.get('font'),
-        body_template=data.get('template'),
-        offset_x=float(data.get('offset_x', 0)),
-        offset_y=float(data.get('offset_y', 0))
+        compress=bool(data.get('compress_batch', False)),
+        workers=int(data.get('workers') or 0) or None,
+        profile=profile,
+        **generation_options(data)
     )
+    if result.get('success'):
+        threading.Thread(target=_warm_previews, args=(project_path,), daemon=True).start()
+    return result
+
+@app.route('/projects/<name>/coverage', methods=['POST'])
+def project_coverage(name):
+    """
+    Missing-glyph report for the project's CSV with the given font, before generating.
+    """
+    data = request.json or {}
+    project_path = os.path.join(PROJECTS_ROOT, name)
+    csv_file = os.path.join(project_path, "input.csv")
+    template_file = os.path.join(project_path, "template.svg")
+    if not os.path.exists(csv_file) or not os.path.exists(template_file):
+        return jsonify({"success": False, "error": "input.csv or template.svg missing"}), 400
+    font_name = data.get('font')
+    try:
+        if font_registry.get(font_name) is None: return jsonify({"success": False, "error": f"Font '{font_name}' not found"}), 404
+        engine = VisualTemplateEngine(template_file, font_name=font_name)
+        rows = read_rows(csv_file, data.get('template'))
+        return jsonify({"success": True, **glyph_coverage(engine, font_name, rows)})
+    except Exception as e: return jsonify({"success": False, "error": f"Coverage Error: {str(e)}"}), 500
+
+@app.route('/projects/<name>/validate', methods=['POST'])
+def validate_project(name):
+    data = request.json or {}
+    # Same options as generation, so the pre-flight checks use the limits the run will
+    result = validate_batch(os.path.join(PROJECTS_ROOT, name), **generation_options(data))
     return jsonify(result)
 
 @app.route('/projects/<name>/save', methods=['POST'])
 def save_settings(name):
     with open(os.path.join(PROJECTS_ROOT, name, "project_settings.json"), "w") as f: json.dump(request.json, f)
+    store.save_project_settings(name, os.path.join(PROJECTS_ROOT, name), request.json)
     return jsonify({"success": True})
 
+@app.route('/projects/<name>/speed', methods=['GET', 'POST'])
+def project_speed(name):
+    """
+    Per-project speed overrides (speed_overrides.json), applied from the next card on.
+    POST body replaces them, e.g. {"scale": 0.9, "max_speed": 50, "cards": {"003_Ann.svg": {"speed_pendown": 15}}}
+    """
+    project_path = os.path.join(PROJECTS_ROOT, name)
+    if not os.path.isdir(project_path): return jsonify({"error": "Not found"}), 404
+    if request.method == 'POST':
+        data = request.get_json(silent=True)
+        errors = speed_profile.validate_overrides(data)
+        if errors: return jsonify({"error": "; ".join(errors), "errors": errors}), 400
+        speed_profile.write_overrides(project_path, data)
+    return jsonify({"overrides": speed_profile.read_overrides(project_path)})
+
+# --- CONTINUOUS INTAKE ---
+@app.route('/projects/<name>/intake', methods=['GET', 'POST'])
+def project_intake(name):
+    """
+    Continuous mode: watch <project>/inbox for order files (CSV or JSONL) and append
+    their rows to the live batch and plot queue. POST {"enabled": true|false}.
+    """
+    project_path = os.path.join(PROJECTS_ROOT, name)
+    if not os.path.isdir(project_path): return jsonify({"error": "Not found"}), 404
+    if request.method == 'POST':
+        if (request.get_json(silent=True) or {}).get('enabled', True): order_intake.watch(project_path)
+        else: order_intake.unwatch(project_path)
+    return jsonify(order_intake.status(project_path))
+
+@app.route('/projects/<name>/orders', methods=['POST'])
+def post_orders(name):
+    # Local hook for order systems: {"rows": [{"NAME": ..}, ..]} or one row object; processed in the background
+    if request.remote_addr not in ('127.0.0.1', '::1'): return jsonify({"error": "Local only"}), 403
+    project_path = os.path.join(PROJECTS_ROOT, name)
+    if not os.path.isdir(project_path): return jsonify({"error": "Not found"}), 404
+    data = request.get_json(silent=True)
+    rows = data.get('rows') if isinstance(data, dict) and 'rows' in data else [data] if isinstance(data, dict) else data
+    if not isinstance(rows, list) or not rows or not all(isinstance(r, dict) for r in rows):
+        return jsonify({"error": "Expected {\"rows\": [{...}]}"}), 400
+    order_intake.watch(project_path)
+    file_name = order_intake.submit_rows(project_path, rows)
+    return jsonify({"success": True, "file": file_name, "rows": len(rows), "status_url": f"/projects/{name}/intake"}), 202
+
+# --- PROFILING ---
+@app.route('/projects/<name>/profile', methods=['GET', 'POST'])
+def project_profile(name):
+    """
+    POST {"cards": 50}: profile the first N cards with the saved settings (body keys
+    override them; nothing is written to the batch) and return the hot spots.
+    GET: download the live batch's generation.prof (from "profile": true on
+    generate), or ?sample=1 for the latest sample run.
+    """
+    project_path = os.path.join(PROJECTS_ROOT, name)
+    if not os.path.isdir(project_path): return jsonify({"error": "Not found"}), 404
+    if request.method == 'POST':
+        data = dict(request.get_json(silent=True) or {})
+        cards = int(data.pop('cards', None) or profiling.SAMPLE_CARDS)
+        top = int(data.pop('top', None) or profiling.TOP)
+        data.pop('async', None)
+        settings = {**(store.project_settings(name) or {}), **data}
+        return _run_or_queue("profile", _profile, project_path, cards, top, settings)
+
+    if request.args.get('sample'):
+        path = os.path.join(batch_store.versions_dir(project_path), profiling.SAMPLE_NAME)
+        if not os.path.isfile(path): return "Not Found", 404
+        return send_file(path, mimetype='application/octet-stream', as_attachment=True, download_name=f"{name}_{profiling.SAMPLE_NAME}")
+    data = batch_store.read_side_file(project_path, profiling.PROFILE_NAME)
+    if data is None: return "Not Found", 404
+    resp = Response(data, mimetype='application/octet-stream')
+    resp.headers['Content-Disposition'] = f'attachment; filename="{name}_{profiling.PROFILE_NAME}"'
+    return resp
+
+def _profile(project_path, cards, top, settings):
+    return profile_cards_api(project_path, cards=cards, top=top, **generation_options(settings))
+
+# --- HISTORY & REPORTS (state store) ---
+@app.route('/history', methods=['GET'])
+def plot_history():
+    # Plot events and archived runs, newest first; ?project=<name>&limit=100
+    return jsonify(store.history(request.args.get('project'), request.args.get('limit', 100, type=int)))
+
+@app.route('/reports/ink', methods=['GET'])
+def ink_report():
+    # Ink, cards and plot time per project and pen; ?since=<unix time>
+    return jsonify({"rows": store.ink_report(request.args.get('since', 0, type=float))})
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    active_pen = plot_manager.pens.get(plot_manager.current_pen_id, {})
+    cache = preview_cache.stats()
+    layout = layout_cache.stats()
+    index, total = plot_manager.queue_position()
+    gauges = {
+        "linecraft_queue_length": ("Cards in the loaded queue.", total),
+        "linecraft_queue_position": ("Index of the current card (1-based).", index + 1 if total else 0),
+        "linecraft_waiting_for_paper": ("1 while the queue waits for the operator.", 1 if plot_manager.state == "WAITING_FOR_PAPER" else 0),
+        "linecraft_session_ink_meters": ("Ink used in the current session.", plot_manager.session_ink_meters),
+        "linecraft_pen_remaining_meters": ("Remaining capacity of the active pen.", active_pen.get('capacity', 0) - active_pen.get('used', 0)),
+        "linecraft_preview_cache_entries": ("Rendered previews held in memory.", cache["entries"]),
+        "linecraft_preview_cache_bytes": ("Bytes held by the preview cache.", cache["bytes"]),
+        "linecraft_layout_cache_entries": ("Laid-out text values held for reuse.", layout["entries"]),
+        "linecraft_layout_cache_bytes": ("Approximate bytes held by the layout cache.", layout["bytes"]),
+        "linecraft_layout_cache_hits": ("Text layouts served from the cache.", layout["hits"]),
+        "linecraft_layout_cache_misses": ("Text layouts built from scratch.", layout["misses"]),
+    }
+    return Response(metrics.render(gauges), mimetype='text/plain; version=0.0.4')
+
 @app.route('/status', methods=['GET'])
 def status(): return jsonify({"status": "online"})
 
 @app.route('/machine', methods=['POST'])
 def machine_control():
+    # Queued on the machine worker: the request returns at once, commands run in order
     action = request.json.get('command')
+    job_id = task_runner.submit("machine", _machine, action, machine=True)
+    return jsonify({"status": "queued", "job_id": job_id}), 202
+
+def _machine(action):
+    backend = plot_manager.backend   # Same plotter the queue uses (axicli or simulator)
     if action == "pen_up":
-        subprocess.run([AXICLI_PATH, '--mode', 'manual', '--manual_cmd', 'raise_pen'])
-        subprocess.run([AXICLI_PATH, '--mode', 'manual', '--manual_cmd', 'disable_xy'])
+        backend.manual('raise_pen')
+        backend.manual('disable_xy')
     elif action == "pen_down":
-        subprocess.run([AXICLI_PATH, '--mode', 'manual', '--manual_cmd', 'lower_pen'])
-        subprocess.run([AXICLI_PATH, '--mode', 'manual', '--manual_cmd', 'disable_xy'])
+        backend.manual('lower_pen')
+        backend.manual('disable_xy')
     elif action == "motors_off":
-        subprocess.run([AXICLI_PATH, '--mode', 'manual', '--manual_cmd', 'disable_xy'])
-    return jsonify({"status": "ok"})
+        backend.manual('disable_xy')
+    else: raise ValueError(f"Unknown machine command '{action}'")
+    return {"status": "ok", "command": action}
+
+@app.route('/jobs', methods=['GET'])
+def list_jobs():
+    return jsonify({"jobs": task_runner.list(int(request.args.get('limit', 20)))})
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = task_runner.get(job_id)
+    if job is None: return jsonify({"error": "Unknown job"}), 404
+    return jsonify(job)
 
 if __name__ == '__main__':
     print("🔒 Linecraft OS (Secured Localhost) Running...")
-    app.run(host='127.0.0.1', port=5000, debug=False)
+    try:
+        from waitress import serve
+        serve(app, host='127.0.0.1', port=5000, threads=8)
+    except ImportError:
+        app.run(host='127.0.0.1', port=5000, debug=False, threaded=True)